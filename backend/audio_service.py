@@ -1,31 +1,290 @@
 from pathlib import Path
 import time
-from typing import List
+from typing import List, Optional
 
+import numpy as np
 from moviepy import AudioFileClip, concatenate_audioclips
+from moviepy.audio.AudioClip import AudioArrayClip
 
+### MPEG audio Layer III frame parsing (enough to concatenate without decoding) ###
 
-def merge_audio(audio_file_paths: List[Path], output_file: Path) -> Path:
-    """Concatenate multiple audio files into `output_file` and return its Path."""
-    if not audio_file_paths:
-        raise ValueError("audio_file_paths must contain at least one Path")
+# Bitrates in kbps by bitrate index, for MPEG-1 and for MPEG-2/2.5 Layer III
+_BITRATES = {
+    "mpeg1": [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    "mpeg2": [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_SAMPLE_RATES = [44100, 48000, 32000]
+# Version bits -> sample rate divisor (1 = MPEG-1, 2 = MPEG-2, 4 = MPEG-2.5)
+_VERSIONS = {3: 1, 2: 2, 0: 4}
+# Samples an MP3 decoder outputs before the first encoded sample (its
+# filterbank delay), on top of the encoder delay in the LAME tag
+DECODER_DELAY = 529
+# Encoder strings that start a LAME tag (LAME itself, and ffmpeg's libmp3lame)
+_LAME_TAGS = (b"LAME", b"Lavf", b"Lavc")
+
+
+class MP3Frames:
+    """
+    The audio frames of an MP3 file, with its tags and Xing/Info/VBRI header
+    frame stripped.
+
+    Frames of files that share a format can be joined byte for byte: the
+    result is a valid MP3 and nothing is decoded or re-encoded.
+
+    The frames hold more samples than the audio that was encoded: the
+    encoder's delay and padding, which a gapless decoder trims using the
+    LAME tag in the header frame. Joined frames lose that tag, so the
+    padding of each input stays in the merged stream.
+    """
+
+    data: bytes  # The frames, back to back
+    frame_count: int
+    sample_rate: int
+    samples_per_frame: int
+    mono: bool
+    first_header: bytes  # Header of the first audio frame (to build silence)
+    encoder_delay: int  # Samples before the encoded audio (LAME tag, else 0)
+    encoder_padding: int  # Samples after it (LAME tag, else 0)
+
+    def __init__(
+        self,
+        data: bytes,
+        frame_count: int,
+        header: bytes,
+        encoder_delay: int = 0,
+        encoder_padding: int = 0,
+    ):
+        self.data = data
+        self.frame_count = frame_count
+        self.first_header = header
+        self.encoder_delay = encoder_delay
+        self.encoder_padding = encoder_padding
+        divisor = _VERSIONS[(header[1] >> 3) & 3]
+        self.sample_rate = _SAMPLE_RATES[(header[2] >> 2) & 3] // divisor
+        self.samples_per_frame = 1152 if divisor == 1 else 576
+        self.mono = header[3] >> 6 == 3
+
+    @property
+    def format(self) -> tuple:
+        """What has to match for two streams to be joined as they are"""
+        return ((self.first_header[1] >> 3) & 3, self.sample_rate, self.mono)
+
+    @property
+    def frame_seconds(self) -> float:
+        return self.samples_per_frame / self.sample_rate
+
+    @property
+    def duration(self) -> float:
+        """Length in seconds of the frames (as decoded without a LAME tag)"""
+        return self.frame_count * self.frame_seconds
+
+    @property
+    def audio_start(self) -> float:
+        """Where the encoded audio starts when the frames are decoded, in seconds"""
+        return (self.encoder_delay + DECODER_DELAY) / self.sample_rate
+
+    @property
+    def audio_duration(self) -> float:
+        """Length in seconds of the encoded audio (what a gapless decoder outputs)"""
+        samples = self.frame_count * self.samples_per_frame
+        if self.encoder_delay or self.encoder_padding:
+            samples -= self.encoder_delay + self.encoder_padding
+        return samples / self.sample_rate
+
+    def silence(self, seconds: float) -> tuple[bytes, int]:
+        """
+        Silent frames in this stream's format, about `seconds` long.
+
+        Returns:
+            (frames, frame count)
+        """
+        count = round(seconds / self.frame_seconds)
+        if count <= 0:
+            return b"", 0
+        # Same format, no padding or CRC; an all-zero body decodes as silence
+        header = bytes(
+            [
+                self.first_header[0],
+                self.first_header[1] | 0x01,
+                self.first_header[2] & 0xFD,
+                self.first_header[3],
+            ]
+        )
+        size = _frame_size(header)
+        return (header + bytes(size - 4)) * count, count
+
+
+def _frame_size(header: bytes) -> int:
+    """Length in bytes of the Layer III frame starting with `header`, 0 if invalid"""
+    if header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return 0
+    version = (header[1] >> 3) & 3
+    layer = (header[1] >> 1) & 3
+    bitrate_index = header[2] >> 4
+    sample_rate_index = (header[2] >> 2) & 3
+    # Layer III only; free-format and reserved values can't be walked
+    if version not in _VERSIONS or layer != 1 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return 0
+
+    divisor = _VERSIONS[version]
+    bitrate = _BITRATES["mpeg1" if divisor == 1 else "mpeg2"][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[sample_rate_index] // divisor
+    padding = (header[2] >> 1) & 1
+    return (144 if divisor == 1 else 72) * bitrate // sample_rate + padding
+
+
+def _xing_offset(frame: bytes) -> int:
+    """Where a Xing/Info header would start in a frame"""
+    mpeg1 = (frame[1] >> 3) & 3 == 3
+    mono = frame[3] >> 6 == 3
+    side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+    crc = 0 if frame[1] & 0x01 else 2
+    return 4 + crc + side_info
+
+
+def _is_info_frame(frame: bytes) -> bool:
+    """Whether a frame is a Xing/Info or VBRI header rather than audio"""
+    xing = _xing_offset(frame)
+    return frame[xing : xing + 4] in (b"Xing", b"Info") or frame[36:40] == b"VBRI"
+
+
+def _encoder_delay_and_padding(frame: bytes) -> tuple[int, int]:
+    """Encoder delay and padding in samples from a header frame's LAME tag, or (0, 0)"""
+    xing = _xing_offset(frame)
+    if frame[xing : xing + 4] not in (b"Xing", b"Info"):
+        return 0, 0
+    flags = int.from_bytes(frame[xing + 4 : xing + 8], "big")
+    # Frame count, byte count, TOC and quality fields, each only if flagged
+    tag = xing + 8
+    for bit, size in ((1, 4), (2, 4), (4, 100), (8, 4)):
+        if flags & bit:
+            tag += size
+    if frame[tag : tag + 4] not in _LAME_TAGS or len(frame) < tag + 24:
+        return 0, 0
+    packed = int.from_bytes(frame[tag + 21 : tag + 24], "big")
+    return packed >> 12, packed & 0xFFF
+
+
+def parse_mp3_frames(data: bytes) -> MP3Frames:
+    """
+    Split an MP3 file into its audio frames.
+
+    Raises:
+        ValueError: if the data isn't a Layer III stream this parser can walk
+    """
+    start, end = 0, len(data)
+
+    # ID3v2 at the start (size is syncsafe, plus a footer if flagged)
+    if data[:3] == b"ID3" and len(data) >= 10:
+        size = 0
+        for byte in data[6:10]:
+            size = (size << 7) | (byte & 0x7F)
+        start = 10 + size + (10 if data[5] & 0x10 else 0)
+    # ID3v1 at the end
+    if end - start >= 128 and data[end - 128 : end - 125] == b"TAG":
+        end -= 128
+
+    frames = []
+    encoder_delay = encoder_padding = 0
+    position = start
+    while position + 4 <= end:
+        size = _frame_size(data[position : position + 4])
+        if size == 0 or position + size > end:
+            # Trailing junk (or another tag) after the last frame
+            break
+        frame = data[position : position + size]
+        # The encoder's header frame describes the whole file; drop it
+        if frames or not _is_info_frame(frame):
+            frames.append(frame)
+        else:
+            encoder_delay, encoder_padding = _encoder_delay_and_padding(frame)
+        position += size
 
+    if not frames:
+        raise ValueError("No MPEG Layer III audio frames found")
+    return MP3Frames(
+        b"".join(frames), len(frames), frames[0][:4], encoder_delay, encoder_padding
+    )
+
+
+### Merging ###
+
+
+class MergedAudio:
+    """A merged audio file and where each input ended up in it"""
+
+    path: Path
+    offsets: List[float]  # Where each line's audio starts, in seconds
+    durations: List[float]  # Length of each line's audio, in seconds
+    duration: float  # Length of the whole file, as decoded
+    stream_copied: bool  # True if the frames were joined without re-encoding
+
+    def __init__(self, path, offsets, durations, duration, stream_copied):
+        self.path = path
+        self.offsets = offsets
+        self.durations = durations
+        self.duration = duration
+        self.stream_copied = stream_copied
+
+
+def _join_mp3_frames(
+    audio_file_paths: List[Path], output_file: Path, gap: float
+) -> Optional[MergedAudio]:
+    """Frame-level MP3 concatenation, or None if the inputs can't be joined as is"""
+    try:
+        streams = [parse_mp3_frames(p.read_bytes()) for p in audio_file_paths]
+    except ValueError:
+        return None
+    if len({stream.format for stream in streams}) != 1:
+        return None
+
+    gap_frames, gap_count = streams[0].silence(gap)
+    gap_seconds = gap_count * streams[0].frame_seconds
+
+    # Each input keeps its encoder delay and padding (there's no LAME tag
+    # left to trim them by), so a line's audio starts audio_start into its
+    # frames and the gap between two lines is longer than `gap` by the
+    # padding of the first and the delay of the second
+    parts, offsets, durations = [], [], []
+    position = 0.0
+    for i, stream in enumerate(streams):
+        if i > 0 and gap_count:
+            parts.append(gap_frames)
+            position += gap_seconds
+        parts.append(stream.data)
+        offsets.append(position + stream.audio_start)
+        durations.append(stream.audio_duration)
+        position += stream.duration
+
+    output_file.write_bytes(b"".join(parts))
+    return MergedAudio(output_file, offsets, durations, position, stream_copied=True)
+
+
+def _decode_and_merge(
+    audio_file_paths: List[Path], output_file: Path, gap: float
+) -> MergedAudio:
+    """Decode every input and encode the concatenation (any mix of formats)"""
     clips = []  # store all audio clips
     try:
         for p in audio_file_paths:
-            if not p.exists() or not p.is_file():
-                raise FileNotFoundError(f"Audio file not found: {p}")
             clips.append(AudioFileClip(str(p)))
 
-        final_clip = clips[0] if len(clips) == 1 else concatenate_audioclips(clips)
+        sequence, offsets, durations = [], [], []
+        position = 0.0
+        for i, clip in enumerate(clips):
+            if i > 0 and gap > 0:
+                silence = np.zeros((round(gap * 44100), clip.nchannels))
+                sequence.append(AudioArrayClip(silence, fps=44100))
+                position += gap
+            sequence.append(clip)
+            offsets.append(position)
+            durations.append(clip.duration)
+            position += clip.duration
 
-        # Create output directory just in case
-        out_dir = output_file.parent
-        out_dir.mkdir(parents=True, exist_ok=True)
+        final_clip = sequence[0] if len(sequence) == 1 else concatenate_audioclips(sequence)
+        final_clip.write_audiofile(str(output_file), fps=44100, logger=None)
 
-        final_clip.write_audiofile(str(output_file), fps=44100)
-
-        return output_file
+        return MergedAudio(output_file, offsets, durations, position, stream_copied=False)
     finally:
         for c in clips:
             try:
@@ -34,8 +293,57 @@ def merge_audio(audio_file_paths: List[Path], output_file: Path) -> Path:
                 pass
 
 
+def merge_audio(
+    audio_file_paths: List[Path], output_file: Path, gap: float = 0.0
+) -> MergedAudio:
+    """
+    Concatenate multiple audio files into `output_file`.
+
+    MP3s in a common format (as every TTS line is) into an .mp3 output are
+    joined frame by frame, without decoding or re-encoding; anything else is
+    decoded and re-encoded at 44.1 kHz.
+
+    Either way, offsets and durations mark each input's own audio, without
+    the encoder delay and padding around it. On the stream copy path that
+    padding stays in the file, so offsets are not simply the sum of the
+    previous durations and gaps.
+
+    image_service.render_segment merges each segment's lines with this and
+    times the speakers by the offsets.
+
+    Args:
+        audio_file_paths: Audio files, in order
+        output_file: Path for the merged file
+        gap: Seconds of silence between consecutive files. On the stream
+            copy path this is rounded to whole MP3 frames (~26 ms).
+
+    Returns:
+        MergedAudio with the path and each input's exact offset and length
+        in the merged file
+    """
+    if not audio_file_paths:
+        raise ValueError("audio_file_paths must contain at least one Path")
+
+    for p in audio_file_paths:
+        if not p.exists() or not p.is_file():
+            raise FileNotFoundError(f"Audio file not found: {p}")
+
+    # Create output directory just in case
+    out_dir = output_file.parent
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    if output_file.suffix.lower() == ".mp3" and all(
+        p.suffix.lower() == ".mp3" for p in audio_file_paths
+    ):
+        merged = _join_mp3_frames(audio_file_paths, output_file, gap)
+        if merged is not None:
+            return merged
+
+    return _decode_and_merge(audio_file_paths, output_file, gap)
+
+
 # if __name__ == "__main__":
 #     paths = [Path("storage/audio/test1.mp3"), Path("storage/audio/test2.mp3")]
 #     output_path = Path("storage/audio/output.mp3")
-#     output_path = merge_audio(paths, output_path)
-#     print("Merged audio written to", output_path)
+#     merged = merge_audio(paths, output_path)
+#     print("Merged audio written to", merged.path, "line offsets:", merged.offsets)
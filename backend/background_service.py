@@ -0,0 +1,191 @@
+import hashlib
+import os
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+import imageio_ffmpeg
+from moviepy import VideoFileClip
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+from pdf_parser.workspace import DATA_DIR
+
+# Format every segment is rendered at: 9:16 portrait
+BACKGROUND_WIDTH = int(os.getenv("BACKGROUND_WIDTH", 720))
+BACKGROUND_HEIGHT = int(os.getenv("BACKGROUND_HEIGHT", 1280))
+BACKGROUND_FPS = int(os.getenv("BACKGROUND_FPS", 30))
+
+# Where the transcoded backgrounds are kept
+BACKGROUND_CACHE_DIR = DATA_DIR / "cache" / "background"
+
+
+class BackgroundSource:
+    """
+    A background video shared by every segment render in the process.
+
+    The source is transcoded once, to the render format (9:16 crop, target
+    resolution and fps, a keyframe every second so seeks are cheap), and the
+    intermediate is kept on disk for later runs and other processes. The
+    intermediate is probed and opened once per process; each segment takes
+    its own subclip of it, starting at its own offset.
+    """
+
+    def __init__(
+        self,
+        source_path: Path,
+        cache_dir: Path = BACKGROUND_CACHE_DIR,
+        width: int = BACKGROUND_WIDTH,
+        height: int = BACKGROUND_HEIGHT,
+        fps: int = BACKGROUND_FPS,
+    ):
+        self.source_path = Path(source_path)
+        self.cache_dir = Path(cache_dir)
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self._lock = threading.Lock()
+        self._path: Optional[Path] = None
+        self._duration: Optional[float] = None
+        self._source_duration: Optional[float] = None
+        self._clip: Optional[VideoFileClip] = None
+        self._cursor = 0.0
+
+    @property
+    def intermediate_path(self) -> Path:
+        """Where the transcoded copy for this source and format lives"""
+        stat = self.source_path.stat()
+        key = hashlib.sha256(
+            f"{self.source_path.resolve()}|{stat.st_size}|{stat.st_mtime_ns}|"
+            f"{self.width}x{self.height}@{self.fps}".encode("utf-8")
+        ).hexdigest()[:16]
+        return self.cache_dir / f"{self.source_path.stem}-{key}.mp4"
+
+    def prepare(self) -> Path:
+        """
+        Transcode the source to the render format, unless already done.
+
+        Returns:
+            Path of the video segments should be cut from (the source
+            itself if transcoding fails)
+        """
+        with self._lock:
+            if self._path is not None:
+                return self._path
+
+            target = self.intermediate_path
+            if not target.exists():
+                try:
+                    self._transcode(target)
+                except (OSError, subprocess.CalledProcessError) as e:
+                    print(f"✗ Could not transcode background, using the source: {e}")
+                    target = self.source_path
+            self._path = target
+            return self._path
+
+    @property
+    def duration(self) -> float:
+        """Length of the prepared background in seconds (probed once)"""
+        path = self.prepare()
+        with self._lock:
+            if self._duration is None:
+                self._duration = float(ffmpeg_parse_infos(str(path))["duration"])
+            return self._duration
+
+    @property
+    def source_duration(self) -> float:
+        """
+        Length of the source video in seconds (probed once).
+
+        Doesn't transcode, so it is cheap in processes that never render.
+        The intermediate keeps the source's length.
+        """
+        with self._lock:
+            if self._source_duration is None:
+                self._source_duration = float(
+                    ffmpeg_parse_infos(str(self.source_path))["duration"]
+                )
+            return self._source_duration
+
+    def clip(self) -> VideoFileClip:
+        """
+        The prepared background, opened once per process.
+
+        Don't close it; subclips share its reader.
+        """
+        path = self.prepare()
+        with self._lock:
+            if self._clip is None:
+                self._clip = VideoFileClip(str(path), audio=False)
+                self._duration = self._clip.duration
+            return self._clip
+
+    def next_offset(self, length: float) -> float:
+        """
+        Start time for the next segment of `length` seconds.
+
+        Segments walk through the background one after another and wrap
+        around at the end, so consecutive segments (and jobs) don't all show
+        the same opening seconds. Computed from the source, so the process
+        handing out offsets never has to build the intermediate itself.
+        """
+        duration = self.source_duration
+        with self._lock:
+            latest_start = max(0.0, duration - length)
+            if self._cursor > latest_start:
+                self._cursor = 0.0
+            offset = self._cursor
+            self._cursor += length
+            return offset
+
+    def _transcode(self, target: Path) -> None:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(f"{target.stem}.{os.getpid()}.part.mp4")
+        # Center crop to 9:16, then scale and resample to the render format
+        video_filter = (
+            f"crop='min(iw,ih*{self.width}/{self.height})':'min(ih,iw*{self.height}/{self.width})',"
+            f"scale={self.width}:{self.height},setsar=1,fps={self.fps}"
+        )
+        print(f"Preparing background {self.source_path.name} ({self.width}x{self.height}@{self.fps})...")
+        try:
+            subprocess.run(
+                [
+                    imageio_ffmpeg.get_ffmpeg_exe(),
+                    "-y",
+                    "-loglevel", "error",
+                    "-i", str(self.source_path),
+                    "-an",
+                    "-vf", video_filter,
+                    "-c:v", "libx264",
+                    "-preset", "veryfast",
+                    "-crf", "18",
+                    "-pix_fmt", "yuv420p",
+                    "-g", str(self.fps),
+                    str(partial),
+                ],
+                check=True,
+                capture_output=True,
+            )
+            # Another process may have finished first; either copy is fine
+            os.replace(partial, target)
+        finally:
+            partial.unlink(missing_ok=True)
+        print(f"✓ Background ready: {target}")
+
+
+_sources: Dict[tuple, BackgroundSource] = {}
+_sources_lock = threading.Lock()
+
+
+def get_background(
+    source_path,
+    width: int = BACKGROUND_WIDTH,
+    height: int = BACKGROUND_HEIGHT,
+    fps: int = BACKGROUND_FPS,
+) -> BackgroundSource:
+    """The process-wide BackgroundSource for a background video at a format"""
+    key = (str(Path(source_path).resolve()), width, height, fps)
+    with _sources_lock:
+        if key not in _sources:
+            _sources[key] = BackgroundSource(Path(source_path), width=width, height=height, fps=fps)
+        return _sources[key]
@@ -0,0 +1,159 @@
+"""
+Contention benchmark for the job registries.
+
+Event logs: pipeline-like writer threads publish events to random jobs
+while SSE-like reader threads poll random jobs' logs (every --poll-ms).
+Compares the lock-striped logs of JobService, read without locking, with a
+single lock around a dict of lists (how JobService kept them before).
+Reported: events written per second and how long a read takes (p50/p99/max).
+
+Job store: GET /status-like reads (status, progress, stages, videos) on an
+idle store and while writer threads update progress and stages.
+
+Run from backend folder:
+    python bench_job_registry.py [--writers N] [--readers N] [--jobs N]
+                                 [--events N] [--poll-ms MS] [--seconds S]
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from job_service import JobEvent, JobService, JobStatus
+from job_store import JobStore
+
+
+class SingleLockEvents:
+    """Baseline: every job's events in one dict of lists behind one lock"""
+
+    def __init__(self):
+        self._events = {}
+        self._lock = threading.Lock()
+
+    def create_job(self, job_id, status=None):
+        with self._lock:
+            self._events[job_id] = []
+
+    def publish_event(self, job_id, event, data):
+        with self._lock:
+            events = self._events[job_id]
+            events.append(JobEvent(len(events) + 1, event, data))
+
+    def get_events(self, job_id, after=0):
+        with self._lock:
+            return self._events.get(job_id, [])[after:]
+
+
+def percentiles(samples: list[float]) -> str:
+    samples.sort()
+    p50 = statistics.median(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    return f"{p50 * 1e6:>8.1f} {p99 * 1e6:>8.1f} {samples[-1] * 1e6:>9.1f}"
+
+
+def run_threads(writer, reader, writers: int, readers: int, seconds: float, poll: float):
+    """Run writer/reader loops for `seconds`; returns (writes, read latencies)"""
+    stop = threading.Event()
+    writes = [0] * writers
+    latencies: list[list[float]] = [[] for _ in range(readers)]
+
+    def write_loop(index):
+        while not stop.is_set():
+            writer(index)
+            writes[index] += 1
+
+    def read_loop(index):
+        rng = random.Random(index)
+        while not stop.is_set():
+            start = time.perf_counter()
+            reader(rng)
+            latencies[index].append(time.perf_counter() - start)
+            time.sleep(poll)
+
+    threads = [threading.Thread(target=write_loop, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=read_loop, args=(i,)) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(writes), [sample for samples in latencies for sample in samples]
+
+
+def bench_events(name, registry, args):
+    job_ids = [f"job-{i}" for i in range(args.jobs)]
+    for job_id in job_ids:
+        registry.create_job(job_id, JobStatus.PROCESSING)
+        # A job's log as it looks halfway through the pipeline
+        for n in range(args.events):
+            registry.publish_event(job_id, "line_synthesized", {"line": n})
+
+    rngs = [random.Random(-i) for i in range(args.writers)]
+
+    def writer(index):
+        registry.publish_event(rngs[index].choice(job_ids), "lines_planned", {"count": 1})
+
+    def reader(rng):
+        # A client resuming near the end of the log, like a polling SSE stream
+        registry.get_events(rng.choice(job_ids), args.events)
+
+    writes, latencies = run_threads(
+        writer, reader, args.writers, args.readers, args.seconds, args.poll_ms / 1000
+    )
+    print(f"{name:<22} {writes / args.seconds:>12,.0f} {percentiles(latencies)}")
+
+
+def bench_store(store: JobStore, args):
+    job_ids = [f"job-{i}" for i in range(args.jobs)]
+    for job_id in job_ids:
+        store.create_job(job_id, JobStatus.PROCESSING.value)
+        store.add_job_video(job_id, f"{job_id}-video")
+
+    def writer(index):
+        job_id = job_ids[index % len(job_ids)]
+        store.add_progress(job_id, "lines_synthesized", 1)
+        store.set_stage(job_id, f"segment 1:line {index}", "done")
+
+    def reader(rng):
+        job_id = rng.choice(job_ids)
+        store.get_status(job_id)
+        store.get_progress(job_id)
+        store.get_stages(job_id)
+        store.get_job_videos(job_id)
+
+    for label, writers in (("idle", 0), (f"{args.writers} writers", args.writers)):
+        writes, latencies = run_threads(
+            writer, reader, writers, args.readers, args.seconds, args.poll_ms / 1000
+        )
+        print(f"{'status reads, ' + label:<22} {writes / args.seconds:>12,.0f} {percentiles(latencies)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Job registry contention benchmark")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--jobs", type=int, default=64)
+    parser.add_argument("--events", type=int, default=400, help="Events already in each log")
+    parser.add_argument("--poll-ms", type=float, default=1.0, help="Pause between a reader's polls")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(
+        f"{args.writers} writers, {args.readers} readers, {args.jobs} jobs, "
+        f"{args.poll_ms:g} ms between polls, {args.seconds:.0f}s per run\n"
+    )
+    print(f"{'':<22} {'writes/s':>12} {'read p50':>8} {'p99':>8} {'max (µs)':>9}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bench_events("events, single lock", SingleLockEvents(), args)
+        bench_events("events, striped", JobService(JobStore(Path(tmp) / "events.db")), args)
+        bench_store(JobStore(Path(tmp) / "store.db"), args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark PDF text extraction: serial vs page-parallel pdfplumber, and the
+pdfium fast path, on the PDFs in backend/uploads/.
+
+Run from backend folder:
+    python bench_pdf_extraction.py [--workers N] [--repeat N]
+"""
+
+import argparse
+import logging
+import time
+from pathlib import Path
+
+from pdf_parser import pdf_plumber
+from pdf_parser.pdf_plumber import extract_text_from_pdf
+
+UPLOADS_DIR = Path(__file__).parent / "uploads"
+
+
+def time_extraction(pdf_path, repeat, **kwargs):
+    """Best-of-`repeat` wall time in seconds, and the extracted text"""
+    best = float("inf")
+    text = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = extract_text_from_pdf(str(pdf_path), **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF text extraction benchmark")
+    parser.add_argument("--workers", type=int, default=pdf_plumber.PDF_EXTRACT_WORKERS)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # pdfminer warns about every malformed font; keep the table readable
+    logging.getLogger("pdfminer").setLevel(logging.ERROR)
+
+    pdf_files = sorted(UPLOADS_DIR.glob("*.pdf"))
+    if not pdf_files:
+        print(f"No PDF files found in {UPLOADS_DIR}")
+        return
+
+    # Force the parallel path even on short PDFs so it is actually measured
+    pdf_plumber.PARALLEL_MIN_PAGES = 0
+    pdf_plumber.PDF_EXTRACT_WORKERS = args.workers
+
+    print(f"{len(pdf_files)} PDF(s), {args.workers} worker(s), best of {args.repeat}\n")
+    print(f"{'file':<44} {'pages':>5} {'serial':>8} {'parallel':>9} {'pdfium':>8} {'same':>5}")
+
+    totals = [0.0, 0.0, 0.0]
+    for pdf_file in pdf_files:
+        serial, serial_text = time_extraction(pdf_file, args.repeat, engine="pdfplumber", workers=1)
+        parallel, parallel_text = time_extraction(
+            pdf_file, args.repeat, engine="pdfplumber", workers=args.workers
+        )
+        fast, _ = time_extraction(pdf_file, args.repeat, engine="pdfium", workers=1)
+        totals = [totals[0] + serial, totals[1] + parallel, totals[2] + fast]
+
+        pages = pdf_plumber._page_count(str(pdf_file))
+        same = "yes" if serial_text == parallel_text else "NO"
+        print(
+            f"{pdf_file.name:<44} {pages:>5} {serial:>7.2f}s {parallel:>8.2f}s {fast:>7.2f}s {same:>5}"
+        )
+
+    print(f"\n{'total':<44} {'':>5} {totals[0]:>7.2f}s {totals[1]:>8.2f}s {totals[2]:>7.2f}s")
+    print(f"pdfium speedup over serial pdfplumber: {totals[0] / totals[2]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark the render profiles: encode seconds per second of output video
+for each profile (and renderer) on the sample background.
+
+Renders one synthetic segment (alternating speakers over silent audio) per
+profile. Preparing each profile's background is timed separately, since it
+happens once per format and is cached on disk.
+
+Run from backend folder:
+    python bench_render_profiles.py [--profiles draft standard] [--renderer ffmpeg]
+                                    [--lines N] [--line-seconds S] [--repeat N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from background_service import get_background
+from generate_videos import MORTY_IMAGE, RICK_IMAGE, VIDEO_PATH
+from image_service import RENDERERS, render_segment, segment_render_length
+from pdf_parser.fake_tts_server import silent_mp3
+from render_profiles import RENDER_PROFILES
+
+
+def make_segment(audio_dir: Path, lines: int, line_seconds: float) -> dict:
+    """Segment metadata with `lines` alternating lines of silent audio"""
+    speakers, timestamps, filenames = [], [], []
+    for i in range(1, lines + 1):
+        speaker = "rick" if i % 2 else "morty"
+        filename = f"D1_S{i}_{speaker}.mp3"
+        (audio_dir / filename).write_bytes(silent_mp3(line_seconds))
+        speakers.append(speaker)
+        timestamps.append(round(i * line_seconds, 3))
+        filenames.append(filename)
+    return {"person": speakers, "timestamps": timestamps, "filename": filenames}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render profile benchmark")
+    parser.add_argument("--profiles", nargs="+", choices=list(RENDER_PROFILES), default=list(RENDER_PROFILES))
+    parser.add_argument("--renderer", nargs="+", choices=RENDERERS, default=list(RENDERERS))
+    parser.add_argument("--lines", type=int, default=6)
+    parser.add_argument("--line-seconds", type=float, default=2.0)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    if not VIDEO_PATH.exists():
+        print(f"Sample background not found: {VIDEO_PATH}")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        segment = make_segment(tmp, args.lines, args.line_seconds)
+        output_seconds = segment_render_length(segment)
+
+        print(f"{VIDEO_PATH.name}: {args.lines} lines, {output_seconds:.1f}s of video per render, best of {args.repeat}\n")
+        print(f"{'profile':<10} {'format':<15} {'renderer':<9} {'prepare':>8} {'encode':>8} {'s/s':>6} {'MB':>6}")
+
+        for name in args.profiles:
+            profile = RENDER_PROFILES[name]
+            start = time.perf_counter()
+            get_background(VIDEO_PATH, *profile.video_format).prepare()
+            prepare = time.perf_counter() - start
+            video_format = f"{profile.width}x{profile.height}@{profile.fps}"
+
+            for renderer in args.renderer:
+                best = float("inf")
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    output_path = render_segment(
+                        f"{name} {renderer}",
+                        segment,
+                        video_path=str(VIDEO_PATH),
+                        rick_image_path=str(RICK_IMAGE),
+                        morty_image_path=str(MORTY_IMAGE),
+                        output_dir=str(tmp / "out"),
+                        audio_dir=str(tmp),
+                        renderer=renderer,
+                        profile=name,
+                    )
+                    best = min(best, time.perf_counter() - start)
+                size_mb = os.path.getsize(output_path) / 1e6
+                print(
+                    f"{name:<10} {video_format:<15} {renderer:<9} {prepare:>7.1f}s "
+                    f"{best:>7.1f}s {best / output_seconds:>6.2f} {size_mb:>6.2f}"
+                )
+                # Only the first renderer pays for preparing the background
+                prepare = 0.0
+
+
+if __name__ == "__main__":
+    main()
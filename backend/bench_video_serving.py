@@ -0,0 +1,170 @@
+"""
+Benchmark video serving: concurrent range requests against a real uvicorn
+server, for VideoFileResponse and for the responses it replaced.
+
+    streaming    1 MB chunks from a sync generator (the old stream_video)
+    starlette    Starlette's FileResponse (64 KB reads through anyio)
+    video        VideoFileResponse (os.pread off the loop, or zero-copy
+                 when the server supports it)
+
+The server runs in its own process. Clients are bare asyncio HTTP/1.1
+connections (so the client side costs as little as possible), each asking
+for --range-mb at a random offset, --requests times in total with
+--concurrency requests in flight. Reported: throughput and per-request
+latency.
+
+Run from backend folder:
+    python bench_video_serving.py [--file-mb N] [--range-mb N]
+                                  [--concurrency N] [--requests N]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import socket
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import FileResponse, StreamingResponse
+
+from video_response import VideoFileResponse, parse_range
+
+
+def build_app(video_path: Path) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/streaming")
+    def streaming(request: Request):
+        size = video_path.stat().st_size
+        start, end = parse_range(request.headers["range"], size)
+
+        def iterfile():
+            with open(video_path, "rb") as file_handle:
+                file_handle.seek(start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    chunk = file_handle.read(min(1024 * 1024, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    yield chunk
+
+        headers = {
+            "Content-Range": f"bytes {start}-{end}/{size}",
+            "Content-Length": str(end - start + 1),
+        }
+        return StreamingResponse(iterfile(), status_code=206, media_type="video/mp4", headers=headers)
+
+    @app.get("/starlette")
+    def starlette():
+        return FileResponse(video_path, media_type="video/mp4")
+
+    @app.get("/video")
+    def video():
+        return VideoFileResponse(video_path)
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(video_path: Path, port: int) -> None:
+    uvicorn.run(build_app(video_path), host="127.0.0.1", port=port, log_level="warning")
+
+
+async def wait_for_server(port: int) -> None:
+    while True:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            await asyncio.sleep(0.1)
+            continue
+        writer.close()
+        return
+
+
+async def run_clients(port: int, path: str, size: int, args) -> tuple[float, list[float]]:
+    """Keep-alive connections, each sending its share of the requests in turn"""
+    range_bytes = int(args.range_mb * 1024 * 1024)
+    rng = random.Random(0)
+    latencies = []
+    remaining = args.requests
+
+    async def connection():
+        nonlocal remaining
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            while remaining > 0:
+                remaining -= 1
+                start = rng.randrange(0, size - range_bytes)
+                began = time.perf_counter()
+                writer.write(
+                    f"GET /{path} HTTP/1.1\r\nHost: bench\r\n"
+                    f"Range: bytes={start}-{start + range_bytes - 1}\r\n\r\n".encode()
+                )
+                head = await reader.readuntil(b"\r\n\r\n")
+                assert head.startswith(b"HTTP/1.1 206"), head
+                length = int(head.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+                assert length == range_bytes
+                await reader.readexactly(length)
+                latencies.append(time.perf_counter() - began)
+        finally:
+            writer.close()
+
+    began = time.perf_counter()
+    await asyncio.gather(*(connection() for _ in range(args.concurrency)))
+    return time.perf_counter() - began, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Video range serving benchmark")
+    parser.add_argument("--file-mb", type=int, default=64)
+    parser.add_argument("--range-mb", type=float, default=2.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=400)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video_path = Path(tmp) / "video.mp4"
+        video_path.write_bytes(os.urandom(args.file_mb * 1024 * 1024))
+        size = video_path.stat().st_size
+
+        port = free_port()
+        server = multiprocessing.get_context("spawn").Process(
+            target=serve, args=(video_path, port), daemon=True
+        )
+        server.start()
+        asyncio.run(wait_for_server(port))
+
+        print(
+            f"{args.requests} requests of {args.range_mb:g} MB, {args.concurrency} in flight, "
+            f"{args.file_mb} MB file\n"
+        )
+        print(f"{'response':<10} {'MB/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+        try:
+            for name in ("streaming", "starlette", "video"):
+                asyncio.run(run_clients(port, name, size, args))  # Warm up
+                elapsed, latencies = asyncio.run(run_clients(port, name, size, args))
+                latencies.sort()
+                throughput = args.requests * args.range_mb / elapsed
+                print(
+                    f"{name:<10} {throughput:>8.0f} {statistics.median(latencies) * 1000:>8.1f} "
+                    f"{latencies[int(len(latencies) * 0.99) - 1] * 1000:>8.1f}"
+                )
+        finally:
+            server.terminate()
+            server.join()
+
+
+if __name__ == "__main__":
+    main()
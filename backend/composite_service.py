@@ -0,0 +1,172 @@
+"""
+Silent composites: a segment's picture kept apart from its soundtrack.
+
+The composite (background plus speakers, no audio) only depends on the
+segment's timeline and render settings, summed up by a fingerprint stored
+next to it. When a segment is rendered again with the same fingerprint,
+e.g. after its lines were re-voiced or a TTS line was retried, the
+composite's video stream is copied into the new MP4 and only the audio is
+encoded, instead of compositing and encoding every frame again.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+import imageio_ffmpeg
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+from ffmpeg_renderer import build_audio_graph
+from render_profiles import FASTSTART, RenderProfile
+
+
+def _file_identity(path: str) -> list:
+    stat = os.stat(path)
+    return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+
+
+def timeline_fingerprint(
+    video_path: str,
+    rick_image_path: str,
+    morty_image_path: str,
+    durations: list[float],
+    speakers: list[str],
+    start_time: float,
+    end_time: float,
+    background_start: float,
+    renderer: str,
+    profile: RenderProfile,
+) -> str:
+    """
+    Hash of everything that decides a segment's picture (but not its audio).
+
+    Returns:
+        Hex digest; equal fingerprints mean an identical silent composite
+    """
+    timeline = {
+        "background": _file_identity(video_path),
+        "images": [_file_identity(rick_image_path), _file_identity(morty_image_path)],
+        "durations": [round(d, 6) for d in durations],
+        "speakers": ["rick" if s.lower() == "rick" else "morty" for s in speakers],
+        "start_time": round(start_time, 6),
+        "end_time": None if end_time is None else round(end_time, 6),
+        "background_start": round(background_start, 6),
+        "renderer": renderer,
+        "profile": [profile.preset, profile.crf, profile.gop_size, *profile.video_format],
+    }
+    return hashlib.sha256(json.dumps(timeline, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class SilentComposite:
+    """A segment's silent composite and the fingerprint it was rendered from"""
+
+    video_path: Path
+    fingerprint_path: Path
+
+    def __init__(self, composite_dir: str, segment_name: str):
+        stem = segment_name.replace(" ", "_")
+        self.video_path = Path(composite_dir) / f"{stem}.mp4"
+        self.fingerprint_path = Path(composite_dir) / f"{stem}.json"
+
+    def matches(self, fingerprint: str) -> bool:
+        """Whether the stored composite was rendered from `fingerprint`"""
+        try:
+            with open(self.fingerprint_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)["fingerprint"]
+        except (OSError, ValueError, KeyError):
+            return False
+        return stored == fingerprint and self.video_path.exists()
+
+    def discard(self) -> None:
+        """Forget the stored fingerprint before the composite is rewritten"""
+        self.video_path.parent.mkdir(parents=True, exist_ok=True)
+        self.fingerprint_path.unlink(missing_ok=True)
+
+    def record(self, fingerprint: str) -> None:
+        """Store the fingerprint of a freshly rendered composite"""
+        partial = self.fingerprint_path.with_suffix(".json.part")
+        with open(partial, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": fingerprint}, f)
+        os.replace(partial, self.fingerprint_path)
+
+
+def mux_audio(
+    silent_path: Path,
+    audio_paths: list[str],
+    output_path: str,
+    start_time: float = 0.0,
+) -> str:
+    """
+    Put the dialog audio on a silent composite without re-encoding the video.
+
+    Args:
+        silent_path: Silent composite video
+        audio_paths: Per-line audio files, in dialog order
+        output_path: Path for the output video
+        start_time: When the first line starts (in seconds)
+
+    Returns:
+        Path to the output video
+    """
+    if not audio_paths:
+        shutil.copyfile(silent_path, output_path)
+        return output_path
+
+    length = float(ffmpeg_parse_infos(str(silent_path))["duration"])
+    command = [
+        imageio_ffmpeg.get_ffmpeg_exe(),
+        "-y",
+        "-loglevel", "error",
+        "-i", str(silent_path),
+    ]
+    for audio_path in audio_paths:
+        command += ["-i", str(audio_path)]
+    command += [
+        "-filter_complex", build_audio_graph(len(audio_paths), start_time, audio_input=1),
+        "-map", "0:v",
+        "-map", "[a]",
+        "-c:v", "copy",
+        "-c:a", "aac",
+        "-ar", "44100",
+        "-t", f"{length:.6f}",
+        *FASTSTART,
+        str(output_path),
+    ]
+
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg remux failed: {result.stderr.strip()}")
+    return output_path
+
+
+def reuse_or_render(
+    composite: SilentComposite,
+    fingerprint: str,
+    render,
+    render_args: dict,
+    audio_paths: Optional[list[str]],
+    output_path: str,
+    start_time: float = 0.0,
+) -> str:
+    """
+    Render a segment through its silent composite.
+
+    The composite is rendered (by `render(output_path=..., audio_paths=None,
+    **render_args)`) only if the stored one doesn't match `fingerprint`;
+    the audio is then muxed onto it.
+
+    Returns:
+        Path to the output video
+    """
+    if composite.matches(fingerprint):
+        print("  ✓ Timeline unchanged, remuxing the audio onto the kept composite")
+    else:
+        composite.discard()
+        render(output_path=str(composite.video_path), audio_paths=None, **render_args)
+        composite.record(fingerprint)
+
+    return mux_audio(composite.video_path, audio_paths or [], output_path, start_time)
@@ -0,0 +1,84 @@
+import hashlib
+import threading
+from typing import Dict, Optional
+
+
+def pdf_content_key(sha256_hex: str, profile: str) -> str:
+    """Dedup key for the raw bytes of an uploaded PDF, rendered with `profile`"""
+    return f"pdf:{profile}:{sha256_hex}"
+
+
+def text_content_key(text: str, profile: str) -> str:
+    """Dedup key for the text extracted from a PDF, rendered with `profile`"""
+    return f"text:{profile}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+
+class DedupService:
+    """Service mapping upload content hashes to the job that owns them, in memory"""
+
+    def __init__(self):
+        self._owners: Dict[str, str] = {}
+        self._finished: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def claim(self, content_key: str, job_id: str) -> str:
+        """
+        Make `job_id` the owner of `content_key` unless another job already is.
+
+        Returns:
+            The owning job id (`job_id` itself if the claim succeeded)
+        """
+        with self._lock:
+            owner = self._owners.setdefault(content_key, job_id)
+            self._finished.setdefault(owner, threading.Event())
+            return owner
+
+    def get_owner(self, content_key: str) -> Optional[str]:
+        """Get the job that owns a content hash"""
+        with self._lock:
+            return self._owners.get(content_key)
+
+    def take_over(self, content_key: str, owner_id: str, job_id: str) -> str:
+        """
+        Move `content_key` from `owner_id` to `job_id`, leaving the owner's
+        other hashes alone (it may still be running and own its upload's).
+
+        Returns:
+            The owning job id; someone other than `job_id` if the key had
+            already changed hands
+        """
+        with self._lock:
+            owner = self._owners.get(content_key)
+            if owner is None or owner == owner_id:
+                owner = self._owners[content_key] = job_id
+            self._finished.setdefault(owner, threading.Event())
+            return owner
+
+    def forget_job(self, job_id: str) -> None:
+        """Release every hash owned by a job (e.g. it failed) so the next upload retries"""
+        with self._lock:
+            for key in [k for k, owner in self._owners.items() if owner == job_id]:
+                del self._owners[key]
+
+    def mark_finished(self, job_id: str) -> None:
+        """Wake up jobs waiting on `job_id`, whether it succeeded or failed"""
+        with self._lock:
+            event = self._finished.setdefault(job_id, threading.Event())
+        event.set()
+
+    def mark_running(self, job_id: str) -> None:
+        """A finished job runs again (it was retried): later waiters wait for this run"""
+        with self._lock:
+            event = self._finished.get(job_id)
+            if event is not None and event.is_set():
+                self._finished[job_id] = threading.Event()
+
+    def wait_finished(self, job_id: str, timeout: Optional[float] = None) -> bool:
+        """Block until `job_id` finishes. Returns False on timeout"""
+        with self._lock:
+            event = self._finished.setdefault(job_id, threading.Event())
+        return event.wait(timeout)
+
+
+# Global instance
+dedup_service = DedupService()
@@ -0,0 +1,181 @@
+"""
+Segment renderer that hands the whole composite to ffmpeg.
+
+The moviepy renderer (image_service.overlay_speakers) pulls every frame
+through Python to draw the speaker on it. This one turns the speaker
+timeline into a single ffmpeg filter graph instead: each speaker image is
+scaled once and overlaid with an `enable` expression listing the windows in
+which that speaker talks, and the per-line audio is concatenated in the same
+invocation. No frame ever reaches Python.
+
+Both renderers take the same arguments and produce the same picture;
+test_ffmpeg_renderer.py checks their outputs against each other.
+"""
+
+import subprocess
+from typing import Optional, Union
+
+import imageio_ffmpeg
+from moviepy.tools import compute_position
+from PIL import Image
+
+from background_service import get_background
+from render_profiles import RenderProfile, get_render_profile
+
+
+def _sprite_size(image_path: str, width: int) -> tuple[int, int]:
+    """Size of an image resized to `width`, rounded like moviepy's resized()"""
+    with Image.open(image_path) as image:
+        return width, int(image.height * width / image.width)
+
+
+def _windows(starts: list[float], ends: list[float]) -> str:
+    """enable expression that is true during any of the [start, end) windows"""
+    # between() includes its end; gte/lt keeps consecutive lines from
+    # overlapping on the frame where one hands over to the next
+    return "+".join(f"gte(t,{a:.6f})*lt(t,{b:.6f})" for a, b in zip(starts, ends))
+
+
+def build_filter_graph(
+    sprite_sizes: dict[str, tuple[int, int]],
+    positions: dict[str, tuple[int, int]],
+    windows: dict[str, tuple[list[float], list[float]]],
+    num_audio: int,
+    start_time: float,
+    audio_input: int = 3,
+) -> str:
+    """
+    The -filter_complex graph for one segment.
+
+    Inputs are 0 = background, 1 = rick image, 2 = morty image and the
+    dialog audio from `audio_input` on. Outputs are [v] and, with audio, [a].
+    """
+    chains = []
+    current = "0:v"
+    for index, speaker in ((1, "rick"), (2, "morty")):
+        if not windows[speaker][0]:
+            continue
+        width, height = sprite_sizes[speaker]
+        x, y = positions[speaker]
+        chains.append(f"[{index}:v]scale={width}:{height}:flags=lanczos,format=rgba[{speaker}]")
+        # Blend in RGB like the moviepy renderer; overlay's default yuv420
+        # blend smears chroma along the sprite's edges
+        chains.append(
+            f"[{current}][{speaker}]overlay=x={x}:y={y}:format=rgb:eof_action=repeat"
+            f":enable='{_windows(*windows[speaker])}'[{speaker}_on]"
+        )
+        current = f"{speaker}_on"
+    chains.append(f"[{current}]format=yuv420p[v]")
+
+    if num_audio:
+        chains.append(build_audio_graph(num_audio, start_time, audio_input))
+
+    return ";".join(chains)
+
+
+def build_audio_graph(num_audio: int, start_time: float, audio_input: int) -> str:
+    """
+    Filter graph joining the dialog audio, from input `audio_input` on, into
+    one track [a] that starts at `start_time` and is padded with silence.
+    """
+    # Same sample format everywhere so concat accepts mixed inputs
+    chains, labels = [], []
+    for i in range(num_audio):
+        chains.append(
+            f"[{audio_input + i}:a]aresample=44100,"
+            f"aformat=sample_fmts=fltp:channel_layouts=stereo[a{i}]"
+        )
+        labels.append(f"[a{i}]")
+    dialog = f"{''.join(labels)}concat=n={num_audio}:v=0:a=1"
+    if start_time > 0:
+        delay = int(start_time * 1000)
+        dialog += f",adelay={delay}|{delay}"
+    # Pad with silence to the end of the video, as moviepy does
+    chains.append(f"{dialog},apad[a]")
+    return ";".join(chains)
+
+
+def render_with_ffmpeg(
+    video_path: str,
+    rick_image_path: str,
+    morty_image_path: str,
+    durations: list[float],
+    speakers: list[str],
+    output_path: str,
+    image_position: Union[str, tuple] = ("center", "bottom"),
+    image_scale: float = 0.3,
+    start_time: float = 0.0,
+    end_time: float = None,
+    audio_paths: Optional[list[str]] = None,
+    background_start: float = 0.0,
+    profile: Optional[RenderProfile] = None,
+) -> str:
+    """
+    Overlay Rick and Morty images on video based on dialog durations, in one
+    ffmpeg invocation.
+
+    Takes the same arguments as image_service.overlay_speakers.
+
+    Returns:
+        Path to the output video
+    """
+    profile = get_render_profile(profile)
+    background = get_background(video_path, *profile.video_format)
+    source = background.prepare()
+    video_size = (background.width, background.height)
+    if source == background.source_path:
+        # Transcode failed, so the source is used as is; read its real size
+        video_size = tuple(background.clip().size)
+
+    length = background.duration if end_time is None else end_time
+    background_start = max(0.0, min(background_start, background.duration - length))
+    length = min(length, background.duration - background_start)
+
+    # Speaker windows, same timeline as the moviepy renderer
+    windows = {"rick": ([], []), "morty": ([], [])}
+    current_time = start_time
+    for duration, speaker in zip(durations, speakers):
+        starts, ends = windows["rick" if speaker.lower() == "rick" else "morty"]
+        starts.append(current_time)
+        ends.append(current_time + duration)
+        current_time += duration
+
+    target_width = int(video_size[0] * image_scale)
+    sprite_sizes = {
+        "rick": _sprite_size(rick_image_path, target_width),
+        "morty": _sprite_size(morty_image_path, target_width),
+    }
+    positions = {
+        speaker: compute_position(size, video_size, image_position)
+        for speaker, size in sprite_sizes.items()
+    }
+
+    audio_paths = [str(p) for p in audio_paths or []]
+    graph = build_filter_graph(sprite_sizes, positions, windows, len(audio_paths), start_time)
+
+    command = [
+        imageio_ffmpeg.get_ffmpeg_exe(),
+        "-y",
+        "-loglevel", "error",
+        "-ss", f"{background_start:.6f}",
+        "-t", f"{length:.6f}",
+        "-i", str(source),
+        "-i", str(rick_image_path),
+        "-i", str(morty_image_path),
+    ]
+    for audio_path in audio_paths:
+        command += ["-i", audio_path]
+    command += ["-filter_complex", graph, "-map", "[v]"]
+    if audio_paths:
+        command += ["-map", "[a]", "-c:a", "aac", "-ar", "44100"]
+    command += [
+        *profile.ffmpeg_args(),
+        "-t", f"{length:.6f}",
+        str(output_path),
+    ]
+
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg render failed: {result.stderr.strip()}")
+
+    return output_path
@@ -8,38 +8,41 @@ Run from backend folder: python generate_videos.py
 import json
 from pathlib import Path
 from image_service import process_segments
+from pdf_parser.workspace import resolve_workspace
 
 # Paths, all hardcoded. TODO: write in .env
 SCRIPT_DIR = Path(__file__).parent
-METADATA_FILE = SCRIPT_DIR / "data" / "audio_metadata.json"
 VIDEO_PATH = SCRIPT_DIR / "video" / "brainrot" / "minecraft_parkour_video.mov"
 RICK_IMAGE = SCRIPT_DIR / "images" / "rick.png"
 MORTY_IMAGE = (
     SCRIPT_DIR / "images" / "rick-and-morty-rick-morty-projectacademy-medium-17.png"
 )
-OUTPUT_DIR = SCRIPT_DIR.parent / "outputs" / "videos"
 
 
-def load_metadata() -> dict:
+def load_metadata(workspace=None) -> dict:
     """Load the metadata JSON from the pdf_parser pipeline."""
-    if not METADATA_FILE.exists():
+    metadata_file = resolve_workspace(workspace).metadata_file
+    if not metadata_file.exists():
         raise FileNotFoundError(
-            f"Metadata file not found: {METADATA_FILE}\n"
+            f"Metadata file not found: {metadata_file}\n"
             "Run the pdf_parser pipeline first (dialogue_to_voice.py -> make_metadata.py)"
         )
 
-    with open(METADATA_FILE, "r", encoding="utf-8") as f:
+    with open(metadata_file, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
-def generate_videos() -> dict[str, str]:
+def generate_videos(workspace=None) -> dict[str, str]:
+    """Render every segment of a workspace's metadata. Defaults to the shared workspace."""
+    workspace = resolve_workspace(workspace)
+
     print("=" * 60)
     print("GENERATING VIDEOS FROM PDF PARSER METADATA")
     print("=" * 60)
 
     # Load metadata
-    print(f"\nLoading metadata from: {METADATA_FILE}")
-    metadata = load_metadata()
+    print(f"\nLoading metadata from: {workspace.metadata_file}")
+    metadata = load_metadata(workspace)
 
     print(f"Found {len(metadata)} segments\n")
 
@@ -52,7 +55,8 @@ def generate_videos() -> dict[str, str]:
     print(f"\nVideo path: {VIDEO_PATH}")
     print(f"Rick image: {RICK_IMAGE}")
     print(f"Morty image: {MORTY_IMAGE}")
-    print(f"Output dir: {OUTPUT_DIR}\n")
+    print(f"Audio dir: {workspace.voice_dir}")
+    print(f"Output dir: {workspace.video_dir}\n")
 
     # Generate videos
     output_paths = process_segments(
@@ -60,7 +64,10 @@ def generate_videos() -> dict[str, str]:
         video_path=str(VIDEO_PATH),
         rick_image_path=str(RICK_IMAGE),
         morty_image_path=str(MORTY_IMAGE),
-        output_dir=str(OUTPUT_DIR),
+        output_dir=str(workspace.video_dir),
+        audio_dir=str(workspace.voice_dir),
+        # Re-runs after re-voicing only remux segments whose timing is unchanged
+        composite_dir=str(workspace.composite_dir),
     )
 
     print(f"\n{'='*60}")
@@ -0,0 +1,93 @@
+"""
+Optional HLS packaging of published videos.
+
+Each video is split, without re-encoding, into fragmented MP4 segments of
+about HLS_SEGMENT_SECONDS plus an init segment and a VOD playlist. A player
+starts on the init segment and the first media segment (a few hundred KB)
+instead of range-requesting its way through the whole MP4.
+
+Segments can only start on keyframes; with packaging enabled the render
+profiles put one every HLS_SEGMENT_SECONDS (render_profiles.py).
+
+Enable with HLS_PACKAGING=1. Packages live next to the videos, in
+<output dir>/hls/<video_id>/.
+"""
+
+import os
+import re
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+import imageio_ffmpeg
+
+HLS_PACKAGING = os.getenv("HLS_PACKAGING", "0").lower() in ("1", "true", "yes")
+HLS_SEGMENT_SECONDS = float(os.getenv("HLS_SEGMENT_SECONDS", 4))
+
+PLAYLIST_NAME = "index.m3u8"
+INIT_SEGMENT_NAME = "init.mp4"
+
+# Every file a package can contain (also keeps requests inside the package)
+_PACKAGE_FILE = re.compile(r"^(index\.m3u8|init\.mp4|seg_\d{3,}\.m4s)$")
+
+MEDIA_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".mp4": "video/mp4",
+    ".m4s": "video/iso.segment",
+}
+
+
+def package_dir(output_dir: Path, video_id: str) -> Path:
+    return Path(output_dir) / "hls" / video_id
+
+
+def package_hls(
+    video_path: Path, target_dir: Path, segment_seconds: float = HLS_SEGMENT_SECONDS
+) -> Path:
+    """
+    Package an MP4 as fMP4 HLS, stream copied.
+
+    The package is written next to `target_dir` and renamed into place, so
+    a package that exists is always complete.
+
+    Returns:
+        Path to the playlist
+    """
+    target_dir = Path(target_dir)
+    partial = target_dir.with_name(f".{target_dir.name}.{os.getpid()}.part")
+    shutil.rmtree(partial, ignore_errors=True)
+    partial.mkdir(parents=True)
+
+    command = [
+        imageio_ffmpeg.get_ffmpeg_exe(),
+        "-y",
+        "-loglevel", "error",
+        "-i", str(video_path),
+        "-c", "copy",
+        "-f", "hls",
+        "-hls_time", f"{segment_seconds:g}",
+        "-hls_playlist_type", "vod",
+        "-hls_segment_type", "fmp4",
+        "-hls_fmp4_init_filename", INIT_SEGMENT_NAME,
+        "-hls_segment_filename", str(partial / "seg_%03d.m4s"),
+        "-hls_flags", "independent_segments",
+        str(partial / PLAYLIST_NAME),
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg HLS packaging failed: {result.stderr.strip()}")
+        shutil.rmtree(target_dir, ignore_errors=True)
+        os.replace(partial, target_dir)
+    finally:
+        shutil.rmtree(partial, ignore_errors=True)
+    return target_dir / PLAYLIST_NAME
+
+
+def package_file(output_dir: Path, video_id: str, name: str) -> Optional[Path]:
+    """A file of a video's package, or None if there is no such file"""
+    if not _PACKAGE_FILE.match(name):
+        return None
+    path = package_dir(output_dir, video_id) / name
+    return path if path.is_file() else None
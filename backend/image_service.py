@@ -1,5 +1,20 @@
-from typing import Union
-from moviepy import VideoFileClip, ImageClip, CompositeVideoClip
+import os
+from bisect import bisect_right
+from pathlib import Path
+from typing import Optional, Union
+from moviepy import AudioFileClip, concatenate_audioclips
+
+from audio_service import MergedAudio, merge_audio
+from background_service import get_background
+from composite_service import SilentComposite, reuse_or_render, timeline_fingerprint
+from ffmpeg_renderer import render_with_ffmpeg
+from render_profiles import DEFAULT_RENDER_PROFILE, RenderProfile, get_render_profile
+from sprite_service import sprite_cache
+
+# Segment renderers: "moviepy" draws frames in Python (the reference),
+# "ffmpeg" runs the whole composite as one ffmpeg filter graph
+RENDERERS = ("moviepy", "ffmpeg")
+DEFAULT_RENDERER = os.getenv("RENDERER", "moviepy")
 
 
 def overlay_speakers(
@@ -13,10 +28,22 @@ def overlay_speakers(
     image_scale: float = 0.3,
     start_time: float = 0.0,  # When the first speaker starts
     end_time: float = None,  # When to cut off the video (last_timestamp + buffer)
+    audio_paths: Optional[list[str]] = None,  # Per-line MP3s, in dialog order
+    background_start: float = 0.0,  # Where in the background video to start
+    profile: Optional[RenderProfile] = None,  # Encoder settings and format
 ) -> str:
     """
     Overlay Rick and Morty images on video based on dialog durations.
 
+    When `audio_paths` is given the dialog audio is concatenated and muxed in
+    the same encode, so the output is the final video and no second
+    `overlay_audio_on_video` pass is needed.
+
+    The background comes from the process-wide BackgroundSource for
+    `video_path`: transcoded to the render format once and opened once, with
+    this video cut from it starting at `background_start`. The render
+    profile sets that format and the x264 settings of the encode.
+
     Args:
         video_path: Path to the background video
         rick_image_path: Path to Rick's image (PNG with transparency recommended)
@@ -28,56 +55,74 @@ def overlay_speakers(
         image_scale: Scale of image relative to video width
         start_time: When the first speaker starts appearing (in seconds)
         end_time: When to cut off the video (if None, uses full video length)
+        audio_paths: Optional list of per-line audio files to use as the soundtrack
+        background_start: Offset into the background video (in seconds)
+        profile: Render profile (default: DEFAULT_RENDER_PROFILE)
 
     Returns:
         Path to the output video
     """
-    # Load the background video
-    video = VideoFileClip(video_path)
+    profile = get_render_profile(profile)
 
-    # Trim video to end_time if specified
-    if end_time is not None:
-        video = video.subclipped(0, min(end_time, video.duration))
+    # Shared background (don't close it: later segments reuse its reader)
+    background = get_background(video_path, *profile.video_format).clip()
 
-    # Load speaker images with transparency
-    rick_img = ImageClip(rick_image_path, transparent=True)
-    morty_img = ImageClip(morty_image_path, transparent=True)
+    # Cut this segment's stretch of the background, ending at end_time
+    length = background.duration if end_time is None else end_time
+    background_start = max(0.0, min(background_start, background.duration - length))
+    video = background.subclipped(
+        background_start, min(background_start + length, background.duration)
+    )
 
-    # Scale images relative to video width
+    # Speaker images, resized and masked once per process (see sprite_service)
     target_width = int(video.w * image_scale)
-    rick_img = rick_img.resized(width=target_width)
-    morty_img = morty_img.resized(width=target_width)
+    sprites = {
+        "rick": sprite_cache.get(rick_image_path, target_width, video.size, image_position),
+        "morty": sprite_cache.get(morty_image_path, target_width, video.size, image_position),
+    }
 
-    # Create image clips for each dialog segment
-    overlay_clips = []
+    # Speaker timeline: line i is on screen from starts[i] to ends[i]
+    starts, ends, line_sprites = [], [], []
     current_time = start_time  # Start from the first timestamp
+    for duration, speaker in zip(durations, speakers):
+        starts.append(current_time)
+        ends.append(current_time + duration)
+        line_sprites.append(sprites["rick" if speaker.lower() == "rick" else "morty"])
+        current_time += duration
 
-    for i, (duration, speaker) in enumerate(zip(durations, speakers)):
-        # Select the correct speaker image
-        img = rick_img if speaker.lower() == "rick" else morty_img
+    def draw_speaker(get_frame, t):
+        frame = get_frame(t)
+        i = bisect_right(starts, t) - 1
+        if i < 0 or t >= ends[i]:
+            return frame
+        return line_sprites[i].blend_onto(frame)
 
-        clip = (
-            img.with_start(current_time)
-            .with_duration(duration)
-            .with_position(image_position)
-        )
-        overlay_clips.append(clip)
-        current_time += duration
+    # Draw the current speaker straight onto each background frame
+    final = video.transform(draw_speaker, apply_to=[])
 
-    # Composite all clips together
-    final = CompositeVideoClip([video] + overlay_clips)
+    # Attach the dialog audio so video and audio go out in a single encode
+    audio_clips = [AudioFileClip(str(p)) for p in audio_paths or []]
+    if audio_clips:
+        dialog_audio = (
+            audio_clips[0]
+            if len(audio_clips) == 1
+            else concatenate_audioclips(audio_clips)
+        )
+        final = final.with_audio(dialog_audio.with_start(start_time))
 
     # Write output
-    final.write_videofile(
-        output_path,
-        codec="libx264",
-        audio_codec="aac",
-        logger=None,
-    )
-
-    # Cleanup
-    video.close()
-    final.close()
+    try:
+        final.write_videofile(
+            output_path,
+            audio_codec="aac",
+            logger=None,
+            **profile.moviepy_params(),
+        )
+    finally:
+        # Cleanup. Not `final`: closing it would close the shared
+        # background reader that later segments still use.
+        for c in audio_clips:
+            c.close()
 
     return output_path
 
@@ -88,6 +133,10 @@ def process_segments(
     rick_image_path: str,
     morty_image_path: str,
     output_dir: str,
+    audio_dir: Optional[str] = None,
+    renderer: str = DEFAULT_RENDERER,
+    profile: Union[str, RenderProfile] = DEFAULT_RENDER_PROFILE,
+    composite_dir: Optional[str] = None,
 ) -> dict[str, str]:
     """
     Process multiple segments from the PDF parser JSON and create videos.
@@ -98,6 +147,13 @@ def process_segments(
         rick_image_path: Path to Rick's image
         morty_image_path: Path to Morty's image
         output_dir: Directory to save output videos
+        audio_dir: Directory holding the per-line MP3s listed in each
+            segment's "filename" field. If given, each output video carries
+            its dialog audio (rendered in one pass).
+        renderer: "moviepy" or "ffmpeg" (see RENDERERS)
+        profile: Render profile or its name (see render_profiles)
+        composite_dir: Where to keep each segment's silent composite, so
+            segments whose timeline is unchanged only get their audio remuxed
 
     Returns:
         Dict mapping segment_name -> output_path
@@ -108,49 +164,167 @@ def process_segments(
 
     output_paths = {}
 
+    background = get_background(video_path, *get_render_profile(profile).video_format)
+
     for segment_name, segment_data in segments_json.items():
-        print(f"Processing {segment_name}...")
-
-        # Extract data from segment
-        speakers = segment_data["person"]
-        timestamps = segment_data["timestamps"]
-
-        # Calculate durations from timestamps
-        # First speaker starts at 0s, timestamps mark when each speaker ENDS
-        # So: duration[0] = timestamps[0] - 0
-        #     duration[i] = timestamps[i] - timestamps[i-1]
-        durations = []
-        for i in range(len(timestamps)):
-            if i == 0:
-                duration = timestamps[0]  # First speaker: 0 to timestamp[0]
-            else:
-                duration = timestamps[i] - timestamps[i - 1]
-            durations.append(duration)
-
-        # Calculate video end time (last timestamp + 10 seconds buffer)
-        last_timestamp = timestamps[-1]
-        video_end_time = last_timestamp + 10.0
-
-        print(f"  Timestamps (end times): {timestamps}")
-        print(f"  Durations: {durations}")
-        print(f"  Video will end at: {video_end_time}s (last timestamp + 10s)")
-
-        # Output path for this segment
-        output_path = os.path.join(output_dir, f"{segment_name.replace(' ', '_')}.mp4")
-
-        # Create the video
-        result = overlay_speakers(
+        # Give each segment its own stretch of the background
+        if "background_offset" not in segment_data:
+            segment_data = {
+                **segment_data,
+                "background_offset": background.next_offset(
+                    segment_render_length(segment_data)
+                ),
+            }
+        output_paths[segment_name] = render_segment(
+            segment_name,
+            segment_data,
             video_path=video_path,
             rick_image_path=rick_image_path,
             morty_image_path=morty_image_path,
-            durations=durations,
-            speakers=speakers,
-            output_path=output_path,
-            start_time=0.0,  # First speaker starts at 0s
-            end_time=video_end_time,  # Cut video 10s after last timestamp
+            output_dir=output_dir,
+            audio_dir=audio_dir,
+            renderer=renderer,
+            profile=profile,
+            composite_dir=composite_dir,
         )
 
-        output_paths[segment_name] = result
-        print(f"  ✓ Created {output_path}")
-
     return output_paths
+
+
+def line_durations(merged: MergedAudio) -> list[float]:
+    """
+    Speaker durations (from 0s) for a merged dialogue track: each speaker is
+    on screen until the next line's audio starts, the last one until its
+    audio ends.
+    """
+    ends = merged.offsets[1:] + [merged.offsets[-1] + merged.durations[-1]]
+    return [end - start for start, end in zip([0.0] + ends, ends)]
+
+
+def segment_render_length(segment_data: dict) -> float:
+    """Length of a segment's video: its last timestamp plus a 10 second buffer"""
+    return segment_data["timestamps"][-1] + 10.0
+
+
+def render_segment(
+    segment_name: str,
+    segment_data: dict,
+    video_path: str,
+    rick_image_path: str,
+    morty_image_path: str,
+    output_dir: str,
+    audio_dir: Optional[str] = None,
+    renderer: str = DEFAULT_RENDERER,
+    profile: Union[str, RenderProfile] = DEFAULT_RENDER_PROFILE,
+    composite_dir: Optional[str] = None,
+) -> str:
+    """
+    Render the video of a single segment from its metadata entry.
+
+    Module-level so it can be shipped to a render worker process.
+
+    Args:
+        segment_name: Name of the segment (e.g. "segment 1")
+        segment_data: Metadata entry with "person", "timestamps" and "filename",
+            and optionally "background_offset" (seconds into the background)
+        video_path: Path to the brainrot background video
+        rick_image_path: Path to Rick's image
+        morty_image_path: Path to Morty's image
+        output_dir: Directory to save the output video
+        audio_dir: Directory holding the segment's per-line MP3s, if the
+            video should carry its dialog audio. They are joined into one
+            track (see audio_service.merge_audio) whose line offsets time
+            the speakers, instead of the metadata timestamps
+        renderer: "moviepy" or "ffmpeg" (see RENDERERS)
+        profile: Render profile or its name (see render_profiles)
+        composite_dir: If given, the silent composite is kept there and
+            reused (with only the audio remuxed) while the segment's timeline
+            and render settings stay the same
+
+    Returns:
+        Path to the output video
+    """
+    import os
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    print(f"Processing {segment_name}...")
+
+    # Extract data from segment
+    speakers = segment_data["person"]
+    timestamps = segment_data["timestamps"]
+
+    # Calculate durations from timestamps
+    # First speaker starts at 0s, timestamps mark when each speaker ENDS
+    # So: duration[0] = timestamps[0] - 0
+    #     duration[i] = timestamps[i] - timestamps[i-1]
+    durations = []
+    for i in range(len(timestamps)):
+        if i == 0:
+            duration = timestamps[0]  # First speaker: 0 to timestamp[0]
+        else:
+            duration = timestamps[i] - timestamps[i - 1]
+        durations.append(duration)
+
+    # Calculate video end time (last timestamp + 10 seconds buffer)
+    video_end_time = segment_render_length(segment_data)
+
+    print(f"  Timestamps (end times): {timestamps}")
+    print(f"  Durations: {durations}")
+    print(f"  Video will end at: {video_end_time}s (last timestamp + 10s)")
+
+    # Output path for this segment
+    output_path = os.path.join(output_dir, f"{segment_name.replace(' ', '_')}.mp4")
+
+    # The segment's dialog as one track, joined frame by frame without
+    # decoding; speakers are timed by where each line's audio actually is
+    audio_paths = None
+    if audio_dir is not None and segment_data.get("filename"):
+        merged = merge_audio(
+            [Path(audio_dir) / filename for filename in segment_data["filename"]],
+            Path(composite_dir or output_dir) / f"{segment_name.replace(' ', '_')}_dialog.mp3",
+        )
+        audio_paths = [str(merged.path)]
+        durations = line_durations(merged)
+        print(f"  Durations from the merged dialog: {[round(d, 3) for d in durations]}")
+
+    if renderer not in RENDERERS:
+        raise ValueError(f"Unknown renderer '{renderer}', expected one of {RENDERERS}")
+    render = render_with_ffmpeg if renderer == "ffmpeg" else overlay_speakers
+    profile = get_render_profile(profile)
+
+    render_args = dict(
+        video_path=video_path,
+        rick_image_path=rick_image_path,
+        morty_image_path=morty_image_path,
+        durations=durations,
+        speakers=speakers,
+        start_time=0.0,  # First speaker starts at 0s
+        end_time=video_end_time,  # Cut video 10s after last timestamp
+        background_start=segment_data.get("background_offset", 0.0),
+        profile=profile,
+    )
+
+    # Create the video
+    if composite_dir is None:
+        result = render(output_path=output_path, audio_paths=audio_paths, **render_args)
+    else:
+        composite = SilentComposite(composite_dir, segment_name)
+        fingerprint = timeline_fingerprint(
+            video_path,
+            rick_image_path,
+            morty_image_path,
+            durations,
+            speakers,
+            start_time=0.0,
+            end_time=video_end_time,
+            background_start=render_args["background_start"],
+            renderer=renderer,
+            profile=profile,
+        )
+        result = reuse_or_render(
+            composite, fingerprint, render, render_args, audio_paths, output_path
+        )
+
+    print(f"  ✓ Created {output_path}")
+    return result
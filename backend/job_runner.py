@@ -0,0 +1,45 @@
+"""
+Job body executed on a scheduler worker thread.
+
+Runs the staged PDF -> audio -> video pipeline for one job in its own
+workspace, on stage pools shared by every job in the process.
+"""
+
+from pathlib import Path
+from typing import Optional
+
+from image_service import DEFAULT_RENDERER
+from pdf_parser.workspace import Workspace
+from pipeline import EventCallback, StagePools, run_pipeline
+from render_profiles import DEFAULT_RENDER_PROFILE
+
+# Global instance, shared by all jobs
+stage_pools = StagePools.from_env()
+
+
+def run_job(
+    job_id: str,
+    pdf_path: str,
+    on_event: Optional[EventCallback] = None,
+    renderer: str = DEFAULT_RENDERER,
+    profile: str = DEFAULT_RENDER_PROFILE,
+) -> dict[str, str]:
+    """
+    Generate audio and render videos for a job.
+
+    Args:
+        job_id: Job identifier (names the workspace)
+        pdf_path: Path to the uploaded PDF
+        on_event: Pipeline progress callback, see pipeline.EventCallback
+        renderer: Segment renderer, see image_service.RENDERERS
+        profile: Render profile name, see render_profiles.RENDER_PROFILES
+
+    Returns:
+        Dict mapping segment_name -> rendered video path
+    """
+    # Everything this job reads and writes lives in its own workspace
+    workspace = Workspace.for_job(job_id, Path(pdf_path))
+
+    return run_pipeline(
+        workspace, stage_pools, on_event, renderer=renderer, profile=profile
+    )
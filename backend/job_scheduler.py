@@ -0,0 +1,169 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+import traceback
+from typing import Any, Callable, Optional
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+
+class JobScheduler:
+    """
+    Bounded priority queue of jobs feeding a fixed number of job workers.
+
+    At most `num_workers` jobs are in flight at once no matter how many
+    uploads arrive. A job worker only drives its job through the pipeline;
+    the expensive work runs on the shared, separately sized stage pools
+    (see pipeline.StagePools). Jobs with a higher priority are started
+    first; jobs with equal priority run in submission (FIFO) order.
+    """
+
+    def __init__(
+        self,
+        target: Callable[..., Any],
+        on_start: Callable[[str], None],
+        on_done: Callable[[str, Any], None],
+        on_error: Callable[[str, Exception], None],
+        num_workers: int,
+        max_queue_size: int,
+    ):
+        """
+        Args:
+            target: Function run on a worker thread for each job
+            on_start: Called (in this process) when a job leaves the queue
+            on_done: Called with the job id and `target`'s return value
+            on_error: Called with the job id and the exception raised
+            num_workers: Number of jobs allowed to run at the same time
+            max_queue_size: Number of waiting jobs before submit() refuses
+        """
+        if num_workers < 1:
+            raise ValueError("num_workers must be at least 1")
+
+        self._target = target
+        self._on_start = on_start
+        self._on_done = on_done
+        self._on_error = on_error
+        self.num_workers = num_workers
+        self.max_queue_size = max_queue_size
+
+        self._heap: list[tuple[int, int, str, tuple]] = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._running = False
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        """Start the job worker threads"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+
+        for i in range(self.num_workers):
+            thread = threading.Thread(
+                target=self._dispatch, name=f"job-worker-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop taking jobs from the queue and wait for running jobs to finish.
+
+        Args:
+            timeout: Seconds to wait in all (None waits for every job). The
+                workers are daemon threads: jobs still running then are cut
+                off with the process, and stay PROCESSING in the job store
+                for recovery to queue again on the next start.
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        running = sum(thread.is_alive() for thread in self._threads)
+        if running:
+            print(f"✗ {running} job(s) still running at shutdown; they resume on the next start")
+        self._threads.clear()
+
+    def submit(self, job_id: str, *args, priority: int = 0, force: bool = False) -> int:
+        """
+        Queue a job. Returns its 1-based queue position.
+
+        `force` admits the job even over `max_queue_size` (for jobs that were
+        already accepted, e.g. requeued after a restart).
+
+        Raises:
+            QueueFullError: if `max_queue_size` jobs are already waiting
+        """
+        with self._cond:
+            if not force and len(self._heap) >= self.max_queue_size:
+                raise QueueFullError(
+                    f"Job queue is full ({self.max_queue_size} jobs waiting)"
+                )
+            entry = (-priority, next(self._counter), job_id, args)
+            heapq.heappush(self._heap, entry)
+            self._cond.notify()
+            return self._position_locked(job_id)
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """1-based position of a waiting job, or None if it is not queued"""
+        with self._cond:
+            return self._position_locked(job_id)
+
+    def queue_length(self) -> int:
+        """Number of jobs waiting for a worker"""
+        with self._cond:
+            return len(self._heap)
+
+    def _position_locked(self, job_id: str) -> Optional[int]:
+        for position, entry in enumerate(sorted(self._heap), start=1):
+            if entry[2] == job_id:
+                return position
+        return None
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and not self._heap:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                _, _, job_id, args = heapq.heappop(self._heap)
+
+            try:
+                self._on_start(job_id)
+                result = self._target(job_id, *args)
+            except Exception as e:
+                self._run_callback(self._on_error, job_id, e)
+            else:
+                self._run_callback(self._on_done, job_id, result)
+
+    @staticmethod
+    def _run_callback(callback: Callable, job_id: str, value: Any) -> None:
+        """Run on_done/on_error; a failing callback must not kill the worker"""
+        try:
+            callback(job_id, value)
+        except Exception:
+            print(f"✗ {callback.__name__} failed for job {job_id}:")
+            traceback.print_exc()
+
+
+def worker_count_from_env() -> int:
+    """JOB_WORKERS, the number of jobs allowed in flight at once"""
+    return int(os.getenv("JOB_WORKERS", 4))
+
+
+def queue_size_from_env() -> int:
+    """JOB_QUEUE_SIZE, the number of waiting jobs before uploads get a 429"""
+    return int(os.getenv("JOB_QUEUE_SIZE", 20))
+
+
+def shutdown_timeout_from_env() -> float:
+    """JOB_SHUTDOWN_SECONDS, how long shutdown waits for running jobs"""
+    return float(os.getenv("JOB_SHUTDOWN_SECONDS", 10))
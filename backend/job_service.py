@@ -1,65 +1,258 @@
+import os
+import threading
+import time
 from enum import Enum
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 from pathlib import Path
 
+from job_store import JobRecord, JobStore, job_store
+from registry import StripedRegistry
+
 
 class JobStatus(Enum):
     """Enum for job statuses"""
 
+    QUEUED = "queued"
     PROCESSING = "processing"
     DONE = "done"
+    FAILED = "failed"
+
+
+# Progress counters reported by GET /status/{job_id}
+PROGRESS_FIELDS = (
+    "segments_planned",
+    "lines_planned",
+    "lines_synthesized",
+    "segments_rendered",
+)
+
+# Event logs of finished jobs are dropped this many seconds after they
+# finish (their status, stages and videos stay in the job store)
+JOB_EVENTS_TTL = float(os.getenv("JOB_EVENTS_TTL", 3600))
+
+
+class JobEvent:
+    """A progress event published for a job"""
+
+    __slots__ = ("seq", "event", "data", "created_at")
+
+    seq: int
+    event: str
+    data: Dict[str, Any]
+    created_at: float
+
+    def __init__(self, seq: int, event: str, data: Dict[str, Any]):
+        self.seq = seq
+        self.event = event
+        self.data = data
+        self.created_at = time.time()
+
+
+class JobEventLog:
+    """
+    A job's events, in order. Appends hold the log's own lock; the list only
+    ever grows and appending or slicing it is atomic, so readers take a
+    consistent snapshot without locking.
+
+    A log that replaces an earlier one (a requeued job) numbers its events
+    on from `start_seq`, so a client resuming with Last-Event-ID carries on.
+    """
+
+    __slots__ = ("events", "start_seq", "finished_at", "_lock")
+
+    events: list[JobEvent]
+    start_seq: int  # Sequence number before the first event
+    finished_at: Optional[float]  # time.monotonic() when the job finished
+
+    def __init__(self, start_seq: int = 0):
+        self.events = []
+        self.start_seq = start_seq
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def last_seq(self) -> int:
+        return self.start_seq + len(self.events)
+
+    def append(self, event: str, data: Dict[str, Any]) -> JobEvent:
+        with self._lock:
+            job_event = JobEvent(self.last_seq + 1, event, data)
+            self.events.append(job_event)
+        return job_event
+
+    def after(self, seq: int) -> list[JobEvent]:
+        """Events with a sequence number greater than `seq`"""
+        if seq > self.last_seq:
+            # The client saw a log that's gone (lost in a restart): replay this one
+            seq = self.start_seq
+        return self.events[max(seq - self.start_seq, 0):]
+
+    def expired(self, now: float, ttl: float) -> bool:
+        return self.finished_at is not None and now - self.finished_at >= ttl
 
 
 class JobService:
-    """Service to manage job statuses in memory"""
+    """
+    Service to manage jobs: statuses, progress, stages and videos are kept in
+    the persistent job store; the event log streamed to clients is in memory
+    """
 
-    def __init__(self):
-        self._jobs: Dict[str, JobStatus] = {}
-        self._job_to_vids: Dict[str, str] = {}
+    def __init__(self, store: JobStore = job_store, events_ttl: float = JOB_EVENTS_TTL):
+        self._store = store
+        # Written from pipeline threads, read by every SSE stream
+        self._events: StripedRegistry[JobEventLog] = StripedRegistry()
+        self._events_ttl = events_ttl
+        self._next_eviction = time.monotonic() + min(events_ttl, 60.0)
 
-    def create_job(self, job_id: str) -> None:
-        """Create a new job with PROCESSING status"""
-        self._jobs[job_id] = JobStatus.PROCESSING
+    def create_job(
+        self,
+        job_id: str,
+        status: JobStatus = JobStatus.PROCESSING,
+        pdf_path: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Create a new job, with PROCESSING status by default.
 
-    def update_status(self, job_id: str, status: JobStatus) -> None:
+        `pdf_path` and `options` (how the job was submitted) are stored so
+        the job can be requeued after a restart.
+        """
+        self._store.create_job(job_id, status.value, pdf_path, options)
+        self._events.put(job_id, JobEventLog())
+        if time.monotonic() >= self._next_eviction:
+            self.evict_finished()
+
+    def remove_job(self, job_id: str) -> None:
+        """Forget a job and its videos (e.g. when it could not be queued)"""
+        self._store.delete_job(job_id)
+        self._events.pop(job_id)
+
+    def requeue_job(self, job_id: str, from_status: Optional[JobStatus] = None) -> bool:
+        """
+        Put an interrupted or failed job back in QUEUED. Progress is counted
+        again; stages and published videos are kept for the run to resume from.
+
+        Returns:
+            False if the job doesn't exist or isn't in `from_status` (if given)
+        """
+        if not self._store.reset_job(
+            job_id, JobStatus.QUEUED.value, from_status.value if from_status else None
+        ):
+            return False
+        previous = self._events.get(job_id)
+        self._events.put(job_id, JobEventLog(previous.last_seq if previous is not None else 0))
+        return True
+
+    def get_job(self, job_id: str) -> Optional[JobRecord]:
+        """Get a job's stored record (PDF path, submit options, error)"""
+        return self._store.get_job(job_id)
+
+    def jobs_with_status(self, *statuses: JobStatus) -> list[JobRecord]:
+        """Jobs in any of the given statuses, oldest first"""
+        return self._store.jobs_with_status(*(status.value for status in statuses))
+
+    def update_status(self, job_id: str, status: JobStatus, error: Optional[str] = None) -> None:
         """Update the status of a job"""
-        if job_id not in self._jobs:
+        if not self._store.set_status(job_id, status.value, error):
             raise ValueError(f"Job {job_id} not found")
-        self._jobs[job_id] = status
 
     def get_status(self, job_id: str) -> Optional[JobStatus]:
         """Get the status of a job"""
-        return self._jobs.get(job_id)
+        status = self._store.get_status(job_id)
+        return JobStatus(status) if status is not None else None
+
+    def mark_processing(self, job_id: str) -> None:
+        """Mark a queued job as picked up by a worker"""
+        self.update_status(job_id, JobStatus.PROCESSING)
 
     def mark_done(self, job_id: str) -> None:
         """Mark a job as done"""
         self.update_status(job_id, JobStatus.DONE)
+        self._finish_events(job_id)
+
+    def mark_failed(self, job_id: str, error: str) -> None:
+        """Mark a job as failed, keeping the error for GET /status"""
+        self.update_status(job_id, JobStatus.FAILED, error)
+        self._finish_events(job_id)
 
     def add_video(self, job_id: str, vid_id: str) -> None:
         """Add a video to a job"""
-        if job_id not in self._jobs:
+        if self.get_status(job_id) is None:
             raise ValueError(f"Job {job_id} not found")
-        if job_id not in self._job_to_vids:
-            self._job_to_vids[job_id] = []
-        self._job_to_vids[job_id].append(vid_id)
+        self._store.add_job_video(job_id, vid_id)
 
-    def get_videos(self, job_id: str) -> list[Path]:
-        """Get all videos for a job"""
-        return self._job_to_vids.get(job_id, [])
+    def get_videos(self, job_id: str) -> list[str]:
+        """Get all videos for a job (the ones rendered so far while it is processing)"""
+        return self._store.get_job_videos(job_id)
 
     def set_videos(self, job_id: str, vid_ids: list[str]) -> None:
         """Set all videos for a job (replaces existing list)"""
-        if job_id not in self._jobs:
+        if self.get_status(job_id) is None:
+            raise ValueError(f"Job {job_id} not found")
+        self._store.set_job_videos(job_id, vid_ids)
+
+    def add_progress(self, job_id: str, field: str, amount: int = 1) -> None:
+        """Increment one of the PROGRESS_FIELDS counters of a job"""
+        if field not in PROGRESS_FIELDS:
+            raise ValueError(f"Unknown progress field {field}")
+        if not self._store.add_progress(job_id, field, amount):
             raise ValueError(f"Job {job_id} not found")
-        self._job_to_vids[job_id] = vid_ids
 
-    # def get_all_jobs(self) -> Dict[str, JobStatus]:
-    #     """Get all jobs and their statuses"""
-    #     return self._jobs.copy()
+    def get_progress(self, job_id: str) -> Optional[Dict[str, int]]:
+        """Get a snapshot of a job's progress counters"""
+        if self.get_status(job_id) is None:
+            return None
+        return {**dict.fromkeys(PROGRESS_FIELDS, 0), **self._store.get_progress(job_id)}
+
+    def set_stage(
+        self, job_id: str, stage: str, status: str, detail: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Record the state of one pipeline stage of a job (e.g. "segment 2:render")"""
+        self._store.set_stage(job_id, stage, status, detail)
+
+    def get_stages(self, job_id: str) -> list[Dict[str, Any]]:
+        """A job's recorded stages, in the order they were last updated"""
+        return self._store.get_stages(job_id)
+
+    def publish_event(self, job_id: str, event: str, data: Dict[str, Any]) -> None:
+        """Append an event to a job's event log (streamed by GET /events/{job_id})"""
+        log = self._events.get(job_id)
+        if log is None:
+            # A job from before a restart (or whose log expired) gets a fresh log
+            if self._store.get_status(job_id) is None:
+                raise ValueError(f"Job {job_id} not found")
+            log = self._events.get_or_create(job_id, JobEventLog)
+        log.append(event, data)
+
+    def get_events(self, job_id: str, after: int = 0) -> list[JobEvent]:
+        """Get a job's events with a sequence number greater than `after`"""
+        log = self._events.get(job_id)
+        return log.after(after) if log is not None else []
+
+    def has_event_log(self, job_id: str) -> bool:
+        """False once a finished job's log was evicted (or lost in a restart)"""
+        return self._events.get(job_id) is not None
+
+    def _finish_events(self, job_id: str) -> None:
+        log = self._events.get(job_id)
+        if log is not None:
+            log.finished_at = time.monotonic()
+
+    def evict_finished(self) -> int:
+        """
+        Drop the event logs of jobs that finished more than JOB_EVENTS_TTL
+        seconds ago. Runs by itself as new jobs are created.
+
+        Returns:
+            Number of logs dropped
+        """
+        now = time.monotonic()
+        self._next_eviction = now + min(self._events_ttl, 60.0)
+        return self._events.evict(lambda log: log.expired(now, self._events_ttl))
 
     # def job_exists(self, job_id: str) -> bool:
     #     """Check if a job exists"""
-    #     return job_id in self._jobs
+    #     return self.get_status(job_id) is not None
 
 
 # Global instance
@@ -0,0 +1,283 @@
+"""
+Embedded persistent store for jobs, videos and per-stage state.
+
+SQLite in WAL mode: status polls and the video feed read while the pipeline
+writes, without blocking each other, and everything survives a restart of
+the server. Every thread gets its own connection; each write is a single
+statement or one short transaction.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from pdf_parser.workspace import DATA_DIR
+
+JOB_STORE_PATH = Path(os.getenv("JOB_STORE_PATH", DATA_DIR / "mr_team.db"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    pdf_path TEXT,
+    options TEXT NOT NULL DEFAULT '{}',
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, created_at);
+
+CREATE TABLE IF NOT EXISTS progress (
+    job_id TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (job_id, field)
+);
+
+CREATE TABLE IF NOT EXISTS stages (
+    job_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    status TEXT NOT NULL,
+    detail TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, stage)
+);
+
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+
+-- A video can belong to several jobs (deduplicated uploads share videos)
+CREATE TABLE IF NOT EXISTS job_videos (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    video_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS job_videos_by_job ON job_videos (job_id, seq);
+"""
+
+
+class JobRecord:
+    """A job row"""
+
+    __slots__ = ("job_id", "status", "pdf_path", "options", "error", "created_at", "updated_at")
+
+    job_id: str
+    status: str
+    pdf_path: Optional[str]
+    options: Dict[str, Any]  # How the job was submitted (renderer, profile, ...)
+    error: Optional[str]
+    created_at: float
+    updated_at: float
+
+    def __init__(self, row: sqlite3.Row):
+        self.job_id = row["job_id"]
+        self.status = row["status"]
+        self.pdf_path = row["pdf_path"]
+        self.options = json.loads(row["options"])
+        self.error = row["error"]
+        self.created_at = row["created_at"]
+        self.updated_at = row["updated_at"]
+
+
+class JobStore:
+    """SQLite store behind JobService and VideoMetadataService"""
+
+    def __init__(self, path: Path = JOB_STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._db().executescript(_SCHEMA)
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            # Autocommit; multi-statement writes use _transaction()
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            # WAL keeps committed data safe across a process crash with NORMAL
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    ### Jobs ###
+
+    def create_job(
+        self,
+        job_id: str,
+        status: str,
+        pdf_path: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Insert a job, replacing any previous job with the same id"""
+        now = time.time()
+        with self._transaction() as db:
+            self._clear_job_state(db, job_id)
+            db.execute(
+                "INSERT OR REPLACE INTO jobs"
+                " (job_id, status, pdf_path, options, error, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, NULL, ?, ?)",
+                (job_id, status, pdf_path, json.dumps(options or {}), now, now),
+            )
+
+    def delete_job(self, job_id: str) -> None:
+        with self._transaction() as db:
+            self._clear_job_state(db, job_id)
+            db.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def reset_job(self, job_id: str, status: str, from_status: Optional[str] = None) -> bool:
+        """
+        Put a job back to `status` to run again. Its progress counters start
+        over; stages and videos are kept, since the run resumes from them.
+
+        With `from_status`, only a job currently in that status is reset, as
+        one conditional update (so concurrent callers can't both succeed).
+
+        Returns:
+            False if there is no such job (in `from_status`)
+        """
+        query = "UPDATE jobs SET status = ?, error = NULL, updated_at = ? WHERE job_id = ?"
+        params: tuple = (status, time.time(), job_id)
+        if from_status is not None:
+            query += " AND status = ?"
+            params += (from_status,)
+        with self._transaction() as db:
+            if db.execute(query, params).rowcount == 0:
+                return False
+            db.execute("DELETE FROM progress WHERE job_id = ?", (job_id,))
+        return True
+
+    @staticmethod
+    def _clear_job_state(db: sqlite3.Connection, job_id: str) -> None:
+        for table in ("progress", "stages", "job_videos"):
+            db.execute(f"DELETE FROM {table} WHERE job_id = ?", (job_id,))
+
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None) -> bool:
+        """Update a job's status (and error). Returns False if there is no such job"""
+        cursor = self._db().execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE job_id = ?",
+            (status, error, time.time(), job_id),
+        )
+        return cursor.rowcount > 0
+
+    def get_job(self, job_id: str) -> Optional[JobRecord]:
+        row = self._db().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return JobRecord(row) if row is not None else None
+
+    def get_status(self, job_id: str) -> Optional[str]:
+        row = self._db().execute("SELECT status FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return row["status"] if row is not None else None
+
+    def jobs_with_status(self, *statuses: str) -> list[JobRecord]:
+        """Jobs in any of `statuses`, oldest first"""
+        placeholders = ", ".join("?" for _ in statuses)
+        rows = self._db().execute(
+            f"SELECT * FROM jobs WHERE status IN ({placeholders}) ORDER BY created_at",
+            statuses,
+        )
+        return [JobRecord(row) for row in rows]
+
+    ### Progress counters ###
+
+    def add_progress(self, job_id: str, field: str, amount: int) -> bool:
+        """Add to a counter. Returns False if there is no such job"""
+        cursor = self._db().execute(
+            "INSERT INTO progress (job_id, field, value)"
+            " SELECT ?, ?, ? WHERE EXISTS (SELECT 1 FROM jobs WHERE job_id = ?)"
+            " ON CONFLICT (job_id, field) DO UPDATE SET value = value + excluded.value",
+            (job_id, field, amount, job_id),
+        )
+        return cursor.rowcount > 0
+
+    def get_progress(self, job_id: str) -> Dict[str, int]:
+        rows = self._db().execute("SELECT field, value FROM progress WHERE job_id = ?", (job_id,))
+        return {row["field"]: row["value"] for row in rows}
+
+    ### Stages ###
+
+    def set_stage(
+        self, job_id: str, stage: str, status: str, detail: Optional[Dict[str, Any]] = None
+    ) -> None:
+        self._db().execute(
+            "INSERT OR REPLACE INTO stages (job_id, stage, status, detail, updated_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (job_id, stage, status, json.dumps(detail) if detail else None, time.time()),
+        )
+
+    def get_stages(self, job_id: str) -> list[Dict[str, Any]]:
+        rows = self._db().execute(
+            "SELECT stage, status, detail, updated_at FROM stages WHERE job_id = ?"
+            " ORDER BY updated_at",
+            (job_id,),
+        )
+        return [
+            {
+                "stage": row["stage"],
+                "status": row["status"],
+                "detail": json.loads(row["detail"]) if row["detail"] else None,
+                "updated_at": row["updated_at"],
+            }
+            for row in rows
+        ]
+
+    ### Videos ###
+
+    def add_video(self, video_id: str, path: str) -> None:
+        self._db().execute(
+            "INSERT OR REPLACE INTO videos (video_id, path, created_at) VALUES (?, ?, ?)",
+            (video_id, path, time.time()),
+        )
+
+    def get_video_path(self, video_id: str) -> Optional[str]:
+        row = self._db().execute(
+            "SELECT path FROM videos WHERE video_id = ?", (video_id,)
+        ).fetchone()
+        return row["path"] if row is not None else None
+
+    def remove_video(self, video_id: str) -> bool:
+        with self._transaction() as db:
+            db.execute("DELETE FROM job_videos WHERE video_id = ?", (video_id,))
+            cursor = db.execute("DELETE FROM videos WHERE video_id = ?", (video_id,))
+        return cursor.rowcount > 0
+
+    def add_job_video(self, job_id: str, video_id: str) -> None:
+        self._db().execute(
+            "INSERT INTO job_videos (job_id, video_id) VALUES (?, ?)", (job_id, video_id)
+        )
+
+    def set_job_videos(self, job_id: str, video_ids: list[str]) -> None:
+        with self._transaction() as db:
+            db.execute("DELETE FROM job_videos WHERE job_id = ?", (job_id,))
+            db.executemany(
+                "INSERT INTO job_videos (job_id, video_id) VALUES (?, ?)",
+                [(job_id, video_id) for video_id in video_ids],
+            )
+
+    def get_job_videos(self, job_id: str) -> list[str]:
+        rows = self._db().execute(
+            "SELECT video_id FROM job_videos WHERE job_id = ? ORDER BY seq", (job_id,)
+        )
+        return [row["video_id"] for row in rows]
+
+
+# Global instance
+job_store = JobStore()
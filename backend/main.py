@@ -1,20 +1,48 @@
+import asyncio
+import json
 import os
+import shutil
+import time
 import uuid
-import threading
 from pathlib import Path
-from stitching_service import overlay_audio_on_video
-from job_service import job_service
-from audio_service import merge_audio
+from job_service import job_service, JobStatus
+from job_scheduler import (
+    JobScheduler,
+    QueueFullError,
+    queue_size_from_env,
+    shutdown_timeout_from_env,
+    worker_count_from_env,
+)
+from job_runner import run_job, stage_pools
+from image_service import DEFAULT_RENDERER, RENDERERS
+from render_profiles import DEFAULT_RENDER_PROFILE, RENDER_PROFILES
 from video_metadata_service import video_metadata_service
+from video_response import VideoFileResponse
+from hls_service import (
+    HLS_PACKAGING,
+    MEDIA_TYPES,
+    PLAYLIST_NAME,
+    package_dir,
+    package_file,
+    package_hls,
+)
+from dedup_service import dedup_service, pdf_content_key, text_content_key
+from upload_service import MAX_UPLOAD_BYTES, UploadTooLargeError, save_upload
+from pdf_parser.pdf_plumber import extract_workspace_text
+from pdf_parser.workspace import Workspace, remove_job_workspace
+from pdf_parser.dialogue_to_voice import tts_cache
+from pdf_parser.io_loop import io_loop
+from pdf_parser.claude_client import usage_stats
+from pdf_parser.llm_cache import llm_cache
+from pdf_parser.rate_limit import claude_limiter, tts_limiter
 
 # from pdf_parser.pdf_plumber import extract_text_from_pdf
-from pdf_parser.generate_audio import generate_audio
-from generate_videos import generate_videos, load_metadata
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, Request
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
+from typing import Optional
 
 app = FastAPI(title="MR-Team: Brainrot Video Generator")
 
@@ -38,19 +66,51 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Multipart framing allowed on top of the PDF itself
+UPLOAD_OVERHEAD_BYTES = 64 * 1024
+
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """
+    Refuse uploads whose declared size is already over the limit, before the
+    body is read. Chunked uploads without a Content-Length are still capped
+    by save_upload while they are streamed to disk.
+    """
+    if request.method == "POST" and request.url.path == "/generate":
+        declared = request.headers.get("content-length")
+        if declared and declared.isdigit() and (
+            int(declared) > MAX_UPLOAD_BYTES + UPLOAD_OVERHEAD_BYTES
+        ):
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"Upload exceeds the {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit"},
+            )
+    return await call_next(request)
+
+
 # Create directories on startup
 UPLOAD_DIR = Path("data/pdf_data")
 OUTPUT_DIR = Path("outputs")
 UPLOAD_DIR.mkdir(exist_ok=True)
 OUTPUT_DIR.mkdir(exist_ok=True)
 
-AUDIO_DIR = Path("data/voice_output")
-MERGED_AUDIO_OUTPUT_DIR = Path("audio")
+# How often an SSE stream checks for new job events, and sends keep-alives
+SSE_POLL_SECONDS = 0.5
+SSE_KEEPALIVE_SECONDS = 15
+
+# Longest a job waits for another job with the same PDF text before it
+# renders the videos itself
+DEDUP_WAIT_SECONDS = float(os.getenv("DEDUP_WAIT_SECONDS", 600))
 
 
 class GenerateResponse(BaseModel):
     job_id: str
     message: str
+    queue_position: Optional[int] = None
+    # Set when the upload matched an existing job, whose id is returned
+    deduplicated: bool = False
+    videos: list[str] = []
 
 
 @app.get("/")
@@ -58,116 +118,351 @@ def health_check():
     return {"status": "ok", "service": "mr-team"}
 
 
+@app.get("/stats")
+def get_stats():
+    """Cache hit/miss counters and sizes, and the current API rate limits."""
+    return {
+        "tts_cache": tts_cache.stats(),
+        "llm_cache": llm_cache.stats(),
+        "tts_limiter": tts_limiter.stats(),
+        "claude_limiter": claude_limiter.stats(),
+        "claude_usage": usage_stats(),
+    }
+
+
 @app.post("/generate", response_model=GenerateResponse)
-async def generate_video(pdf: UploadFile = File(...)):
-    """Upload PDF and generate brainrot video."""
+async def generate_video(
+    pdf: UploadFile = File(...),
+    priority: int = Form(0),
+    renderer: str = Form(DEFAULT_RENDERER),
+    profile: str = Form(DEFAULT_RENDER_PROFILE),
+):
+    """Upload PDF and queue it for brainrot video generation."""
 
     if not pdf.filename.lower().endswith(".pdf"):
         raise HTTPException(400, "Only PDF files allowed")
+    if renderer not in RENDERERS:
+        raise HTTPException(400, f"Unknown renderer, expected one of {list(RENDERERS)}")
+    if profile not in RENDER_PROFILES:
+        raise HTTPException(
+            400, f"Unknown render profile, expected one of {list(RENDER_PROFILES)}"
+        )
 
     job_id = str(uuid.uuid4())
 
-    # Save the PDF file to UPLOAD_DIR
+    # Stream the PDF to UPLOAD_DIR, hashing it as it is written
     pdf_path = UPLOAD_DIR / f"{job_id}.pdf"
-    with open(pdf_path, "wb") as f:
-        f.write(await pdf.read())
-
-    # Create job immediately
-    job_service.create_job(job_id)
-
-    # Start processing in background thread
-    thread = threading.Thread(
-        target=process_job_background, args=(job_id, pdf_path), daemon=True
+    try:
+        upload = await save_upload(pdf, pdf_path)
+    except UploadTooLargeError as e:
+        raise HTTPException(413, str(e)) from e
+
+    # Byte-identical upload: hand back the job that already has (or is
+    # making) these videos instead of generating them again
+    content_key = pdf_content_key(upload.sha256, profile)
+    owner_id = dedup_service.claim(content_key, job_id)
+    if owner_id != job_id:
+        duplicate = describe_duplicate(owner_id)
+        if duplicate is not None:
+            os.remove(pdf_path)
+            return duplicate
+        # The owner is gone; take over the hash
+        dedup_service.take_over(content_key, owner_id, job_id)
+
+    # Create job immediately, then hand it to the worker pool. How it was
+    # submitted is stored with it, so it can be requeued after a restart.
+    job_service.create_job(
+        job_id,
+        JobStatus.QUEUED,
+        pdf_path=str(pdf_path),
+        options={
+            "renderer": renderer,
+            "profile": profile,
+            "priority": priority,
+            "content_key": content_key,
+        },
     )
-    thread.start()
+    try:
+        position = job_scheduler.submit(
+            job_id, str(pdf_path), renderer, profile, priority=priority
+        )
+    except QueueFullError as e:
+        job_service.remove_job(job_id)
+        dedup_service.forget_job(job_id)
+        os.remove(pdf_path)
+        raise HTTPException(429, str(e), headers={"Retry-After": "30"}) from e
 
     # Return immediately with job_id
-    return GenerateResponse(job_id=job_id, message="Processing started")
-
+    return GenerateResponse(
+        job_id=job_id, message="Job queued", queue_position=position
+    )
 
-def process_job_background(job_id: str, pdf_path: str):
-    """Background thread to process the job"""
-    try:
-        # Save uploaded PDF
-        generate_audio()
-        # Load metadata to get audio filenames for each segment
-        metadata = load_metadata()
-
-        # Generate videos for each segment
-        segment_to_vid_path = generate_videos()
-
-        # For each segment, get audio files and process
-        for segment_name, vid_path in segment_to_vid_path.items():
-            segment_metadata = metadata[segment_name]
-            audio_filenames = segment_metadata.get("filename", [])
-
-            # Convert filenames to full paths
-            audio_paths = [AUDIO_DIR / filename for filename in audio_filenames]
-
-            # Merge audio files for this segment
-            merged_audio_filename = f"{segment_name.replace(' ', '_')}_merged.mp3"
-            merged_audio_path = merge_audio(
-                audio_paths, MERGED_AUDIO_OUTPUT_DIR / merged_audio_filename
-            )
 
-            # Overlay audio onto video for this segment
-            video_id = str(uuid.uuid4())
-            final_video_path = OUTPUT_DIR / f"{video_id}.mp4"
-            final_video_path = overlay_audio_on_video(
-                str(vid_path), str(merged_audio_path), str(final_video_path)
+def describe_duplicate(owner_id: str) -> Optional[GenerateResponse]:
+    """Response pointing at an existing job, or None if it can't be reused"""
+    status = job_service.get_status(owner_id)
+    if status in (JobStatus.QUEUED, JobStatus.PROCESSING):
+        return GenerateResponse(
+            job_id=owner_id,
+            message="Attached to in-flight job",
+            queue_position=job_scheduler.queue_position(owner_id),
+            deduplicated=True,
+            videos=job_service.get_videos(owner_id),
+        )
+    if status == JobStatus.DONE:
+        videos = existing_videos(owner_id)
+        if videos:
+            return GenerateResponse(
+                job_id=owner_id,
+                message="Already generated",
+                deduplicated=True,
+                videos=videos,
             )
+    return None
+
+
+def existing_videos(job_id: str) -> list[str]:
+    """A job's video IDs that are still registered"""
+    return [
+        video_id
+        for video_id in job_service.get_videos(job_id)
+        if video_metadata_service.video_metadata_exists(video_id)
+    ]
+
+
+def reuse_duplicate_job(job_id: str, owner_id: str) -> bool:
+    """
+    Wait for the job that owns the same PDF text and copy its videos.
+
+    Returns:
+        False if the owner failed, is still running after DEDUP_WAIT_SECONDS
+        or has no videos to reuse
+    """
+    if not dedup_service.wait_finished(owner_id, DEDUP_WAIT_SECONDS):
+        print(f"✗ Job {owner_id} is taking too long, job {job_id} renders its own videos")
+        return False
+    if job_service.get_status(owner_id) != JobStatus.DONE:
+        return False
+
+    videos = existing_videos(owner_id)
+    for video_id in videos:
+        job_service.add_video(job_id, video_id)
+        job_service.publish_event(job_id, "video_ready", {"video_id": video_id})
+    return bool(videos)
+
+
+def process_job(
+    job_id: str,
+    pdf_path: str,
+    renderer: str = DEFAULT_RENDERER,
+    profile: str = DEFAULT_RENDER_PROFILE,
+) -> dict[str, str]:
+    """Run a job's pipeline, publishing progress and videos as they happen"""
+    # Text-identical PDF (e.g. re-exported slides): reuse the other job's videos
+    workspace = Workspace.for_job(job_id, Path(pdf_path))
+    text = extract_workspace_text(workspace)
+    if text:
+        content_key = text_content_key(text, profile)
+        owner_id = dedup_service.claim(content_key, job_id)
+        while owner_id != job_id:
+            if reuse_duplicate_job(job_id, owner_id):
+                print(f"✓ Job {job_id} reused the videos of job {owner_id}")
+                return {}
+            # Nothing to reuse from the owner; take over the text only, the
+            # owner may still be running and keeps its upload's hash
+            owner_id = dedup_service.take_over(content_key, owner_id, job_id)
+
+    return run_job(
+        job_id,
+        pdf_path,
+        on_event=lambda event, data: on_pipeline_event(job_id, event, data),
+        renderer=renderer,
+        profile=profile,
+    )
 
-            # Add video to job and metadata service
-            job_service.add_video(job_id, final_video_path)
-            video_metadata_service.add_video_metadata(video_id, final_video_path)
-
-            # upload 
-
-        # Mark job as done
-        job_service.mark_done(job_id)
-        print(f"✓ Job {job_id} completed")
-
-        # Delete PDF
-        os.remove(pdf_path)
-
-    except Exception as e:
-        print(f"✗ Error processing job {job_id}: {e}")
 
-        # extracted_text = extract_text_from_pdf(str(pdf_path))
-        # if not extracted_text or not extracted_text.strip():
-        #     raise HTTPException(400, "No extractable text found in PDF")
+def find_stage(job_id: str, stage_name: str) -> Optional[dict]:
+    """A job's stage entry by name, or None"""
+    return next(
+        (stage for stage in job_service.get_stages(job_id) if stage["stage"] == stage_name),
+        None,
+    )
 
-        # TODO: Process the PDF and generate video
-        # 1. Extract text from PDF
-        # 2. Generate Rick & Morty script with OpenAI
-        # 3. Generate audio -> return audio files
-        # 4. Compose video with brainrot background
 
-        # Darren returns { chunkId: audiometadata[], }
-        # For each chunk:
-        # Kai stitches images onto background video for one chunk -> returns video paths
-        # image_service.stitch(chunkToAudio) -> { chunkId: videoPaths[] }
-        # audio_service.merge(audioPaths[]) -> audioPath
-        # stitching_service.overlay_audio_and_video(videoPath, audioPath) -> output_video_path
-        # update JOB and VIDEOMETADATA
+def publish_segment_video(job_id: str, segment_name: str, rendered_path: str) -> str:
+    """
+    Publish a rendered segment as one of the job's videos.
+
+    Idempotent per segment: the video ID is recorded in the segment's render
+    stage before anything else, so a run that crashed partway (before the
+    pipeline checkpointed the segment as published) finishes publishing the
+    same video on retry instead of adding a second one.
+
+    Returns:
+        The video ID
+    """
+    stage_name = f"{segment_name}:render"
+    stage = find_stage(job_id, stage_name)
+    video_id = stage["detail"]["video_id"] if stage and stage["detail"] else None
+    if stage is not None and stage["status"] == "done" and video_id is not None:
+        # Already published; the new render is a duplicate
+        Path(rendered_path).unlink(missing_ok=True)
+        return video_id
+
+    video_id = video_id or str(uuid.uuid4())
+    job_service.set_stage(job_id, stage_name, "publishing", {"video_id": video_id})
+    final_video_path = OUTPUT_DIR / f"{video_id}.mp4"
+    shutil.move(str(rendered_path), final_video_path)
+    if HLS_PACKAGING:
+        try:
+            package_hls(final_video_path, package_dir(OUTPUT_DIR, video_id))
+        except Exception as e:
+            # The MP4 alone still plays
+            print(f"✗ HLS packaging failed for video {video_id}: {e}")
+
+    # Add video to job and metadata service
+    video_metadata_service.add_video_metadata(video_id, final_video_path)
+    if video_id not in job_service.get_videos(job_id):
+        job_service.add_video(job_id, video_id)
+    job_service.set_stage(job_id, stage_name, "done", {"video_id": video_id})
+    return video_id
+
+
+def on_pipeline_event(job_id: str, event: str, data: dict):
+    """Update a job's progress counters, stages and event stream from the pipeline"""
+    if event == "segments_planned":
+        job_service.add_progress(job_id, "segments_planned", data["count"])
+        job_service.set_stage(job_id, "segmentation", "done", {"segments": data["count"]})
+    elif event == "lines_planned":
+        job_service.add_progress(job_id, "lines_planned", data["count"])
+    elif event == "line_synthesized":
+        if data["success"]:
+            job_service.add_progress(job_id, "lines_synthesized")
+        job_service.set_stage(
+            job_id,
+            f"{data['segment']}:line {data['line']}",
+            "done" if data["success"] else "failed",
+            {"speaker": data["speaker"]},
+        )
+    elif event == "segment_rendered":
+        # Publish the video right away so the feed can play it while the
+        # remaining segments are still rendering
+        video_id = publish_segment_video(job_id, data["segment"], data["path"])
+        job_service.add_progress(job_id, "segments_rendered")
+        data = {"segment": data["segment"], "video_id": video_id}
+        event = "video_ready"
+    elif event == "segment_restored":
+        # Published before the job was retried; announce its video again
+        job_service.add_progress(job_id, "segments_rendered")
+        render_stage = find_stage(job_id, f"{data['segment']}:render")
+        if render_stage is None or not render_stage["detail"]:
+            return
+        data = {"segment": data["segment"], "video_id": render_stage["detail"]["video_id"]}
+        event = "video_ready"
+
+    job_service.publish_event(job_id, event, data)
+
+
+def on_job_done(job_id: str, segment_to_vid_path: dict[str, str]):
+    """Finish a job once all of its segments are published"""
+    # Mark job as done
+    job_service.mark_done(job_id)
+    dedup_service.mark_finished(job_id)
+    job_service.publish_event(
+        job_id, "done", {"videos": job_service.get_videos(job_id)}
+    )
+    print(f"✓ Job {job_id} completed")
+
+    # Delete PDF, and the workspace: the videos are published and a done
+    # job is never retried (nor is one that reused another job's videos)
+    (UPLOAD_DIR / f"{job_id}.pdf").unlink(missing_ok=True)
+    remove_job_workspace(job_id)
+
+
+def on_job_error(job_id: str, error: Exception):
+    print(f"✗ Error processing job {job_id}: {error}")
+    job_service.mark_failed(job_id, str(error) or type(error).__name__)
+    # Let the next upload of the same PDF try again
+    dedup_service.forget_job(job_id)
+    dedup_service.mark_finished(job_id)
+    job_service.publish_event(job_id, "error", {"message": str(error)})
+
+
+job_scheduler = JobScheduler(
+    target=process_job,
+    on_start=job_service.mark_processing,
+    on_done=on_job_done,
+    on_error=on_job_error,
+    num_workers=worker_count_from_env(),
+    max_queue_size=queue_size_from_env(),
+)
 
-        # background_video_path = Path("storage/outputs/minecraft_parkour_video.mp4")
-        # if not background_video_path.exists():
-        #     raise HTTPException(500, "Background video missing")
 
-        # video_id = str(uuid.uuid4())
-        # output_video_path = OUTPUT_DIR / f"{video_id}.mp4"
-        # if not output_video_path.exists():
-        #     try:
-        #         output_video_path.symlink_to(background_video_path)
-        #     except OSError:
-        #         os.link(background_video_path, output_video_path)
+@app.on_event("startup")
+def start_job_scheduler():
+    job_scheduler.start()
+    recover_jobs()
+
+
+def recover_jobs():
+    """
+    Pick up where the last run of the server stopped.
+
+    Jobs still queued or processing were interrupted: they are requeued
+    and resume from their checkpoints (videos published so far are kept)
+    or, if their PDF is gone, marked failed. Finished jobs get their upload
+    hashes back so re-uploads are still deduplicated.
+    """
+    for job in job_service.jobs_with_status(JobStatus.DONE):
+        if job.options.get("content_key"):
+            dedup_service.claim(job.options["content_key"], job.job_id)
+            dedup_service.mark_finished(job.job_id)
+
+    for job in job_service.jobs_with_status(JobStatus.QUEUED, JobStatus.PROCESSING):
+        if not job.pdf_path or not Path(job.pdf_path).exists():
+            job_service.mark_failed(job.job_id, "Upload lost while the server was down")
+            # Can't be retried without its PDF, so nothing resumes from it
+            remove_job_workspace(job.job_id)
+            continue
+
+        resubmit_job(job)
+        print(f"✓ Requeued interrupted job {job.job_id}")
+
+
+def resubmit_job(
+    job, force: bool = True, from_status: Optional[JobStatus] = None
+) -> Optional[int]:
+    """
+    Queue a stored job again with the options it was submitted with. The
+    pipeline resumes from the checkpoints in the job's workspace.
+
+    Returns:
+        The job's queue position, or None if it wasn't in `from_status`
+        (e.g. another request already requeued it)
+
+    Raises:
+        QueueFullError: if the queue is full and `force` is False
+    """
+    if not job_service.requeue_job(job.job_id, from_status):
+        return None
+    dedup_service.mark_running(job.job_id)
+    if job.options.get("content_key"):
+        dedup_service.claim(job.options["content_key"], job.job_id)
+    return job_scheduler.submit(
+        job.job_id,
+        job.pdf_path,
+        job.options.get("renderer", DEFAULT_RENDERER),
+        job.options.get("profile", DEFAULT_RENDER_PROFILE),
+        priority=job.options.get("priority", 0),
+        force=force,
+    )
 
-        # video_metadata_service.add_video_metadata(video_id, output_video_path)
-        # job_service.set_videos(job_id, [video_id])
-        # job_service.mark_done(job_id)
 
-    return GenerateResponse(job_id=job_id, message="PDF uploaded successfully")
+@app.on_event("shutdown")
+def stop_job_scheduler():
+    job_scheduler.shutdown(shutdown_timeout_from_env())
+    stage_pools.shutdown()
+    io_loop.shutdown()
 
 
 @app.get("/status/{job_id}")
@@ -178,12 +473,112 @@ def get_status(job_id: str):
     if not status:
         raise HTTPException(404, "Job not found")
 
-    return {"job_id": job_id, "status": status.name.lower()}
+    response = {
+        "job_id": job_id,
+        "status": status.name.lower(),
+        "queue_position": job_scheduler.queue_position(job_id),
+        "progress": job_service.get_progress(job_id),
+        "stages": job_service.get_stages(job_id),
+        "videos_ready": len(job_service.get_videos(job_id)),
+    }
+    if status == JobStatus.FAILED:
+        response["error"] = job_service.get_job(job_id).error
+    return response
+
+
+@app.post("/jobs/{job_id}/retry", response_model=GenerateResponse)
+def retry_job(job_id: str):
+    """
+    Retry a failed job. It resumes from the first stage that didn't finish:
+    segmentation, dialogues, voiced lines, composites and published videos
+    from the failed run are reused.
+    """
+    job = job_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found")
+    if job.status != JobStatus.FAILED.value:
+        raise HTTPException(409, f"Only failed jobs can be retried (job is {job.status})")
+    if not job.pdf_path or not Path(job.pdf_path).exists():
+        raise HTTPException(410, "The job's PDF is no longer available, upload it again")
+
+    try:
+        position = resubmit_job(job, force=False, from_status=JobStatus.FAILED)
+    except QueueFullError as e:
+        job_service.mark_failed(job_id, job.error)
+        dedup_service.forget_job(job_id)
+        raise HTTPException(429, str(e), headers={"Retry-After": "30"}) from e
+    if position is None:
+        raise HTTPException(409, "The job is already being retried")
+    print(f"✓ Retrying job {job_id}")
+    return GenerateResponse(
+        job_id=job_id,
+        message="Job requeued",
+        queue_position=position,
+        videos=job_service.get_videos(job_id),
+    )
+
+
+# Server-Sent Events: pushes the job's progress events as they happen
+@app.get("/events/{job_id}")
+async def stream_job_events(job_id: str, request: Request):
+    """Stream a job's progress and video_ready events (text/event-stream)."""
+
+    if not job_service.get_status(job_id):
+        raise HTTPException(404, "Job not found")
+
+    # Resume after the last event the client saw, if it is reconnecting
+    last_event_id = request.headers.get("last-event-id", "0")
+    after = int(last_event_id) if last_event_id.isdigit() else 0
+
+    async def event_stream():
+        nonlocal after
+        last_sent = time.monotonic()
+        while not await request.is_disconnected():
+            events = job_service.get_events(job_id, after)
+            for job_event in events:
+                after = job_event.seq
+                yield (
+                    f"id: {job_event.seq}\n"
+                    f"event: {job_event.event}\n"
+                    f"data: {json.dumps(job_event.data)}\n\n"
+                )
+                if job_event.event in ("done", "error"):
+                    return
+            if events:
+                last_sent = time.monotonic()
+            elif not job_service.has_event_log(job_id) and (
+                terminal := finished_event(job_id)
+            ):
+                # Finished before the server restarted, or long enough ago
+                # that its log was evicted
+                yield f"event: {terminal[0]}\ndata: {json.dumps(terminal[1])}\n\n"
+                return
+            elif time.monotonic() - last_sent > SSE_KEEPALIVE_SECONDS:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            await asyncio.sleep(SSE_POLL_SECONDS)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def finished_event(job_id: str) -> Optional[tuple[str, dict]]:
+    """The terminal (event, data) of a finished job, from the store"""
+    status = job_service.get_status(job_id)
+    if status == JobStatus.DONE:
+        return "done", {"videos": job_service.get_videos(job_id)}
+    if status == JobStatus.FAILED:
+        return "error", {"message": job_service.get_job(job_id).error}
+    return None
+
 
 # Returns a VideoMetadata[] for a given job.
 @app.get("/videos/{job_id}/list")
 def get_videos_list(job_id: str):
-    """Get list of video IDs for a given job."""
+    """Get list of video IDs for a given job (grows as segments finish rendering)."""
 
     status = job_service.get_status(job_id)
     if not status:
@@ -192,60 +587,33 @@ def get_videos_list(job_id: str):
     video_ids = job_service.get_videos(job_id)
     # video_ids = [video.stem for video in videos]  # Extract filename without extension
 
-    return {"job_id": job_id, "videos": video_ids, "count": len(video_ids)}
+    return {
+        "job_id": job_id,
+        "status": status.name.lower(),
+        "videos": video_ids,
+        "count": len(video_ids),
+        # HLS playlists of the videos that have one (see HLS_PACKAGING)
+        "hls": {
+            video_id: f"/videos/{video_id}/hls/{PLAYLIST_NAME}"
+            for video_id in video_ids
+            if package_file(OUTPUT_DIR, video_id, PLAYLIST_NAME) is not None
+        },
+    }
 
 
 # Helper to stream video
-def stream_video(video_path: Path, request: Request):
-    CHUNK_SIZE = 1024 * 1024
-
+def stream_video(video_path: Path) -> VideoFileResponse:
+    """
+    Serve a video file with range and conditional request support. Video
+    IDs are never reused for other bytes, so clients may cache for good.
+    """
     if not video_path.exists() or not video_path.is_file():
         raise HTTPException(404, "Video not found")
-
-    range_header = request.headers.get("range")
-    if not range_header:
-        return FileResponse(video_path, media_type="video/mp4")
-
-    file_size = video_path.stat().st_size
-    byte_range = range_header.replace("bytes=", "").split("-", 1)
-    try:
-        start = int(byte_range[0]) if byte_range[0] else 0
-        end = int(byte_range[1]) if byte_range[1] else file_size - 1
-    except ValueError as exc:
-        raise HTTPException(416, "Invalid range") from exc
-
-    if start >= file_size:
-        raise HTTPException(416, "Range not satisfiable")
-
-    end = min(end, file_size - 1)
-    content_length = end - start + 1
-
-    def iterfile() -> Iterator[bytes]:
-        with open(video_path, "rb") as file_handle:
-            file_handle.seek(start)
-            remaining = content_length
-            while remaining > 0:
-                chunk = file_handle.read(min(CHUNK_SIZE, remaining))
-                if not chunk:
-                    break
-                remaining -= len(chunk)
-                yield chunk  # returns a Generator
-
-    headers = {
-        "Content-Range": f"bytes {start}-{end}/{file_size}",
-        "Accept-Ranges": "bytes",
-        "Content-Length": str(content_length),
-    }
-    return StreamingResponse(
-        iterfile(),
-        status_code=206,
-        media_type="video/mp4",
-        headers=headers,
-    )
+    return VideoFileResponse(video_path)
 
 
-@app.get("/videos/{video_id}")
-def get_single_video(video_id: str, request: Request):
+@app.api_route("/videos/{video_id}", methods=["GET", "HEAD"])
+def get_single_video(video_id: str):
     """Stream a single video for display."""
 
     video_metadata = video_metadata_service.get_video_metadata(video_id)
@@ -258,7 +626,22 @@ def get_single_video(video_id: str, request: Request):
     if not video_path or not video_path.exists():
         raise HTTPException(404, "Video file not found on disk")
 
-    return stream_video(video_path, request)
+    return stream_video(video_path)
+
+
+@app.get("/videos/{video_id}/hls/{name}")
+def get_video_hls(video_id: str, name: str):
+    """
+    A video's HLS package: index.m3u8, then init.mp4 and the seg_NNN.m4s
+    fragments it lists. Only videos published with HLS_PACKAGING=1 have one.
+    """
+    if not video_metadata_service.video_metadata_exists(video_id):
+        raise HTTPException(404, "Video not found")
+
+    path = package_file(OUTPUT_DIR, video_id, name)
+    if path is None:
+        raise HTTPException(404, "No such HLS file for this video")
+    return VideoFileResponse(path, media_type=MEDIA_TYPES[path.suffix])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,69 @@
+"""
+Durable stage checkpoints for one job workspace.
+
+Every pipeline stage that finishes leaves an artifact in the workspace,
+written atomically (temp file, then rename), so a retried or requeued job
+resumes from the first stage that didn't finish instead of starting over:
+
+    text.txt                              text extraction
+    checkpoints/segmentation.json         segment scripts from Claude
+    checkpoints/segment_N.dialogue.txt    a segment's dialogue
+    voice_output/DN_S*.mp3                per-line TTS (reused with the dialogue)
+    checkpoints/segment_N.json            a voiced segment's metadata
+    composites/segment_N.mp4              silent composite (see composite_service)
+    checkpoints/segment_N.published.json  the segment's video was handed over
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write a file so readers (and later runs) never see it half written"""
+    path = Path(path)
+    partial = path.with_name(f".{path.name}.{os.getpid()}.part")
+    try:
+        with open(partial, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(partial, path)
+    finally:
+        partial.unlink(missing_ok=True)
+
+
+class Checkpoints:
+    """The checkpoint artifacts kept under one directory"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _path(self, name: str) -> Path:
+        return self.root / name.replace(" ", "_")
+
+    def load_json(self, name: str) -> Optional[Any]:
+        """The data saved under `name`, or None if that stage hasn't finished"""
+        try:
+            with open(self._path(f"{name}.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save_json(self, name: str, data: Any) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        write_atomic(
+            self._path(f"{name}.json"),
+            json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8"),
+        )
+
+    def load_text(self, name: str) -> Optional[str]:
+        try:
+            return self._path(f"{name}.txt").read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def save_text(self, name: str, text: str) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        write_atomic(self._path(f"{name}.txt"), text.encode("utf-8"))
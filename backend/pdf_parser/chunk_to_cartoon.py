@@ -3,9 +3,11 @@ import json
 import re
 import asyncio
 from pathlib import Path
-from anthropic import AsyncAnthropic
 from dotenv import load_dotenv
+from pdf_parser.claude_client import stream_message
+from pdf_parser.llm_cache import CLAUDE_MODEL, CLAUDE_TEMPERATURE, llm_cache
 from pdf_parser.pdf_plumber import pdf_to_chunk
+from pdf_parser.workspace import resolve_workspace
 
 # Load environment variables
 load_dotenv()
@@ -43,69 +45,133 @@ def split_dialogue_by_speaker(dialogue_text):
     return segments
 
 
-async def convert_chunk_to_cartoon(chunk_text, system_prompt, segment_id):
+def split_segment_blocks(segments_text):
+    """
+    Split Claude's segmentation output into the script of each segment.
+
+    Args:
+        segments_text: Output of segment_content_with_claude ("SEGMENT 1 ... Script: ...")
+
+    Returns:
+        List of segment script strings, in order
+    """
+    segment_blocks = segments_text.split("SEGMENT ")
+    segment_blocks = [s.strip() for s in segment_blocks if s.strip()]
+
+    scripts = []
+    for segment_block in segment_blocks:
+        # Extract the script part (after "Script:")
+        if "Script:" in segment_block:
+            script_start = segment_block.find("Script:") + len("Script:")
+            scripts.append(segment_block[script_start:].strip())
+        else:
+            scripts.append(segment_block)
+
+    return scripts
+
+
+def read_cartoon_prompt():
+    """
+    Read the chunk_to_cartoon.txt system prompt.
+
+    Returns:
+        The prompt text, or None if it could not be read
+    """
+    script_dir = Path(__file__).parent
+    cartoon_prompt_path = script_dir.parent / "prompts" / "chunk_to_cartoon.txt"
+
+    if not cartoon_prompt_path.exists():
+        print(f"Error: Cartoon prompt file '{cartoon_prompt_path}' does not exist.")
+        return None
+
+    try:
+        with open(cartoon_prompt_path, "r", encoding="utf-8") as f:
+            return f.read()
+    except Exception as e:
+        print(f"Error reading cartoon prompt: {e}")
+        return None
+
+
+def _ignore_text(text):
+    pass
+
+
+async def convert_chunk_to_cartoon(chunk_text, system_prompt, segment_id, on_text=None):
     """
     Convert a text chunk to Rick and Morty style dialogue using Claude (async).
 
+    The response is streamed, so callers can start on the first lines while
+    the rest is still being written.
+
     Args:
         chunk_text: The educational text chunk to convert
         system_prompt: The system context from chunk_to_cartoon.txt
         segment_id: Identifier for this segment (for logging)
+        on_text: Optional callback called with each piece of the dialogue as
+            it arrives (on the I/O loop), or with the whole dialogue at once
+            on a cache hit
 
     Returns:
         The converted dialogue as a string
     """
+    max_tokens = 4096
+
+    # Same segment + prompts + model settings: reuse the previous dialogue
+    cached = llm_cache.get(
+        chunk_text, system_prompt, CLAUDE_MODEL, CLAUDE_TEMPERATURE, max_tokens
+    )
+    if cached is not None:
+        print(f"  ✓ Dialogue cache hit for {segment_id}")
+        if on_text is not None:
+            on_text(cached)
+        return cached
+
     api_key = os.getenv("ANTHROPIC_API_KEY")
     if not api_key:
         print("Error: ANTHROPIC_API_KEY not found in environment variables")
         return None
 
     try:
-        client = AsyncAnthropic(api_key=api_key)
-
         print(f"  → Starting conversion for {segment_id}...")
 
-        response = await client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=4096,
-            temperature=0.7,
-            system=system_prompt,
-            messages=[{"role": "user", "content": chunk_text}],
+        dialogue = await stream_message(
+            chunk_text, system_prompt, max_tokens, on_text or _ignore_text, segment_id
+        )
+        llm_cache.put(
+            chunk_text,
+            system_prompt,
+            CLAUDE_MODEL,
+            CLAUDE_TEMPERATURE,
+            max_tokens,
+            dialogue,
         )
 
         print(f"  ✓ Completed conversion for {segment_id}")
-        return response.content[0].text
+        return dialogue
 
     except Exception as e:
-        print(f"  ✗ Error calling Claude API for {segment_id}: {e}")
+        print(f"  ✗ Error calling Claude API for {segment_id} (giving up): {e!r}")
         return None
 
 
-async def process_chunks_to_cartoons():
+async def process_chunks_to_cartoons(workspace=None):
     """
     Process all PDF chunks and convert them to cartoon dialogues concurrently.
 
+    Args:
+        workspace: Workspace whose PDF(s) to process (defaults to the shared one)
+
     Returns:
         List of cartoon dialogues for each PDF and segment
     """
     # Get the cartoon prompt
-    script_dir = Path(__file__).parent
-    cartoon_prompt_path = script_dir.parent / "prompts" / "chunk_to_cartoon.txt"
-
-    if not cartoon_prompt_path.exists():
-        print(f"Error: Cartoon prompt file '{cartoon_prompt_path}' does not exist.")
-        return []
-
-    try:
-        with open(cartoon_prompt_path, "r", encoding="utf-8") as f:
-            cartoon_prompt = f.read()
-    except Exception as e:
-        print(f"Error reading cartoon prompt: {e}")
+    cartoon_prompt = read_cartoon_prompt()
+    if cartoon_prompt is None:
         return []
 
     # Get the chunks from pdf_to_chunk()
     print("Getting PDF chunks...\n")
-    pdf_results = pdf_to_chunk()
+    pdf_results = await pdf_to_chunk(workspace)
 
     if not pdf_results:
         print("No PDF results to process")
@@ -124,17 +190,7 @@ async def process_chunks_to_cartoons():
         print(f"{'='*60}")
 
         # Split the segments text into individual segments
-        segment_blocks = segments.split("SEGMENT ")
-        segment_blocks = [s.strip() for s in segment_blocks if s.strip()]
-
-        for i, segment_block in enumerate(segment_blocks, 1):
-            # Extract the script part (after "Script:")
-            if "Script:" in segment_block:
-                script_start = segment_block.find("Script:") + len("Script:")
-                segment_text = segment_block[script_start:].strip()
-            else:
-                segment_text = segment_block
-
+        for i, segment_text in enumerate(split_segment_blocks(segments), 1):
             segment_id = f"{pdf_name} - Segment {i}"
             task = convert_chunk_to_cartoon(segment_text, cartoon_prompt, segment_id)
             all_tasks.append(task)
@@ -184,15 +240,20 @@ async def process_chunks_to_cartoons():
     return cartoon_results
 
 
-async def pdf_to_cartoon_chunk():
+async def pdf_to_cartoon_chunk(workspace=None):
     """
     Process all PDF chunks and convert them to cartoon dialogues concurrently.
     Creates the skeleton JSON structure with transcripts and person fields.
 
+    Args:
+        workspace: Workspace to read PDFs from and write the metadata skeleton
+            to (defaults to the shared one)
+
     Returns:
         List of cartoon dialogue strings ready for async processing
     """
-    results = await process_chunks_to_cartoons()
+    workspace = resolve_workspace(workspace)
+    results = await process_chunks_to_cartoons(workspace)
 
     # Extract just the cartoon dialogue strings into a flat list
     cartoon_dialogues = []
@@ -253,8 +314,7 @@ async def pdf_to_cartoon_chunk():
                 metadata[segment_key]["person"].append(seg["speaker"])
 
     # Save skeleton to JSON
-    script_dir = Path(__file__).parent
-    output_file = script_dir.parent / "data" / "audio_metadata.json"
+    output_file = workspace.metadata_file
     output_file.parent.mkdir(parents=True, exist_ok=True)
 
     with open(output_file, "w", encoding="utf-8") as f:
@@ -0,0 +1,158 @@
+import os
+import threading
+from typing import Callable, Optional
+
+from anthropic import AsyncAnthropic
+from dotenv import load_dotenv
+
+from pdf_parser.io_loop import io_loop
+from pdf_parser.llm_cache import CLAUDE_MODEL, CLAUDE_TEMPERATURE
+from pdf_parser.rate_limit import claude_limiter
+
+### One Claude client for the whole process, living on the shared I/O loop ###
+
+# Load environment variables
+load_dotenv()
+
+_client: Optional[AsyncAnthropic] = None
+
+# Token usage across all calls (cache fields stay 0 while the system prompts
+# are too short to be cached, see cached_system_prompt)
+_usage = {"input_tokens": 0, "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0, "output_tokens": 0}
+_usage_lock = threading.Lock()
+
+
+def get_claude_client() -> AsyncAnthropic:
+    """
+    The shared AsyncAnthropic client, created on first use.
+
+    Must be called on the I/O loop, which owns the client's connections.
+    Retries are left to claude_limiter, so the SDK's own are disabled.
+    """
+    global _client
+    if _client is None:
+        _client = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"), max_retries=0)
+        io_loop.on_shutdown(close_claude_client)
+    return _client
+
+
+async def close_claude_client() -> None:
+    """Close the shared client and its pooled connections"""
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.close()
+
+
+# Shortest prefix Anthropic caches for Sonnet/Opus models (Haiku: 2048).
+# Shorter prefixes marked with cache_control are processed in full every time
+MIN_CACHEABLE_TOKENS = int(os.getenv("CLAUDE_MIN_CACHEABLE_TOKENS", 1024))
+
+# Rough size of a token in English text, to estimate prompt lengths
+CHARS_PER_TOKEN = 4
+
+
+def cached_system_prompt(system_prompt: str) -> list[dict]:
+    """
+    System prompt, marked for prompt caching if it is long enough to be cached.
+
+    Both prompts in prompts/ are currently far below MIN_CACHEABLE_TOKENS
+    (~400-460 tokens), so they are sent unmarked and /stats shows no cache
+    reads. The user message differs on every call, so no longer prefix is
+    shared between calls either. A system prompt that grows past the
+    minimum is cached from the second call on.
+    """
+    block = {"type": "text", "text": system_prompt}
+    if len(system_prompt) / CHARS_PER_TOKEN >= MIN_CACHEABLE_TOKENS:
+        block["cache_control"] = {"type": "ephemeral"}
+    return [block]
+
+
+async def create_message(user_text: str, system_prompt: str, max_tokens: int, label: str = "") -> str:
+    """
+    Send one user message to Claude with the pipeline's model settings.
+
+    Runs on the I/O loop under claude_limiter from any event loop.
+
+    Args:
+        user_text: The user message
+        system_prompt: System prompt (see cached_system_prompt)
+        max_tokens: Response token limit
+        label: Shown in retry log lines
+
+    Returns:
+        The text of the response
+    """
+
+    def call():
+        return get_claude_client().messages.create(
+            model=CLAUDE_MODEL,
+            max_tokens=max_tokens,
+            temperature=CLAUDE_TEMPERATURE,
+            system=cached_system_prompt(system_prompt),
+            messages=[{"role": "user", "content": user_text}],
+        )
+
+    response = await io_loop.call(claude_limiter.run(call, label))
+    record_usage(response.usage)
+    return response.content[0].text
+
+
+class StreamInterruptedError(Exception):
+    """A streamed response failed after part of it was already delivered"""
+
+
+async def stream_message(
+    user_text: str,
+    system_prompt: str,
+    max_tokens: int,
+    on_text: Callable[[str], None],
+    label: str = "",
+) -> str:
+    """
+    Like create_message, but streams the response.
+
+    `on_text` is called on the I/O loop with each piece of text as it
+    arrives. A failure before any text arrived is retried like any other
+    call. A failure mid-stream is not: the caller has already acted on the
+    partial text, and a retry would produce a different response.
+
+    Returns:
+        The full text of the response
+    """
+
+    async def call():
+        parts = []
+        try:
+            async with get_claude_client().messages.stream(
+                model=CLAUDE_MODEL,
+                max_tokens=max_tokens,
+                temperature=CLAUDE_TEMPERATURE,
+                system=cached_system_prompt(system_prompt),
+                messages=[{"role": "user", "content": user_text}],
+            ) as stream:
+                async for text in stream.text_stream:
+                    parts.append(text)
+                    on_text(text)
+                final = await stream.get_final_message()
+        except Exception as e:
+            if parts:
+                raise StreamInterruptedError(f"Stream interrupted: {e!r}") from e
+            raise
+        record_usage(final.usage)
+        return "".join(parts)
+
+    return await io_loop.call(claude_limiter.run(call, label))
+
+
+def record_usage(usage) -> None:
+    """Add a response's token usage to the running totals"""
+    with _usage_lock:
+        for field in _usage:
+            _usage[field] += getattr(usage, field, None) or 0
+
+
+def usage_stats() -> dict:
+    """Token totals since startup"""
+    with _usage_lock:
+        return dict(_usage)
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+### On-disk content-addressed cache with size-bounded LRU eviction ###
+
+
+def content_key(*parts) -> str:
+    """
+    Hash the given JSON-serializable parts into a cache key.
+
+    Args:
+        *parts: Everything the cached value depends on (text, model, params...)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    encoded = json.dumps(parts, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ContentCache:
+    """
+    Files stored under the hash of their inputs, evicted least recently used
+    first once the cache grows past `max_bytes`.
+
+    Entries are written atomically (temp file + rename), so concurrent jobs
+    and processes can share a cache directory. Recency is the file's mtime,
+    which is bumped on every hit.
+    """
+
+    def __init__(self, root: Path, max_bytes: int, suffix: str = ""):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None  # computed lazily on first write
+
+    def path_for(self, key: str) -> Path:
+        """Where the entry for `key` lives (whether or not it exists yet)"""
+        return self.root / key[:2] / f"{key}{self.suffix}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached bytes for `key`, or None on a miss"""
+        path = self.path_for(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> Path:
+        """Store `data` under `key` and evict old entries if over budget"""
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            previous = path.stat().st_size if path.exists() else 0
+            os.replace(tmp_path, path)
+            self._size += len(data) - previous
+            if self._size > self.max_bytes:
+                self._evict_locked()
+
+        return path
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _entries(self) -> list[Path]:
+        if not self.root.exists():
+            return []
+        return [p for p in self.root.glob(f"*/*{self.suffix}") if not p.name.startswith(".")]
+
+    def _scan_size(self) -> int:
+        return sum(p.stat().st_size for p in self._entries())
+
+    def _evict_locked(self) -> None:
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for p in self._entries():
+            try:
+                stat = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, p))
+        entries.sort()
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, p in entries:
+            if size <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+
+        self._size = size
@@ -1,10 +1,16 @@
 import os
 import asyncio
+import importlib.util
 import re
-import requests
+import httpx
 from pathlib import Path
 from dotenv import load_dotenv
-from pdf_parser.chunk_to_cartoon import pdf_to_cartoon_chunk
+from pdf_parser.checkpoints import write_atomic
+from pdf_parser.chunk_to_cartoon import convert_chunk_to_cartoon, pdf_to_cartoon_chunk
+from pdf_parser.content_cache import ContentCache, content_key
+from pdf_parser.io_loop import io_loop
+from pdf_parser.rate_limit import tts_limiter
+from pdf_parser.workspace import DATA_DIR, resolve_workspace
 
 # Load environment variables
 load_dotenv()
@@ -20,6 +26,127 @@ VOICE_MODELS = {
     "morty": "377e4ac186da47faa3b644d033775954",
 }
 
+# Fish Audio endpoint (point FISH_API_URL at pdf_parser/fake_tts_server.py for tests)
+TTS_API_URL = os.getenv("FISH_API_URL", "https://api.fish.audio/v1/tts")
+TTS_MODEL = "s1"
+
+# Synthesis parameters sent with every request
+TTS_PARAMS = {
+    "temperature": 0.7,
+    "top_p": 0.7,
+    "chunk_length": 300,
+    "normalize": True,
+    "format": "mp3",
+    "mp3_bitrate": 128,
+    "latency": "normal",
+    "max_new_tokens": 1024,
+    "repetition_penalty": 1.2,
+    "min_chunk_length": 50,
+    "condition_on_previous_chunks": True,
+    "early_stop_threshold": 1,
+}
+
+# Connection pool for the TTS host, with idle connections kept alive between
+# lines. Over HTTP/1.1 this is also the cap on requests in flight across all
+# jobs (one per connection)
+TTS_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("FISH_MAX_CONNECTIONS", 8)),
+    max_keepalive_connections=int(os.getenv("FISH_MAX_CONNECTIONS", 8)),
+    keepalive_expiry=60,
+)
+
+# Long reads: synthesis of a long line can take a while to start streaming
+TTS_TIMEOUT = httpx.Timeout(float(os.getenv("FISH_TIMEOUT_SECONDS", 120)), connect=10)
+
+# HTTP/2 multiplexes every request over one connection (h2 is in
+# requirements.txt; without it the client falls back to HTTP/1.1). The pool
+# then no longer bounds requests in flight: tts_limiter's concurrency limit
+# (at most FISH_MAX_CONNECTIONS) and request rate do
+TTS_HTTP2 = importlib.util.find_spec("h2") is not None
+
+_tts_client = None
+
+# Synthesized lines, shared by every job: identical text in the same voice
+# with the same parameters never goes to the network twice
+tts_cache = ContentCache(
+    DATA_DIR / "cache" / "tts",
+    max_bytes=int(os.getenv("TTS_CACHE_MAX_MB", 512)) * 1024 * 1024,
+    suffix=".mp3",
+)
+
+
+def tts_cache_key(text, reference_id):
+    """Cache key for a line: (model, voice, text, synthesis params)"""
+    return content_key(TTS_MODEL, reference_id, text, TTS_PARAMS)
+
+
+# A speaker tag and the whitespace after it
+SPEAKER_TAG = re.compile(r"\[(rick|morty)\]\s*", re.IGNORECASE)
+
+# Longest tag ("[morty]"), minus one: how far back a tag split across two
+# chunks of streamed text can start
+_TAG_OVERLAP = len("[morty]") - 1
+
+
+class DialogueTurnParser:
+    """
+    Splits a dialogue into [rick]/[morty] turns as its text streams in.
+
+    A turn is complete once the next speaker tag appears, so it can be
+    voiced while the model is still writing the following ones. Feeding a
+    whole dialogue at once gives exactly what split_dialogue_by_speaker does.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._speaker = None
+        # Where the current turn's text starts, and where to look for tags
+        self._start = 0
+        self._scan = 0
+
+    def feed(self, text):
+        """
+        Add streamed text.
+
+        Returns:
+            List of turns ({'speaker', 'text'}) completed by this text
+        """
+        self._buffer += text
+        turns = []
+        for match in SPEAKER_TAG.finditer(self._buffer, self._scan):
+            self._emit(match.start(), turns)
+            self._speaker = match.group(1).lower()
+            self._start = match.end()
+        self._scan = max(self._start, len(self._buffer) - _TAG_OVERLAP)
+
+        # Drop text that can no longer be part of a turn
+        if self._start > 0:
+            self._buffer = self._buffer[self._start :]
+            self._scan -= self._start
+            self._start = 0
+        return turns
+
+    def close(self):
+        """
+        Signal the end of the dialogue.
+
+        Returns:
+            The final turn, if it has any text
+        """
+        turns = []
+        self._emit(len(self._buffer), turns)
+        self._speaker = None
+        self._buffer = ""
+        self._start = self._scan = 0
+        return turns
+
+    def _emit(self, end, turns):
+        if self._speaker is None:
+            return
+        text = self._buffer[self._start : end].strip()
+        if text:  # Only add if there's actual content
+            turns.append({"speaker": self._speaker, "text": text})
+
 
 def split_dialogue_by_speaker(dialogue_text):
     """
@@ -31,75 +158,77 @@ def split_dialogue_by_speaker(dialogue_text):
     Returns:
         List of tuples: [(speaker, text), (speaker, text), ...]
     """
-    # Find all speaker tags and their positions
-    pattern = r"\[(rick|morty)\]\s*"
+    parser = DialogueTurnParser()
+    return parser.feed(dialogue_text) + parser.close()
 
-    segments = []
-    matches = list(re.finditer(pattern, dialogue_text, re.IGNORECASE))
 
-    for i, match in enumerate(matches):
-        speaker = match.group(1).lower()
-        start = match.end()
+def get_tts_client():
+    """
+    The shared TTS HTTP client, created on first use.
 
-        # Get the text until the next speaker or end of string
-        if i < len(matches) - 1:
-            end = matches[i + 1].start()
-        else:
-            end = len(dialogue_text)
+    Must be called on the I/O loop, which owns the client's connections.
+    """
+    global _tts_client
+    if _tts_client is None:
+        _tts_client = httpx.AsyncClient(
+            limits=TTS_LIMITS, timeout=TTS_TIMEOUT, http2=TTS_HTTP2
+        )
+        io_loop.on_shutdown(close_tts_client)
+    return _tts_client
 
-        text = dialogue_text[start:end].strip()
 
-        if text:  # Only add if there's actual content
-            segments.append({"speaker": speaker, "text": text})
+async def close_tts_client():
+    """Close the shared TTS client and its pooled connections"""
+    global _tts_client
+    if _tts_client is not None:
+        client, _tts_client = _tts_client, None
+        await client.aclose()
+
 
-    return segments
+async def _post_tts(payload, headers):
+    response = await get_tts_client().post(TTS_API_URL, json=payload, headers=headers)
+    response.raise_for_status()
+    return response
 
 
-async def call_tts_api(text, speaker, segment_id, semaphore=None):
+async def call_tts_api(text, speaker, segment_id):
     """
     Call Fish Audio TTS API to convert text to speech.
 
+    Requests go through one pooled client on the shared I/O loop, so
+    connections are reused across lines and jobs. tts_limiter paces them to
+    what Fish Audio accepts and retries throttled or transient failures.
+
     Args:
         text: The text to convert to speech
         speaker: 'rick' or 'morty'
         segment_id: Identifier for this segment
-        semaphore: Optional asyncio.Semaphore to limit concurrent requests
 
     Returns:
         Tuple of (audio_data, success) where audio_data is bytes or None
     """
-    api_token = os.getenv("FISH_API_TOKEN")
-    if not api_token:
-        print(f"  ✗ Error: FISH_API_TOKEN not found for {segment_id}")
-        return None, False
-
     # Get the model ID for the speaker
     model_id = VOICE_MODELS.get(speaker.lower())
     if not model_id:
         print(f"  ✗ Error: Unknown speaker '{speaker}' for {segment_id}")
         return None, False
 
-    url = "https://api.fish.audio/v1/tts"
-
-    payload = {
-        "text": text,
-        "reference_id": model_id,
-        "temperature": 0.7,
-        "top_p": 0.7,
-        "chunk_length": 300,
-        "normalize": True,
-        "format": "mp3",
-        "mp3_bitrate": 128,
-        "latency": "normal",
-        "max_new_tokens": 1024,
-        "repetition_penalty": 1.2,
-        "min_chunk_length": 50,
-        "condition_on_previous_chunks": True,
-        "early_stop_threshold": 1,
-    }
+    # Reuse the audio if this exact line was synthesized before
+    cache_key = tts_cache_key(text, model_id)
+    cached = tts_cache.get(cache_key)
+    if cached is not None:
+        print(f"  ✓ TTS cache hit for {segment_id}")
+        return cached, True
+
+    api_token = os.getenv("FISH_API_TOKEN")
+    if not api_token:
+        print(f"  ✗ Error: FISH_API_TOKEN not found for {segment_id}")
+        return None, False
+
+    payload = {"text": text, "reference_id": model_id, **TTS_PARAMS}
 
     headers = {
-        "model": "s1",
+        "model": TTS_MODEL,
         "Authorization": f"Bearer {api_token}",
         "Content-Type": "application/json",
     }
@@ -107,30 +236,26 @@ async def call_tts_api(text, speaker, segment_id, semaphore=None):
     try:
         print(f"  → Calling TTS API for {segment_id} ({speaker})...")
 
-        # Use semaphore to limit concurrent requests if provided
-        async with semaphore if semaphore else asyncio.Semaphore(1):
-            # Run the blocking requests call in a thread pool
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None, lambda: requests.post(url, json=payload, headers=headers)
-            )
+        response = await io_loop.call(
+            tts_limiter.run(lambda: _post_tts(payload, headers), segment_id)
+        )
 
-        response.raise_for_status()
+        tts_cache.put(cache_key, response.content)
 
         print(f"  ✓ TTS API completed for {segment_id}")
         return response.content, True
 
-    except requests.exceptions.HTTPError as e:
-        print(f"  ✗ HTTP Error for {segment_id}: {e}")
-        print(f"     Response: {response.text if response else 'No response'}")
+    except httpx.HTTPStatusError as e:
+        print(f"  ✗ HTTP Error for {segment_id} (giving up): {e}")
+        print(f"     Response: {e.response.text}")
         return None, False
     except Exception as e:
-        print(f"  ✗ Error calling TTS API for {segment_id}: {e}")
+        print(f"  ✗ Error calling TTS API for {segment_id} (giving up): {e!r}")
         return None, False
 
 
 async def process_dialogue_segment(
-    segment, dialogue_index, segment_index, output_dir=None, semaphore=None
+    segment, dialogue_index, segment_index, output_dir=None, reuse_existing=False
 ):
     """
     Process a single dialogue segment and convert to audio.
@@ -140,18 +265,33 @@ async def process_dialogue_segment(
         dialogue_index: Index of the parent dialogue
         segment_index: Index of this segment within the dialogue
         output_dir: Optional directory to save audio files
-        semaphore: Optional asyncio.Semaphore to limit concurrent API requests
+        reuse_existing: Use the line's audio file in output_dir if an
+            earlier run already saved it, instead of calling TTS
 
     Returns:
         Dictionary with processed segment info including audio data
     """
     segment_id = f"D{dialogue_index}_S{segment_index}_{segment['speaker']}"
 
+    existing = Path(output_dir) / f"{segment_id}.mp3" if output_dir else None
+    if reuse_existing and existing is not None and existing.exists():
+        print(f"  ✓ Reusing saved audio for {segment_id}")
+        return {
+            "dialogue_index": dialogue_index,
+            "segment_index": segment_index,
+            "speaker": segment["speaker"],
+            "text": segment["text"],
+            "segment_id": segment_id,
+            "audio_data": existing.read_bytes(),
+            "success": True,
+            "audio_file": str(existing),
+        }
+
     print(f"  → Processing {segment_id}: {segment['text'][:50]}...")
 
     # Call TTS API
     audio_data, success = await call_tts_api(
-        segment["text"], segment["speaker"], segment_id, semaphore
+        segment["text"], segment["speaker"], segment_id
     )
 
     result = {
@@ -170,8 +310,8 @@ async def process_dialogue_segment(
         output_path.mkdir(parents=True, exist_ok=True)
         audio_file = output_path / f"{segment_id}.mp3"
 
-        with open(audio_file, "wb") as f:
-            f.write(audio_data)
+        # Atomic, so a file that exists is always a complete line to reuse
+        write_atomic(audio_file, audio_data)
 
         result["audio_file"] = str(audio_file)
         print(f"  ✓ Saved audio to {audio_file}")
@@ -179,16 +319,133 @@ async def process_dialogue_segment(
     return result
 
 
-async def process_all_dialogues():
+async def _voice_line(
+    segment, dialogue_index, segment_index, output_dir, on_line, reuse_existing=False
+):
+    result = await process_dialogue_segment(
+        segment,
+        dialogue_index,
+        segment_index,
+        output_dir=str(output_dir),
+        reuse_existing=reuse_existing,
+    )
+    if on_line is not None:
+        on_line(result)
+    return result
+
+
+async def synthesize_dialogue(
+    dialogue, dialogue_index, output_dir, on_line=None, reuse_existing=False
+):
+    """
+    Split one dialogue by speaker and convert every line to audio concurrently.
+
+    Args:
+        dialogue: Dialogue string with [rick] and [morty] markers
+        dialogue_index: Index of the dialogue (used in the audio filenames)
+        output_dir: Directory to save audio files
+        on_line: Optional callback called with each line's result as it finishes
+        reuse_existing: Keep lines already saved in output_dir (resuming a
+            dialogue whose audio was partly generated)
+
+    Returns:
+        List of processed segment dicts, in dialogue order
+    """
+    segments = split_dialogue_by_speaker(dialogue)
+
+    tasks = [
+        _voice_line(segment, dialogue_index, segment_index, output_dir, on_line, reuse_existing)
+        for segment_index, segment in enumerate(segments, 1)
+    ]
+
+    return await asyncio.gather(*tasks)
+
+
+async def stream_dialogue_to_voice(
+    chunk_text,
+    system_prompt,
+    segment_id,
+    dialogue_index,
+    output_dir,
+    on_turn=None,
+    on_line=None,
+):
+    """
+    Write a dialogue with Claude and voice each line as soon as it is written.
+
+    Claude's response is streamed through a DialogueTurnParser; every turn
+    goes to TTS the moment the next speaker tag closes it, instead of after
+    the whole dialogue is done. Runs on the I/O loop whatever loop awaits it.
+
+    Args:
+        chunk_text: The segment script to turn into a dialogue
+        system_prompt: The system context from chunk_to_cartoon.txt
+        segment_id: Identifier for this segment (for logging)
+        dialogue_index: Index of the dialogue (used in the audio filenames)
+        output_dir: Directory to save audio files
+        on_turn: Optional callback called with each turn as it is parsed
+        on_line: Optional callback called with each line's result as it finishes
+
+    Returns:
+        Tuple of (dialogue, results): the dialogue text (None if it could not
+        be written) and the processed segment dicts, in dialogue order
+    """
+    return await io_loop.call(
+        _stream_dialogue_to_voice(
+            chunk_text, system_prompt, segment_id, dialogue_index, output_dir, on_turn, on_line
+        )
+    )
+
+
+async def _stream_dialogue_to_voice(
+    chunk_text, system_prompt, segment_id, dialogue_index, output_dir, on_turn, on_line
+):
+    parser = DialogueTurnParser()
+    tasks = []
+
+    def start_lines(turns):
+        for turn in turns:
+            if on_turn is not None:
+                on_turn(turn)
+            tasks.append(
+                asyncio.ensure_future(
+                    _voice_line(turn, dialogue_index, len(tasks) + 1, output_dir, on_line)
+                )
+            )
+
+    dialogue = await convert_chunk_to_cartoon(
+        chunk_text,
+        system_prompt,
+        segment_id,
+        on_text=lambda text: start_lines(parser.feed(text)),
+    )
+    if dialogue is None:
+        # Lines already sent belong to a dialogue that will never be used
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return None, []
+
+    start_lines(parser.close())
+    return dialogue, await asyncio.gather(*tasks)
+
+
+async def process_all_dialogues(workspace=None):
     """
     Process all dialogues from pdf_to_cartoon_chunk and split them by speaker.
     Creates async tasks for each speaker segment.
 
+    Args:
+        workspace: Workspace to process; audio is written to its voice_dir
+            (defaults to the shared workspace and data/voice_output)
+
     Returns:
         List of processed segments ready for API calls
     """
+    workspace = resolve_workspace(workspace)
+
     print("Getting cartoon dialogues...\n")
-    dialogues = await pdf_to_cartoon_chunk()
+    dialogues = await pdf_to_cartoon_chunk(workspace)
 
     if not dialogues:
         print("No dialogues to process")
@@ -198,9 +455,6 @@ async def process_all_dialogues():
     print(f"Processing {len(dialogues)} dialogues")
     print(f"{'='*60}\n")
 
-    # Create semaphore to limit concurrent API requests (max 3 at a time)
-    semaphore = asyncio.Semaphore(3)
-
     # Collect all segments and create async tasks
     all_tasks = []
 
@@ -219,8 +473,7 @@ async def process_all_dialogues():
                 segment,
                 dialogue_index,
                 segment_index,
-                output_dir=str(OUTPUT_DIR),
-                semaphore=semaphore,
+                output_dir=str(workspace.voice_dir),
             )
             all_tasks.append(task)
 
@@ -238,14 +491,17 @@ async def process_all_dialogues():
     return results
 
 
-def dialogue_to_voice():
+def dialogue_to_voice(workspace=None):
     """
     Main function to convert dialogues to voice-ready segments.
 
+    Args:
+        workspace: Workspace to process (defaults to the shared one)
+
     Returns:
         List of processed segments ready for voice API
     """
-    results = asyncio.run(process_all_dialogues())
+    results = asyncio.run(process_all_dialogues(workspace))
 
     # Print summary
     print(f"\n\n{'='*60}")
@@ -291,9 +547,6 @@ async def test_with_example():
     print("=" * 60)
     print(f"\nProcessing {len(example_dialogues)} example dialogues\n")
 
-    # Create semaphore to limit concurrent API requests (max 3 at a time)
-    semaphore = asyncio.Semaphore(3)
-
     # Collect all segments and create async tasks
     all_tasks = []
 
@@ -315,7 +568,6 @@ async def test_with_example():
                 dialogue_index,
                 segment_index,
                 output_dir=str(OUTPUT_DIR),
-                semaphore=semaphore,
             )
             all_tasks.append(task)
 
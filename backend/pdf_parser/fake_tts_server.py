@@ -0,0 +1,180 @@
+"""
+Local stand-in for the Fish Audio TTS API, for tests and offline runs.
+
+Accepts the same POST /v1/tts requests as https://api.fish.audio/v1/tts and
+answers with a silent MP3 whose length grows with the text, so the rest of
+the pipeline (durations, timestamps, rendering) behaves as it would against
+the real service. Counts requests and connections so tests can check what
+hit the network and whether connections were reused. It can also act like a
+provider under load: answer 429 + Retry-After above a request rate, or fail
+the next few requests with an error status.
+
+Run from backend folder:
+    python -m pdf_parser.fake_tts_server --port 8100
+    FISH_API_URL=http://127.0.0.1:8100/v1/tts FISH_API_TOKEN=test uvicorn main:app
+"""
+
+import argparse
+import json
+import threading
+import time
+from typing import Optional
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# One MPEG-1 Layer III frame: 128 kbps, 44.1 kHz, mono, no CRC. An all-zero
+# body decodes as silence. 1152 samples per frame -> ~26 ms of audio.
+_FRAME_HEADER = bytes([0xFF, 0xFB, 0x90, 0xC4])
+_FRAME_SIZE = 417  # 144 * 128000 // 44100
+_FRAME_SECONDS = 1152 / 44100
+SILENT_FRAME = _FRAME_HEADER + bytes(_FRAME_SIZE - len(_FRAME_HEADER))
+
+# Roughly how long it takes to say a word
+SECONDS_PER_WORD = 0.3
+
+
+def silent_mp3(seconds: float) -> bytes:
+    """A silent CBR MP3 of (about) the given length"""
+    frames = max(1, round(seconds / _FRAME_SECONDS))
+    return SILENT_FRAME * frames
+
+
+class _TTSHandler(BaseHTTPRequestHandler):
+    # Keep connections open between requests, like the real API
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        if self.path != "/v1/tts":
+            self.send_error(404)
+            return
+
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            self.send_error(401, "Missing bearer token")
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length))
+            text = payload["text"]
+        except (ValueError, KeyError):
+            self.send_error(400, "Expected a JSON body with a 'text' field")
+            return
+
+        error = self.server.take_error()
+        if error is not None:
+            status, retry_after = error
+            self.send_response(status)
+            if retry_after is not None:
+                self.send_header("Retry-After", str(retry_after))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.server.record_request(payload)
+
+        body = silent_mp3(len(text.split()) * SECONDS_PER_WORD)
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeTTSServer(ThreadingHTTPServer):
+    """HTTP server speaking the Fish Audio TTS protocol"""
+
+    daemon_threads = True
+
+    def __init__(
+        self, host: str = "127.0.0.1", port: int = 0, rate_limit: Optional[float] = None
+    ):
+        """
+        Args:
+            rate_limit: Requests per second accepted before answering 429
+                (None for no limit)
+        """
+        super().__init__((host, port), _TTSHandler)
+        self.requests: list[dict] = []
+        self.connections = 0
+        self.throttled = 0
+        self.rate_limit = rate_limit
+        self._lock = threading.Lock()
+        self._injected_errors: list[int] = []
+        self._tokens = rate_limit or 0.0
+        self._refilled_at = time.monotonic()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1/tts"
+
+    @property
+    def request_count(self) -> int:
+        with self._lock:
+            return len(self.requests)
+
+    @property
+    def connection_count(self) -> int:
+        with self._lock:
+            return self.connections
+
+    def process_request(self, request, client_address):
+        with self._lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+    def fail_next(self, count: int, status: int = 503) -> None:
+        """Answer the next `count` requests with `status`"""
+        with self._lock:
+            self._injected_errors.extend([status] * count)
+
+    def take_error(self) -> Optional[tuple[int, Optional[int]]]:
+        """(status, Retry-After) to answer the current request with, if any"""
+        with self._lock:
+            if self._injected_errors:
+                return self._injected_errors.pop(0), None
+            if self.rate_limit is None:
+                return None
+            now = time.monotonic()
+            self._tokens = min(
+                self.rate_limit, self._tokens + (now - self._refilled_at) * self.rate_limit
+            )
+            self._refilled_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return None
+            self.throttled += 1
+            return 429, 1
+
+    def record_request(self, payload: dict) -> None:
+        with self._lock:
+            self.requests.append(payload)
+
+
+def start_fake_tts_server(
+    host: str = "127.0.0.1", port: int = 0, rate_limit: Optional[float] = None
+) -> FakeTTSServer:
+    """Start a FakeTTSServer on a background thread (port 0 picks a free port)"""
+    server = FakeTTSServer(host, port, rate_limit)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument(
+        "--rate-limit", type=float, default=None, help="requests/second before 429s"
+    )
+    args = parser.parse_args()
+
+    server = FakeTTSServer(args.host, args.port, args.rate_limit)
+    print(f"Fake TTS server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
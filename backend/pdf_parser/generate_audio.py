@@ -10,12 +10,19 @@ This script orchestrates the complete workflow:
 
 from pdf_parser.dialogue_to_voice import dialogue_to_voice
 from pdf_parser.make_metadata import get_transcript_metadata
+from pdf_parser.workspace import resolve_workspace
 
 
-def generate_audio():
+def generate_audio(workspace=None):
     """
     Main function to run the complete PDF to Audio pipeline.
+
+    Args:
+        workspace: Workspace to run the pipeline in. Defaults to the shared
+            workspace (every PDF in data/pdf_data, outputs under data/).
     """
+    workspace = resolve_workspace(workspace)
+
     print("=" * 80)
     print("PDF TO AUDIO PIPELINE")
     print("=" * 80)
@@ -32,7 +39,7 @@ def generate_audio():
     print("STEP 1: GENERATING AUDIO FILES")
     print("=" * 80 + "\n")
 
-    results = dialogue_to_voice()
+    results = dialogue_to_voice(workspace)
 
     if not results:
         print("\n✗ Failed to generate audio files. Exiting.")
@@ -45,7 +52,7 @@ def generate_audio():
     print("STEP 2: CREATING METADATA")
     print("=" * 80 + "\n")
 
-    metadata = get_transcript_metadata()
+    metadata = get_transcript_metadata(workspace)
 
     if not metadata:
         print("\n✗ Failed to create metadata. Exiting.")
@@ -64,8 +71,8 @@ def generate_audio():
 
     print(f"✓ Generated {total_segments} audio files")
     print(f"✓ Created metadata with transcripts and timestamps")
-    print(f"✓ Output directory: backend/data/voice_output/")
-    print(f"✓ Metadata file: backend/data/audio_metadata.json")
+    print(f"✓ Output directory: {workspace.voice_dir}")
+    print(f"✓ Metadata file: {workspace.metadata_file}")
 
     print("\n" + "=" * 80)
 
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Optional
+
+### One background event loop for the pipeline's network I/O ###
+
+# Pipeline stages run on worker threads. If each of them started its own
+# event loop (asyncio.run), pooled HTTP clients could not be shared between
+# them: an async client belongs to the loop it was first used on. Instead,
+# every network call is sent to this loop, which owns the shared clients.
+
+
+class IOLoop:
+    """An asyncio event loop running on a daemon thread, started on first use"""
+
+    def __init__(self, name: str = "io-loop"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._shutdown_hooks: list[Callable[[], Awaitable[None]]] = []
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name=self.name, daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def in_loop(self) -> bool:
+        """True when called from a coroutine or callback running on this loop"""
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro: Awaitable) -> Future:
+        """Schedule a coroutine on the loop from any thread"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None):
+        """Run a coroutine on the loop and block until it returns"""
+        return self.submit(coro).result(timeout)
+
+    async def call(self, coro: Awaitable):
+        """
+        Await a coroutine on this loop from any event loop.
+
+        Lets code that runs under its own asyncio.run() use the shared
+        clients without blocking its loop.
+        """
+        if self.in_loop():
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def on_shutdown(self, hook: Callable[[], Awaitable[None]]) -> None:
+        """Register a coroutine function to await (on the loop) at shutdown"""
+        with self._lock:
+            self._shutdown_hooks.append(hook)
+
+    def shutdown(self, timeout: float = 10) -> None:
+        """Run the shutdown hooks (e.g. close clients) and stop the loop"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            hooks, self._shutdown_hooks = self._shutdown_hooks, []
+            self._loop = self._thread = None
+        if loop is None:
+            return
+
+        async def _run_hooks():
+            for hook in hooks:
+                try:
+                    await hook()
+                except Exception as e:
+                    print(f"✗ Error during I/O loop shutdown: {e}")
+
+        asyncio.run_coroutine_threadsafe(_run_hooks(), loop).result(timeout)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        loop.close()
+
+
+# Global instance
+io_loop = IOLoop()
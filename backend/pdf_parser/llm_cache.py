@@ -0,0 +1,92 @@
+import hashlib
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Optional
+
+from pdf_parser.content_cache import ContentCache, content_key
+from pdf_parser.workspace import DATA_DIR
+
+### Persistent cache of Claude responses (segmentation and dialogue) ###
+
+# Model settings shared by every Claude call in the pipeline
+CLAUDE_MODEL = "claude-sonnet-4-20250514"
+CLAUDE_TEMPERATURE = 0.7
+
+PROMPTS_DIR = Path(__file__).parent.parent / "prompts"
+
+
+def prompts_fingerprint(prompts_dir: Path = PROMPTS_DIR) -> str:
+    """
+    Hash the contents of every prompts/*.txt file.
+
+    Returns:
+        Short hex digest that changes whenever any prompt is edited
+    """
+    digest = hashlib.sha256()
+    for prompt_file in sorted(Path(prompts_dir).glob("*.txt")):
+        digest.update(prompt_file.name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(prompt_file.read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+class LLMCache:
+    """
+    Claude responses keyed by (input text, system prompt, model, temperature,
+    max_tokens), stored under a namespace named after the prompts fingerprint.
+
+    Editing any file in prompts/ moves the cache to a fresh namespace and
+    deletes the old one, so stale dialogues are never served after a prompt
+    change - even for calls whose own prompt did not change, since the
+    segmentation prompt shapes what the dialogue prompt receives.
+    """
+
+    def __init__(self, root: Path, max_bytes: int, prompts_dir: Path = PROMPTS_DIR):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.prompts_dir = Path(prompts_dir)
+        self._lock = threading.Lock()
+        self._fingerprint: Optional[str] = None
+        self._store: Optional[ContentCache] = None
+
+    def get(self, text, system_prompt, model, temperature, max_tokens) -> Optional[str]:
+        """Cached response for this call, or None"""
+        key = content_key(text, system_prompt, model, temperature, max_tokens)
+        data = self._current_store().get(key)
+        return data.decode("utf-8") if data is not None else None
+
+    def put(self, text, system_prompt, model, temperature, max_tokens, response: str) -> None:
+        """Store the response of a successful call"""
+        key = content_key(text, system_prompt, model, temperature, max_tokens)
+        self._current_store().put(key, response.encode("utf-8"))
+
+    def stats(self) -> dict:
+        """Hit/miss counters and size of the current namespace"""
+        return {"prompts": self._fingerprint, **self._current_store().stats()}
+
+    def _current_store(self) -> ContentCache:
+        fingerprint = prompts_fingerprint(self.prompts_dir)
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                self._fingerprint = fingerprint
+                self._store = ContentCache(self.root / fingerprint, self.max_bytes, ".txt")
+                self._purge_stale_namespaces()
+            return self._store
+
+    def _purge_stale_namespaces(self) -> None:
+        """Delete namespaces written with an older version of the prompts"""
+        if not self.root.exists():
+            return
+        for namespace in self.root.iterdir():
+            if namespace.is_dir() and namespace.name != self._fingerprint:
+                shutil.rmtree(namespace, ignore_errors=True)
+
+
+# Global instance
+llm_cache = LLMCache(
+    DATA_DIR / "cache" / "llm",
+    max_bytes=int(os.getenv("LLM_CACHE_MAX_MB", 64)) * 1024 * 1024,
+)
@@ -2,6 +2,7 @@ import os
 import json
 from pathlib import Path
 from mutagen.mp3 import MP3
+from pdf_parser.workspace import resolve_workspace
 
 
 def get_mp3_duration(file_path):
@@ -162,6 +163,37 @@ def process_audio_files(audio_dir, metadata_skeleton):
     return metadata_skeleton
 
 
+def build_segment_metadata(results):
+    """
+    Build the metadata entry of one segment from its synthesized lines.
+    
+    Args:
+        results: Processed segment dicts from dialogue_to_voice, in dialogue
+            order (each with 'speaker', 'text' and 'audio_file')
+        
+    Returns:
+        Dict with transcripts, person, cumulative timestamps and filename
+    """
+    metadata = {
+        "transcripts": [],
+        "person": [],
+        "timestamps": [],
+        "filename": [],
+    }
+    
+    cumulative_time = 0.0
+    for result in results:
+        audio_file = Path(result["audio_file"])
+        cumulative_time += get_mp3_duration(str(audio_file))
+        
+        metadata["transcripts"].append(result["text"])
+        metadata["person"].append(result["speaker"])
+        metadata["timestamps"].append(cumulative_time)
+        metadata["filename"].append(audio_file.name)
+    
+    return metadata
+
+
 def save_to_json(data, output_path):
     """
     Save the metadata dictionary to a JSON file.
@@ -179,12 +211,18 @@ def save_to_json(data, output_path):
     print(f"\n✓ Saved metadata to: {output_file}")
 
 
-def get_transcript_metadata():
-    """Main function to process audio files and add remaining metadata fields."""
+def get_transcript_metadata(workspace=None):
+    """
+    Main function to process audio files and add remaining metadata fields.
+    
+    Args:
+        workspace: Workspace whose voice files and metadata skeleton to use
+            (defaults to the shared data/ layout)
+    """
     # Get the directory paths
-    script_dir = Path(__file__).parent
-    audio_dir = script_dir.parent / "data" / "voice_output"
-    metadata_file = script_dir.parent / "data" / "audio_metadata.json"
+    workspace = resolve_workspace(workspace)
+    audio_dir = workspace.voice_dir
+    metadata_file = workspace.metadata_file
     
     print(f"Audio directory: {audio_dir}")
     print(f"Metadata file: {metadata_file}")
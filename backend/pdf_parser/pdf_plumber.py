@@ -1,8 +1,16 @@
+import multiprocessing
 import pdfplumber
+import pypdfium2 as pdfium
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from anthropic import Anthropic
+import asyncio
 from dotenv import load_dotenv
+from pdf_parser.checkpoints import write_atomic
+from pdf_parser.claude_client import create_message
+from pdf_parser.llm_cache import CLAUDE_MODEL, CLAUDE_TEMPERATURE, llm_cache
+from pdf_parser.workspace import resolve_workspace
 
 ### Converts PDF to segmented educational content using Claude API ###
 
@@ -10,28 +18,120 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
-def extract_text_from_pdf(pdf_path):
+# Pages handed to each extraction process at a time
+PAGES_PER_TASK = 16
+
+# PDFs with fewer pages than this are extracted serially; starting worker
+# processes costs more than it saves on short documents
+PARALLEL_MIN_PAGES = 32
+
+# Text engine: "pdfplumber" keeps pdfplumber's layout handling, "pdfium" is
+# a much faster plain-text path for when layout fidelity doesn't matter
+PDF_TEXT_ENGINE = os.getenv("PDF_TEXT_ENGINE", "pdfplumber")
+
+# Size of the extraction process pool, shared by every PDF being extracted
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", min(4, os.cpu_count() or 1)))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _extraction_pool():
+    """The shared extraction pool, started on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _extract_page_range(pdf_path, start, stop, engine):
     """
-    Extract text from a PDF file using pdfplumber.
+    Extract pages [start, stop) of a PDF (0-based).
+    
+    Runs in a worker process for large PDFs, so it opens the file itself.
+    
+    Returns:
+        List of "--- Page N ---" blocks, one per page that has text
+    """
+    blocks = []
+    if engine == "pdfium":
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            for index in range(start, stop):
+                page = pdf[index]
+                textpage = page.get_textpage()
+                page_text = textpage.get_text_range().replace("\r\n", "\n")
+                textpage.close()
+                page.close()
+                if page_text.strip():
+                    blocks.append(f"\n--- Page {index + 1} ---\n{page_text}")
+        finally:
+            pdf.close()
+    else:
+        with pdfplumber.open(pdf_path) as pdf:
+            for index in range(start, stop):
+                page = pdf.pages[index]
+                page_text = page.extract_text()
+                if page_text:
+                    blocks.append(f"\n--- Page {index + 1} ---\n{page_text}")
+                # Drop the parsed page objects as we go
+                page.close()
+    return blocks
+
+
+def _page_count(pdf_path):
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def extract_text_from_pdf(pdf_path, engine=None, workers=None):
+    """
+    Extract text from a PDF file.
+    
+    Large PDFs are split into page ranges extracted in parallel on the
+    shared extraction pool (PDF_EXTRACT_WORKERS processes, however many PDFs
+    are extracted at once); the blocks are joined back together in page order.
     
     Args:
         pdf_path: Path to the PDF file
+        engine: "pdfplumber" or "pdfium" (defaults to PDF_TEXT_ENGINE)
+        workers: 1 to extract serially (defaults to PDF_EXTRACT_WORKERS)
         
     Returns:
         Extracted text as a string
     """
-    text = ""
+    engine = engine or PDF_TEXT_ENGINE
+    if workers is None:
+        workers = PDF_EXTRACT_WORKERS
     
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            # Iterate through all pages
-            for page_num, page in enumerate(pdf.pages, start=1):
-                page_text = page.extract_text()
-                if page_text:
-                    text += f"\n--- Page {page_num} ---\n"
-                    text += page_text
-                    
-        return text
+        if not Path(pdf_path).exists():
+            raise FileNotFoundError(pdf_path)
+        
+        num_pages = _page_count(pdf_path)
+        ranges = [
+            (start, min(start + PAGES_PER_TASK, num_pages))
+            for start in range(0, num_pages, PAGES_PER_TASK)
+        ]
+        
+        if num_pages < PARALLEL_MIN_PAGES or workers <= 1 or len(ranges) <= 1:
+            blocks = _extract_page_range(pdf_path, 0, num_pages, engine)
+        else:
+            pool = _extraction_pool()
+            futures = [
+                pool.submit(_extract_page_range, str(pdf_path), start, stop, engine)
+                for start, stop in ranges
+            ]
+            blocks = [block for future in futures for block in future.result()]
+        
+        return "".join(blocks)
     
     except FileNotFoundError:
         print(f"Error: File '{pdf_path}' not found.")
@@ -41,7 +141,30 @@ def extract_text_from_pdf(pdf_path):
         return None
 
 
-def segment_content_with_claude(text, system_prompt):
+def extract_workspace_text(workspace):
+    """
+    Extract the text of a job workspace's PDF, once.
+    
+    The text is saved to the workspace so later steps (deduplication,
+    segmentation) don't pay for extraction again.
+    
+    Args:
+        workspace: Job workspace (must have a pdf_path)
+        
+    Returns:
+        Extracted text as a string, or None on failure
+    """
+    if workspace.text_file.exists():
+        return workspace.text_file.read_text(encoding="utf-8")
+    
+    text = extract_text_from_pdf(str(workspace.pdf_path))
+    if text:
+        workspace.root.mkdir(parents=True, exist_ok=True)
+        write_atomic(workspace.text_file, text.encode("utf-8"))
+    return text
+
+
+async def segment_content_with_claude(text, system_prompt):
     """
     Send extracted text to Claude API with the content splitter system prompt.
     
@@ -52,32 +175,32 @@ def segment_content_with_claude(text, system_prompt):
     Returns:
         The API response content (segmented educational content)
     """
+    max_tokens = 8096
+    
+    # Same text + prompts + model settings: reuse the previous segmentation
+    cached = llm_cache.get(text, system_prompt, CLAUDE_MODEL, CLAUDE_TEMPERATURE, max_tokens)
+    if cached is not None:
+        print("✓ Segmentation cache hit")
+        return cached
+    
     api_key = os.getenv('ANTHROPIC_API_KEY')
     if not api_key:
         print("Error: ANTHROPIC_API_KEY not found in environment variables")
         return None
     
     try:
-        client = Anthropic(api_key=api_key)
-        
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=8096,
-            temperature=0.7,
-            system=system_prompt,
-            messages=[
-                {"role": "user", "content": text}
-            ]
+        segmented_content = await create_message(text, system_prompt, max_tokens, "segmentation")
+        llm_cache.put(
+            text, system_prompt, CLAUDE_MODEL, CLAUDE_TEMPERATURE, max_tokens, segmented_content
         )
-        
-        return response.content[0].text
+        return segmented_content
     
     except Exception as e:
-        print(f"Error calling Claude API: {e}")
+        print(f"Error calling Claude API (giving up): {e!r}")
         return None
 
 
-def process_all_pdfs_in_folder(folder_path, system_prompt_path):
+async def process_all_pdfs_in_folder(folder_path, system_prompt_path):
     """
     Process all PDF files in a given folder and send to OpenAI API.
     
@@ -94,6 +217,25 @@ def process_all_pdfs_in_folder(folder_path, system_prompt_path):
         print(f"No PDF files found in {folder_path}")
         return []
     
+    return await process_pdfs(pdf_files, system_prompt_path)
+
+
+async def process_pdfs(pdf_files, system_prompt_path, extract_text=extract_text_from_pdf):
+    """
+    Process the given PDF files and send each to the Claude API.
+    
+    Args:
+        pdf_files: List of PDF file paths
+        system_prompt_path: Path to the content_splitter.txt file
+        extract_text: Function returning the text of a PDF path
+        
+    Returns:
+        List of API outputs for each processed PDF
+    """
+    if not pdf_files:
+        print("No PDF files to process")
+        return []
+    
     # Read system prompt
     try:
         with open(system_prompt_path, 'r', encoding='utf-8') as f:
@@ -111,13 +253,14 @@ def process_all_pdfs_in_folder(folder_path, system_prompt_path):
         print(f"Processing: {pdf_file.name}")
         print(f"{'='*60}")
         
-        extracted_text = extract_text_from_pdf(str(pdf_file))
+        # Extraction is CPU work; keep it off the event loop
+        extracted_text = await asyncio.to_thread(extract_text, str(pdf_file))
         
         if extracted_text:
             print(f"✓ Text extracted ({len(extracted_text)} characters)")
             print(f"Sending to Claude API...")
             
-            segmented_content = segment_content_with_claude(extracted_text, system_prompt)
+            segmented_content = await segment_content_with_claude(extracted_text, system_prompt)
             
             if segmented_content:
                 results.append({
@@ -138,24 +281,46 @@ def process_all_pdfs_in_folder(folder_path, system_prompt_path):
     return results
 
 
-def pdf_to_chunk():
+async def pdf_to_chunk(workspace=None):
+    """
+    Segment the PDFs of a workspace with Claude.
+    
+    Args:
+        workspace: Workspace whose PDF(s) to process. Defaults to the shared
+            workspace, which processes every PDF in data/pdf_data.
+        
+    Returns:
+        List of {'pdf_name', 'segments'} dicts, one per processed PDF
+    """
+    workspace = resolve_workspace(workspace)
+    
     # Get the directory where this script is located
     script_dir = Path(__file__).parent
-    pdf_data_folder = script_dir.parent / "data" / "pdf_data"
     system_prompt_path = script_dir.parent / "prompts" / "content_splitter.txt"
     
-    print(f"Looking for PDFs in: {pdf_data_folder}")
+    if workspace.pdf_path is not None:
+        print(f"Processing PDF: {workspace.pdf_path}")
+    else:
+        print(f"Looking for PDFs in: {workspace.pdf_dir}")
     print(f"System prompt: {system_prompt_path}")
     
-    if not pdf_data_folder.exists():
-        print(f"Error: Folder '{pdf_data_folder}' does not exist.")
+    if workspace.pdf_path is None and not workspace.pdf_dir.exists():
+        print(f"Error: Folder '{workspace.pdf_dir}' does not exist.")
         return
     
     if not system_prompt_path.exists():
         print(f"Error: System prompt file '{system_prompt_path}' does not exist.")
         return
     
-    results = process_all_pdfs_in_folder(pdf_data_folder, system_prompt_path)
+    if workspace.pdf_path is not None:
+        # Job workspace: reuse the text if it was already extracted
+        results = await process_pdfs(
+            workspace.pdf_files(),
+            system_prompt_path,
+            extract_text=lambda _: extract_workspace_text(workspace),
+        )
+    else:
+        results = await process_pdfs(workspace.pdf_files(), system_prompt_path)
     
     print(f"\n\nFinal Results Summary:")
     print(f"{'='*60}")
@@ -169,4 +334,4 @@ def pdf_to_chunk():
 
 
 if __name__ == "__main__":
-    pdf_to_chunk()
\ No newline at end of file
+    asyncio.run(pdf_to_chunk())
\ No newline at end of file
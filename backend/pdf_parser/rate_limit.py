@@ -0,0 +1,248 @@
+import asyncio
+import os
+import random
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import anthropic
+import httpx
+
+### Adaptive rate limiting and retries for the external APIs (Fish Audio, Claude) ###
+
+T = TypeVar("T")
+
+
+class RetryDecision:
+    """How a failed call should be handled"""
+
+    retry: bool
+    throttled: bool
+    retry_after: Optional[float]
+
+    def __init__(self, retry: bool, throttled: bool = False, retry_after: Optional[float] = None):
+        self.retry = retry
+        self.throttled = throttled
+        self.retry_after = retry_after
+
+
+# Classifies an exception raised by a call
+Classifier = Callable[[BaseException], RetryDecision]
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (only the delay-seconds form)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def decide_for_status(status: int, retry_after: Optional[float] = None) -> RetryDecision:
+    """429 and 529 (overloaded) throttle; 408 and other 5xx are retried"""
+    if status in (429, 529):
+        return RetryDecision(retry=True, throttled=True, retry_after=retry_after)
+    if status == 408 or status >= 500:
+        return RetryDecision(retry=True, retry_after=retry_after)
+    return RetryDecision(retry=False)
+
+
+def classify_httpx_error(error: BaseException) -> RetryDecision:
+    """Retry policy for httpx calls (Fish Audio)"""
+    if isinstance(error, httpx.HTTPStatusError):
+        response = error.response
+        return decide_for_status(
+            response.status_code, parse_retry_after(response.headers.get("Retry-After"))
+        )
+    if isinstance(error, httpx.TransportError):
+        return RetryDecision(retry=True)
+    return RetryDecision(retry=False)
+
+
+def classify_anthropic_error(error: BaseException) -> RetryDecision:
+    """Retry policy for Anthropic SDK calls"""
+    if isinstance(error, anthropic.APIStatusError):
+        return decide_for_status(
+            error.status_code, parse_retry_after(error.response.headers.get("retry-after"))
+        )
+    if isinstance(error, anthropic.APIConnectionError):
+        return RetryDecision(retry=True)
+    return RetryDecision(retry=False)
+
+
+class AdaptiveLimiter:
+    """
+    Token bucket plus AIMD concurrency limit for one provider.
+
+    Requests start at `rate` per second with `concurrency` in flight. Every
+    success nudges both up towards their maximums (additive increase); every
+    429 halves them and pauses all callers for the provider's Retry-After
+    (multiplicative decrease). Throughput settles just under the provider's
+    real ceiling instead of a fixed, guessed limit.
+
+    Transient failures (timeouts, connection errors, 5xx) are retried with
+    jittered exponential backoff. Anything else, or a call still failing
+    after `max_retries`, is raised to the caller.
+
+    Must only be used from one event loop (the shared I/O loop).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        classify: Classifier,
+        rate: float,
+        max_rate: float,
+        concurrency: int,
+        max_concurrency: int,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+    ):
+        self.name = name
+        self.classify = classify
+        self.max_rate = max_rate
+        self.min_rate = min(rate, 0.2)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.rate = float(rate)
+        self.concurrency = float(concurrency)
+        self._tokens = 1.0
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._changed: Optional[asyncio.Event] = None
+
+        self.calls = 0
+        self.retries = 0
+        self.throttles = 0
+        self.failures = 0
+
+    async def run(self, call: Callable[[], Awaitable[T]], label: str = "") -> T:
+        """
+        Run `call()` under the limiter, retrying transient failures.
+
+        Args:
+            call: Creates the awaitable to run (called again for each attempt)
+            label: Shown in retry log lines
+
+        Returns:
+            The result of the first successful attempt
+        """
+        attempt = 0
+        while True:
+            await self._acquire()
+            try:
+                result = await call()
+            except Exception as e:
+                decision = self.classify(e)
+                self._release(throttled=decision.throttled, retry_after=decision.retry_after)
+                if not decision.retry or attempt >= self.max_retries:
+                    self.failures += 1
+                    raise
+                delay = self._backoff(attempt, decision.retry_after)
+                attempt += 1
+                self.retries += 1
+                print(
+                    f"  ↻ {self.name} {label}: {e!r}; retry {attempt}/{self.max_retries} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+            except BaseException:
+                # Cancelled: give the slot back without judging the provider
+                self._in_flight -= 1
+                if self._changed is not None:
+                    self._changed.set()
+                raise
+            else:
+                self._release(throttled=False)
+                self.calls += 1
+                return result
+
+    def stats(self) -> dict:
+        return {
+            "rate": round(self.rate, 2),
+            "concurrency": int(self.concurrency),
+            "in_flight": self._in_flight,
+            "calls": self.calls,
+            "retries": self.retries,
+            "throttles": self.throttles,
+            "failures": self.failures,
+        }
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Full-jitter exponential backoff, never shorter than Retry-After"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    async def _acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            if now < self._paused_until:
+                wait = self._paused_until - now
+            elif self._in_flight >= int(self.concurrency):
+                wait = None
+            else:
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self._in_flight += 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            # Sleep until a slot frees up, or the pause / next token is due
+            if self._changed is None:
+                self._changed = asyncio.Event()
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def _release(self, throttled: bool, retry_after: Optional[float] = None) -> None:
+        self._in_flight -= 1
+        if throttled:
+            self.throttles += 1
+            self.concurrency = max(1.0, self.concurrency / 2)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+            pause = retry_after if retry_after is not None else self.base_delay
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+        else:
+            # Additive increase: about +1 concurrency per `concurrency` successes
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+            self.rate = min(self.max_rate, self.rate + 0.1)
+        if self._changed is not None:
+            self._changed.set()
+
+    def _refill(self, now: float) -> None:
+        burst = max(1.0, self.concurrency)
+        self._tokens = min(burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+
+# Global instances, one per provider. Both start conservatively and ramp
+# up towards the ceilings below while the provider keeps answering.
+tts_limiter = AdaptiveLimiter(
+    "Fish Audio",
+    classify_httpx_error,
+    rate=float(os.getenv("FISH_RATE_PER_SECOND", 2)),
+    max_rate=float(os.getenv("FISH_MAX_RATE_PER_SECOND", 20)),
+    concurrency=2,
+    max_concurrency=int(os.getenv("FISH_MAX_CONNECTIONS", 8)),
+    max_retries=int(os.getenv("FISH_MAX_RETRIES", 5)),
+)
+
+claude_limiter = AdaptiveLimiter(
+    "Claude",
+    classify_anthropic_error,
+    rate=float(os.getenv("CLAUDE_RATE_PER_SECOND", 1)),
+    max_rate=float(os.getenv("CLAUDE_MAX_RATE_PER_SECOND", 10)),
+    concurrency=2,
+    max_concurrency=int(os.getenv("CLAUDE_MAX_CONCURRENCY", 8)),
+    max_retries=int(os.getenv("CLAUDE_MAX_RETRIES", 5)),
+)
@@ -0,0 +1,105 @@
+import shutil
+from pathlib import Path
+from typing import Optional
+
+### Directory layout for one run of the PDF -> audio -> video pipeline ###
+
+# Root-level data folder (backend/data)
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+# Per-job workspaces, one directory per job ID
+JOBS_DIR = DATA_DIR / "jobs"
+
+# Where videos go when the pipeline is run by hand (python generate_videos.py)
+SHARED_VIDEO_DIR = Path(__file__).parent.parent.parent / "outputs" / "videos"
+
+
+class Workspace:
+    """
+    Paths used by a single pipeline run.
+
+    A job workspace only ever sees its own PDF and keeps its voice files,
+    metadata and rendered videos under its own root, so concurrent jobs do
+    not re-process each other's uploads or overwrite each other's metadata.
+    The shared workspace reproduces the original layout under data/ and is
+    what the pipeline functions use when called without a workspace.
+    """
+
+    root: Path
+    pdf_path: Optional[Path]
+    video_dir: Path
+
+    def __init__(
+        self,
+        root: Path,
+        pdf_path: Optional[Path] = None,
+        video_dir: Optional[Path] = None,
+    ):
+        self.root = Path(root)
+        self.pdf_path = Path(pdf_path) if pdf_path is not None else None
+        self.video_dir = Path(video_dir) if video_dir is not None else self.root / "videos"
+
+    @classmethod
+    def shared(cls) -> "Workspace":
+        """Legacy layout: every PDF in data/pdf_data, outputs shared under data/"""
+        return cls(DATA_DIR, video_dir=SHARED_VIDEO_DIR)
+
+    @classmethod
+    def for_job(cls, job_id: str, pdf_path: Path) -> "Workspace":
+        """Create (if needed) and return the isolated workspace for a job"""
+        workspace = cls(JOBS_DIR / job_id, pdf_path=pdf_path)
+        workspace.create()
+        return workspace
+
+    @property
+    def pdf_dir(self) -> Path:
+        return self.root / "pdf_data"
+
+    @property
+    def voice_dir(self) -> Path:
+        return self.root / "voice_output"
+
+    @property
+    def checkpoint_dir(self) -> Path:
+        """Stage checkpoints, so a retried job resumes (see checkpoints.py)"""
+        return self.root / "checkpoints"
+
+    @property
+    def composite_dir(self) -> Path:
+        """Silent segment composites, kept so re-voiced segments only remux"""
+        return self.root / "composites"
+
+    @property
+    def text_file(self) -> Path:
+        """Text extracted from the job's PDF (kept so it is only extracted once)"""
+        return self.root / "text.txt"
+
+    @property
+    def metadata_file(self) -> Path:
+        return self.root / "audio_metadata.json"
+
+    def pdf_files(self) -> list[Path]:
+        """PDFs this workspace should process"""
+        if self.pdf_path is not None:
+            return [self.pdf_path]
+        return sorted(self.pdf_dir.glob("*.pdf"))
+
+    def create(self) -> None:
+        """Create the workspace output directories"""
+        self.voice_dir.mkdir(parents=True, exist_ok=True)
+        self.video_dir.mkdir(parents=True, exist_ok=True)
+
+
+def resolve_workspace(workspace: Optional[Workspace]) -> Workspace:
+    """Return `workspace`, or the shared legacy workspace if None"""
+    return workspace if workspace is not None else Workspace.shared()
+
+
+def remove_job_workspace(job_id: str) -> None:
+    """
+    Delete a job's workspace (voice files, checkpoints, composites).
+
+    Only once nothing will resume the job: its videos are published outside
+    the workspace, but a retry picks up from the checkpoints in it.
+    """
+    shutil.rmtree(JOBS_DIR / job_id, ignore_errors=True)
@@ -0,0 +1,428 @@
+"""
+Staged PDF -> audio -> video pipeline.
+
+Each segment flows through its own chain of stages, so segment 1 is being
+rendered while segment 2 is still in TTS and segment 3 is still waiting on
+Claude:
+
+    pdf_to_chunk (LLM) -> per segment: dialogue (LLM) + TTS -> render
+
+Dialogue and TTS overlap: Claude's response is streamed, and each line goes
+to TTS as soon as it is written.
+
+The network-bound stages (Claude, Fish Audio) run on a thread pool and the
+CPU-bound render stage runs on a process pool. The pools are shared by every
+job in the process and sized independently (LLM_WORKERS, RENDER_WORKERS).
+Claude and Fish Audio requests from every worker go through shared pooled
+clients on one I/O loop (pdf_parser/io_loop.py), paced by their rate limiters.
+
+Every stage leaves a checkpoint in the workspace (pdf_parser/checkpoints.py).
+Running the pipeline again on the same workspace, e.g. when a failed job is
+retried, skips whatever already finished and reuses what it produced.
+"""
+
+import json
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from typing import Awaitable, Callable, Optional
+
+from background_service import BackgroundSource, get_background
+from generate_videos import MORTY_IMAGE, RICK_IMAGE, VIDEO_PATH
+from image_service import DEFAULT_RENDERER, render_segment, segment_render_length
+from pdf_parser.checkpoints import Checkpoints
+from pdf_parser.chunk_to_cartoon import read_cartoon_prompt, split_segment_blocks
+from pdf_parser.dialogue_to_voice import (
+    split_dialogue_by_speaker,
+    stream_dialogue_to_voice,
+    synthesize_dialogue,
+)
+from pdf_parser.io_loop import io_loop
+from pdf_parser.make_metadata import build_segment_metadata
+from pdf_parser.pdf_plumber import pdf_to_chunk
+from pdf_parser.workspace import Workspace
+from render_profiles import DEFAULT_RENDER_PROFILE, get_render_profile
+
+# Called with (event name, event data) as the pipeline makes progress:
+#   segments_planned  {"count"}
+#   lines_planned     {"segment", "count"}  (per line, as Claude writes it)
+#   line_synthesized  {"segment", "line", "speaker", "success"}
+#   segment_rendered  {"segment", "path"}
+#   segment_restored  {"segment"}  (published by an earlier run, not rendered again)
+EventCallback = Callable[[str, dict], None]
+
+
+def _ignore_event(event: str, data: dict) -> None:
+    pass
+
+
+class StagePools:
+    """Independently sized executors for the I/O and CPU stages"""
+
+    def __init__(self, llm_workers: int, render_workers: int):
+        # Segments being written and voiced at once
+        self.llm = ThreadPoolExecutor(llm_workers, thread_name_prefix="llm")
+        # Encodes run in separate processes so they don't contend on the GIL
+        self.render = ProcessPoolExecutor(
+            max_workers=render_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    @classmethod
+    def from_env(cls) -> "StagePools":
+        """Size the pools from LLM_WORKERS and RENDER_WORKERS"""
+        default_render = max(1, (os.cpu_count() or 2) // 2)
+        return cls(
+            llm_workers=int(os.getenv("LLM_WORKERS", 4)),
+            render_workers=int(os.getenv("RENDER_WORKERS", default_render)),
+        )
+
+    def shutdown(self) -> None:
+        for pool in (self.llm, self.render):
+            pool.shutdown(cancel_futures=True)
+
+
+def _then(future: Future, executor: Executor, fn: Callable, *args) -> Future:
+    """Run fn(future.result(), *args) on `executor` as soon as `future` resolves"""
+    chained = Future()
+
+    def _forward(done: Future):
+        if done.exception() is not None:
+            chained.set_exception(done.exception())
+        else:
+            chained.set_result(done.result())
+
+    def _submit(done: Future):
+        if done.exception() is not None:
+            chained.set_exception(done.exception())
+            return
+        try:
+            executor.submit(fn, done.result(), *args).add_done_callback(_forward)
+        except Exception as e:
+            chained.set_exception(e)
+
+    future.add_done_callback(_submit)
+    return chained
+
+
+def _run_on_io_loop(
+    make_coro: Callable[[EventCallback], Awaitable], on_event: EventCallback
+):
+    """
+    Run a coroutine on the I/O loop and block until it returns, like
+    io_loop.run, but deliver the events it raises on the calling thread.
+
+    `make_coro` gets the callback to raise events with. Its events only
+    queue up on the loop; this (otherwise idle) thread hands them to
+    `on_event` in order, so slow callbacks (job store writes) never stall
+    the requests sharing the loop.
+    """
+    events: queue.SimpleQueue = queue.SimpleQueue()
+    done = object()
+    future = io_loop.submit(make_coro(lambda event, data: events.put((event, data))))
+    # Runs after every event the coroutine raised is queued
+    future.add_done_callback(lambda _: events.put(done))
+    while (item := events.get()) is not done:
+        on_event(*item)
+    return future.result()
+
+
+def _prepare_background(video_path: str, width: int, height: int, fps: int) -> str:
+    """Render stage (runs in a worker process): transcode the background once"""
+    return str(get_background(video_path, width, height, fps).prepare())
+
+
+def _segment_pdf(workspace: Workspace) -> list[dict]:
+    """LLM stage: extract the PDF text and split it into segment scripts"""
+    return io_loop.run(pdf_to_chunk(workspace))
+
+
+def _write_and_voice(
+    segment_text: str,
+    cartoon_prompt: str,
+    segment_id: str,
+    segment_number: int,
+    workspace: Workspace,
+    metadata_writer: "_MetadataWriter",
+    on_event: EventCallback,
+    background: BackgroundSource,
+    background_prepared: Future,
+    checkpoints: Checkpoints,
+) -> dict:
+    """
+    Dialogue + TTS stage: stream a segment's dialogue from Claude, voice each
+    line as soon as it is written, and record the segment's metadata entry.
+
+    Resumes from the segment's checkpoints: a voiced segment is taken as it
+    is, and a saved dialogue only has its missing lines voiced.
+    """
+    segment_name = f"segment {segment_number}"
+
+    segment_data = checkpoints.load_json(segment_name)
+    if segment_data is not None and all(
+        (workspace.voice_dir / filename).exists() for filename in segment_data["filename"]
+    ):
+        print(f"  ✓ Reusing voiced {segment_name}")
+        on_event("lines_planned", {"segment": segment_name, "count": len(segment_data["filename"])})
+        for line, speaker in enumerate(segment_data["person"], 1):
+            on_event(
+                "line_synthesized",
+                {"segment": segment_name, "line": line, "speaker": speaker, "success": True},
+            )
+        metadata_writer.add(segment_name, segment_data)
+        # Rendered next, so surface a failed background here too
+        background_prepared.result()
+        return segment_data
+
+    # These run on the I/O loop, and raise events through _run_on_io_loop
+    def on_turn(emit, turn):
+        emit("lines_planned", {"segment": segment_name, "count": 1})
+
+    def on_line(emit, result):
+        emit(
+            "line_synthesized",
+            {
+                "segment": segment_name,
+                "line": result["segment_index"],
+                "speaker": result["speaker"],
+                "success": result["success"],
+            },
+        )
+
+    dialogue = checkpoints.load_text(f"{segment_name}.dialogue")
+    if dialogue is not None:
+        print(f"  ✓ Reusing the dialogue of {segment_name}")
+        on_event(
+            "lines_planned",
+            {"segment": segment_name, "count": len(split_dialogue_by_speaker(dialogue))},
+        )
+        synthesized = _run_on_io_loop(
+            lambda emit: synthesize_dialogue(
+                dialogue,
+                segment_number,
+                workspace.voice_dir,
+                on_line=lambda result: on_line(emit, result),
+                reuse_existing=True,
+            ),
+            on_event,
+        )
+    else:
+        # Lines voiced by an earlier attempt belong to a dialogue that was
+        # never saved, and would be mistaken for lines of the new one
+        for stale in workspace.voice_dir.glob(f"D{segment_number}_S*.mp3"):
+            stale.unlink(missing_ok=True)
+
+        dialogue, synthesized = _run_on_io_loop(
+            lambda emit: stream_dialogue_to_voice(
+                segment_text,
+                cartoon_prompt,
+                segment_id,
+                segment_number,
+                workspace.voice_dir,
+                on_turn=lambda turn: on_turn(emit, turn),
+                on_line=lambda result: on_line(emit, result),
+            ),
+            on_event,
+        )
+        if not dialogue:
+            raise RuntimeError(f"Dialogue generation failed for {segment_id}")
+        # Saved even if some lines failed: a retry only voices those again
+        checkpoints.save_text(f"{segment_name}.dialogue", dialogue)
+
+    # Transient errors were already retried; a missing line would leave a
+    # hole in the dialogue, so fail the segment instead of rendering it
+    failed = [r["segment_id"] for r in synthesized if not r["success"]]
+    if failed:
+        raise RuntimeError(
+            f"TTS failed for segment {segment_number}: {', '.join(failed)}"
+        )
+    if not synthesized:
+        raise RuntimeError(f"No audio generated for segment {segment_number}")
+
+    segment_data = build_segment_metadata(synthesized)
+    # Rendered next, so surface a failed background here too
+    background_prepared.result()
+    # Each segment gets its own stretch of the shared background
+    segment_data["background_offset"] = background.next_offset(
+        segment_render_length(segment_data)
+    )
+    checkpoints.save_json(segment_name, segment_data)
+    metadata_writer.add(segment_name, segment_data)
+    return segment_data
+
+
+def _render(
+    segment_data: dict,
+    segment_name: str,
+    output_dir: str,
+    audio_dir: str,
+    renderer: str,
+    profile: str,
+    composite_dir: str,
+) -> str:
+    """Render stage (runs in a worker process)"""
+    return render_segment(
+        segment_name,
+        segment_data,
+        video_path=str(VIDEO_PATH),
+        rick_image_path=str(RICK_IMAGE),
+        morty_image_path=str(MORTY_IMAGE),
+        output_dir=output_dir,
+        audio_dir=audio_dir,
+        renderer=renderer,
+        profile=profile,
+        composite_dir=composite_dir,
+    )
+
+
+def _segment_order(item: tuple[str, object]) -> int:
+    """Sort key for "segment N" dict items"""
+    return int(item[0].rsplit(" ", 1)[-1])
+
+
+class _MetadataWriter:
+    """Collects segment entries as they finish and keeps the JSON file current"""
+
+    def __init__(self, workspace: Workspace):
+        self._workspace = workspace
+        self._metadata: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def add(self, segment_name: str, segment_data: dict) -> None:
+        with self._lock:
+            self._metadata[segment_name] = segment_data
+            ordered = dict(sorted(self._metadata.items(), key=_segment_order))
+            with open(self._workspace.metadata_file, "w", encoding="utf-8") as f:
+                json.dump(ordered, f, indent=2, ensure_ascii=False)
+
+
+def run_pipeline(
+    workspace: Workspace,
+    pools: StagePools,
+    on_event: Optional[EventCallback] = None,
+    renderer: str = DEFAULT_RENDERER,
+    profile: str = DEFAULT_RENDER_PROFILE,
+) -> dict[str, str]:
+    """
+    Run the staged pipeline for one workspace.
+
+    Args:
+        workspace: Job workspace (its PDF is processed, outputs go under it)
+        pools: Stage executors shared across jobs
+        on_event: Progress callback (see EventCallback). "segment_rendered"
+            fires as each segment's video is ready, in completion order, so
+            callers can publish it before the rest of the job finishes.
+        renderer: Segment renderer, see image_service.RENDERERS
+        profile: Render profile name, see render_profiles.RENDER_PROFILES
+
+    Returns:
+        Dict mapping segment_name -> video path, for the segments rendered
+        by this run (those restored from an earlier run are only reported
+        through "segment_restored")
+    """
+    on_event = on_event or _ignore_event
+    workspace.create()
+
+    cartoon_prompt = read_cartoon_prompt()
+    if cartoon_prompt is None:
+        raise RuntimeError("Cartoon prompt could not be read")
+
+    # Transcode the background to the profile's format (first run only)
+    # while Claude works, on the render pool that's idle until then
+    video_format = get_render_profile(profile).video_format
+    background = get_background(VIDEO_PATH, *video_format)
+    background_prepared = pools.render.submit(
+        _prepare_background, str(VIDEO_PATH), *video_format
+    )
+
+    checkpoints = Checkpoints(workspace.checkpoint_dir)
+
+    # LLM stage 1: segment the PDF
+    pdf_results = checkpoints.load_json("segmentation")
+    if pdf_results is not None:
+        print("  ✓ Reusing the saved segmentation")
+    else:
+        pdf_results = pools.llm.submit(_segment_pdf, workspace).result()
+        if not pdf_results:
+            raise RuntimeError("PDF segmentation failed")
+        checkpoints.save_json("segmentation", pdf_results)
+
+    scripts = []
+    for pdf_result in pdf_results:
+        for segment_text in split_segment_blocks(pdf_result["segments"]):
+            scripts.append((pdf_result["pdf_name"], segment_text))
+
+    metadata_writer = _MetadataWriter(workspace)
+    on_event("segments_planned", {"count": len(scripts)})
+
+    # Chain dialogue + TTS -> render per segment; segments proceed independently
+    render_futures = {}
+    for segment_number, (pdf_name, segment_text) in enumerate(scripts, 1):
+        segment_name = f"segment {segment_number}"
+        segment_id = f"{pdf_name} - Segment {segment_number}"
+
+        # Published by an earlier run; its video is already with the job
+        if checkpoints.load_json(f"{segment_name}.published") is not None:
+            print(f"  ✓ {segment_name} was already published")
+            segment_data = checkpoints.load_json(segment_name)
+            if segment_data is not None:
+                metadata_writer.add(segment_name, segment_data)
+            on_event("segment_restored", {"segment": segment_name})
+            continue
+
+        voiced = pools.llm.submit(
+            _write_and_voice,
+            segment_text,
+            cartoon_prompt,
+            segment_id,
+            segment_number,
+            workspace,
+            metadata_writer,
+            on_event,
+            background,
+            background_prepared,
+            checkpoints,
+        )
+        rendered = _then(
+            voiced,
+            pools.render,
+            _render,
+            segment_name,
+            str(workspace.video_dir),
+            str(workspace.voice_dir),
+            renderer,
+            profile,
+            str(workspace.composite_dir),
+        )
+        render_futures[rendered] = segment_name
+
+    # A failed segment doesn't hold back the others: everything that does
+    # finish is published and checkpointed, so a retry only redoes the rest
+    output_paths = {}
+    failures = []
+    for future in as_completed(render_futures):
+        segment_name = render_futures[future]
+        try:
+            output_paths[segment_name] = future.result()
+        except Exception as e:
+            print(f"  ✗ {segment_name} failed: {e}")
+            failures.append(e)
+            continue
+        print(f"  ✓ Rendered {segment_name}")
+        on_event(
+            "segment_rendered",
+            {"segment": segment_name, "path": output_paths[segment_name]},
+        )
+        checkpoints.save_json(f"{segment_name}.published", {"segment": segment_name})
+
+    if failures:
+        raise failures[0]
+    return dict(sorted(output_paths.items(), key=_segment_order))
@@ -0,0 +1,80 @@
+"""
+Lock-striped in-memory registry.
+
+Keys are spread over a fixed number of stripes, each a dict with its own
+lock, so writers working on different keys (e.g. pipeline threads publishing
+events for different jobs) rarely wait on each other. Lookups take no lock
+at all: a single dict read is atomic, and values are meant to be records
+that are replaced rather than mutated, or that guard their own state.
+"""
+
+import threading
+from typing import Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+class _Stripe:
+    __slots__ = ("items", "lock")
+
+    def __init__(self):
+        self.items: Dict[Hashable, object] = {}
+        self.lock = threading.Lock()
+
+
+class StripedRegistry(Generic[V]):
+    """A dict split into `stripes` independently locked parts"""
+
+    def __init__(self, stripes: int = 16):
+        if stripes < 1:
+            raise ValueError("stripes must be at least 1")
+        self._stripes = tuple(_Stripe() for _ in range(stripes))
+
+    def _stripe(self, key: Hashable) -> _Stripe:
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """The value for `key`, or None. Never blocks"""
+        return self._stripe(key).items.get(key)
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], V]) -> V:
+        """The value for `key`, created with `factory()` if there is none yet"""
+        stripe = self._stripe(key)
+        value = stripe.items.get(key)
+        if value is not None:
+            return value
+        with stripe.lock:
+            value = stripe.items.get(key)
+            if value is None:
+                value = stripe.items[key] = factory()
+            return value
+
+    def put(self, key: Hashable, value: V) -> None:
+        stripe = self._stripe(key)
+        with stripe.lock:
+            stripe.items[key] = value
+
+    def pop(self, key: Hashable) -> Optional[V]:
+        stripe = self._stripe(key)
+        with stripe.lock:
+            return stripe.items.pop(key, None)
+
+    def evict(self, predicate: Callable[[V], bool]) -> int:
+        """
+        Remove every value for which `predicate(value)` is true, one stripe
+        at a time (writers to other stripes carry on meanwhile).
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        for stripe in self._stripes:
+            with stripe.lock:
+                stale = [key for key, value in stripe.items.items() if predicate(value)]
+                for key in stale:
+                    del stripe.items[key]
+            removed += len(stale)
+        return removed
+
+    def __len__(self) -> int:
+        return sum(len(stripe.items) for stripe in self._stripes)
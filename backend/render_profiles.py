@@ -0,0 +1,129 @@
+import os
+from typing import Optional, Union
+
+from background_service import BACKGROUND_FPS, BACKGROUND_HEIGHT, BACKGROUND_WIDTH
+from hls_service import HLS_PACKAGING, HLS_SEGMENT_SECONDS
+
+# x264 threads per encode (unset: one per core). Worth capping when several
+# RENDER_WORKERS encode at once, so they don't oversubscribe the CPU.
+RENDER_THREADS = int(os.environ["RENDER_THREADS"]) if os.getenv("RENDER_THREADS") else None
+
+# Longest stretch between keyframes. HLS segments can only start on one, so
+# packaged videos get one per segment; a shorter GOP costs bits (~6% at 4 s,
+# ~20% at 2 s on the sample background), so otherwise x264 picks.
+KEYFRAME_SECONDS = HLS_SEGMENT_SECONDS if HLS_PACKAGING else None
+
+# Move the moov atom in front of the media data, so a player can start on
+# the first bytes of the file instead of fetching its tail first
+FASTSTART = ["-movflags", "+faststart"]
+
+
+class RenderProfile:
+    """
+    Encoder settings and output format for segment videos.
+
+    Profiles only use x264 options, so the same profile gives the same
+    output (and the same relative speed) on any machine.
+    """
+
+    name: str
+    preset: str  # x264 preset, "ultrafast" ... "veryslow"
+    crf: int  # x264 quality, lower is better (and larger)
+    threads: Optional[int]  # None lets x264 pick
+    width: int
+    height: int
+    fps: int
+    keyframe_seconds: Optional[float]  # None lets x264 pick
+
+    def __init__(
+        self,
+        name: str,
+        preset: str,
+        crf: int,
+        width: int,
+        height: int,
+        fps: int,
+        threads: Optional[int] = RENDER_THREADS,
+        keyframe_seconds: Optional[float] = KEYFRAME_SECONDS,
+    ):
+        self.name = name
+        self.preset = preset
+        self.crf = crf
+        self.threads = threads
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.keyframe_seconds = keyframe_seconds
+
+    @property
+    def video_format(self) -> tuple[int, int, int]:
+        """(width, height, fps), the format the background is prepared at"""
+        return self.width, self.height, self.fps
+
+    @property
+    def gop_size(self) -> Optional[int]:
+        """Most frames between keyframes, None for x264's default"""
+        if self.keyframe_seconds is None:
+            return None
+        return max(1, round(self.fps * self.keyframe_seconds))
+
+    def _gop_args(self) -> list[str]:
+        return ["-g", str(self.gop_size)] if self.gop_size is not None else []
+
+    def moviepy_params(self) -> dict:
+        """Video encoder keyword arguments for moviepy's write_videofile"""
+        return {
+            "codec": "libx264",
+            "preset": self.preset,
+            "threads": self.threads,
+            "ffmpeg_params": ["-crf", str(self.crf), *self._gop_args(), *FASTSTART],
+        }
+
+    def ffmpeg_args(self) -> list[str]:
+        """Video encoder arguments for an ffmpeg command line"""
+        args = ["-c:v", "libx264", "-preset", self.preset, "-crf", str(self.crf)]
+        args += self._gop_args()
+        if self.threads is not None:
+            args += ["-threads", str(self.threads)]
+        return args + FASTSTART
+
+
+RENDER_PROFILES: dict[str, RenderProfile] = {
+    # Quick previews: small, fast, visibly compressed
+    "draft": RenderProfile("draft", preset="ultrafast", crf=32, width=360, height=640, fps=24),
+    # x264's own defaults at the configured background format (what
+    # segments were always rendered with)
+    "standard": RenderProfile(
+        "standard",
+        preset="medium",
+        crf=23,
+        width=BACKGROUND_WIDTH,
+        height=BACKGROUND_HEIGHT,
+        fps=BACKGROUND_FPS,
+    ),
+    # Full HD, near-transparent quality, slow
+    "archive": RenderProfile("archive", preset="slow", crf=18, width=1080, height=1920, fps=30),
+}
+
+DEFAULT_RENDER_PROFILE = os.getenv("RENDER_PROFILE", "standard")
+
+
+def get_render_profile(profile: Union[str, RenderProfile, None] = None) -> RenderProfile:
+    """
+    Look up a render profile by name.
+
+    Args:
+        profile: Profile name, a RenderProfile (returned as is), or None for
+            DEFAULT_RENDER_PROFILE
+
+    Raises:
+        ValueError: if there is no profile with that name
+    """
+    if isinstance(profile, RenderProfile):
+        return profile
+    name = profile or DEFAULT_RENDER_PROFILE
+    if name not in RENDER_PROFILES:
+        raise ValueError(
+            f"Unknown render profile '{name}', expected one of {list(RENDER_PROFILES)}"
+        )
+    return RENDER_PROFILES[name]
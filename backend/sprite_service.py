@@ -0,0 +1,124 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Union
+
+import numpy as np
+from moviepy.tools import compute_position
+from PIL import Image
+
+# Sprites kept per process (a few speaker images at a few sizes)
+SPRITE_CACHE_SIZE = int(os.getenv("SPRITE_CACHE_SIZE", 16))
+
+
+class Sprite:
+    """
+    A speaker image resized and placed for one video size, ready to blend.
+
+    Only the bounding box the sprite covers is touched when blending, with
+    the alpha weights precomputed, instead of compositing a full-frame
+    RGBA canvas for every frame like CompositeVideoClip does.
+    """
+
+    rgb: np.ndarray  # (h, w, 3) uint16 color, premultiplied by alpha
+    inverse_alpha: np.ndarray  # (h, w, 1) uint16, 255 - alpha
+    opaque: bool
+    # Region of the frame covered: frame[top:bottom, left:right]
+    top: int
+    bottom: int
+    left: int
+    right: int
+
+    def __init__(self, rgba: np.ndarray, position: tuple[int, int], video_size: tuple[int, int]):
+        height, width = rgba.shape[:2]
+        x, y = position
+        video_width, video_height = video_size
+
+        # Clip the box to the frame, and the sprite with it
+        self.left, self.top = max(0, x), max(0, y)
+        self.right, self.bottom = min(video_width, x + width), min(video_height, y + height)
+        visible = rgba[self.top - y : self.bottom - y, self.left - x : self.right - x]
+
+        alpha = visible[:, :, 3:4].astype(np.uint16)
+        self.rgb = visible[:, :, :3].astype(np.uint16) * alpha
+        self.inverse_alpha = 255 - alpha
+        self.opaque = bool((alpha == 255).all())
+
+    def blend_onto(self, frame: np.ndarray) -> np.ndarray:
+        """Alpha-blend the sprite onto a frame (in place when it is writable)"""
+        if not frame.flags.writeable:
+            frame = frame.copy()
+        if self.bottom <= self.top or self.right <= self.left:
+            return frame
+
+        region = frame[self.top : self.bottom, self.left : self.right]
+        if self.opaque:
+            region[...] = self.rgb // 255
+        else:
+            # Same rounding as Pillow's alpha_composite: (src*a + dst*(255-a)) / 255
+            region[...] = (self.rgb + region * self.inverse_alpha + 127) // 255
+        return frame
+
+
+class SpriteCache:
+    """
+    Sprites keyed by (image, target width, video size, position).
+
+    Resizing a PNG and building its mask happens once per process instead
+    of once per segment; later segments and jobs reuse the arrays.
+    """
+
+    def __init__(self, max_entries: int = SPRITE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._sprites: "OrderedDict[tuple, Sprite]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        image_path: str,
+        width: int,
+        video_size: tuple[int, int],
+        position: Union[str, tuple] = ("center", "bottom"),
+    ) -> Sprite:
+        """The sprite for `image_path` scaled to `width` on a `video_size` frame"""
+        key = (
+            os.path.abspath(image_path),
+            os.path.getmtime(image_path),
+            width,
+            tuple(video_size),
+            position if isinstance(position, str) else tuple(position),
+        )
+        with self._lock:
+            sprite = self._sprites.get(key)
+            if sprite is not None:
+                self._sprites.move_to_end(key)
+                return sprite
+
+        sprite = self._load(image_path, width, video_size, position)
+
+        with self._lock:
+            self._sprites[key] = sprite
+            while len(self._sprites) > self.max_entries:
+                self._sprites.popitem(last=False)
+        return sprite
+
+    @staticmethod
+    def _load(image_path, width, video_size, position) -> Sprite:
+        image = Image.open(image_path)
+        rgb = image.convert("RGB")
+        alpha = image.getchannel("A") if "A" in image.getbands() else None
+
+        # Resize color and mask separately with LANCZOS, like moviepy's resized()
+        height = int(image.height * width / image.width)
+        rgb = rgb.resize((width, height), Image.Resampling.LANCZOS)
+        if alpha is not None:
+            alpha = alpha.resize((width, height), Image.Resampling.LANCZOS)
+        else:
+            alpha = Image.new("L", (width, height), 255)
+
+        rgba = np.dstack([np.asarray(rgb), np.asarray(alpha)])
+        return Sprite(rgba, compute_position((width, height), video_size, position), video_size)
+
+
+# Global instance
+sprite_cache = SpriteCache()
@@ -2,17 +2,20 @@
 # from moviepy import *
 from moviepy import *
 
+from render_profiles import get_render_profile
+
 
 # Assumes the video and audio file already exist.
 # Given an audio file and a video file, overlays the audio fileo onto the video file, and save into the output file.
-def overlay_audio_on_video(video_file, audio_file, output_file) -> str:
+# `profile` picks the encoder settings (see render_profiles), default DEFAULT_RENDER_PROFILE.
+def overlay_audio_on_video(video_file, audio_file, output_file, profile=None) -> str:
     try:
         video_clip = VideoFileClip(video_file)
         audio_clip = AudioFileClip(audio_file)
 
         # Concatenate the video clip with the audio clip
         final_clip = video_clip.with_audio(audio_clip)
-        final_clip.write_videofile(output_file)
+        final_clip.write_videofile(output_file, **get_render_profile(profile).moviepy_params())
 
     except Exception as e:
         print(f"Failed to overlay audio on video: {e}")
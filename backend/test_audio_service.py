@@ -0,0 +1,98 @@
+"""
+Frame-level MP3 merging against the decoder.
+
+Encodes tone lines as tagged MP3s (ID3v2 tag plus a LAME header frame, as
+TTS responses come), merges them without re-encoding, decodes the result
+and checks that the reported length and line offsets are where the decoder
+actually puts the audio. Run with pytest, or directly:
+python test_audio_service.py
+"""
+
+import subprocess
+import tempfile
+from pathlib import Path
+
+import imageio_ffmpeg
+import numpy as np
+
+from audio_service import merge_audio, parse_mp3_frames
+
+SAMPLE_RATE = 44100
+LINE_SECONDS = [0.5, 0.7, 0.3]
+GAP = 0.1
+# One sample either way, for rounding
+TOLERANCE = 1.5 / SAMPLE_RATE
+
+
+def make_lines(root: Path) -> list[Path]:
+    """A tone per line, encoded with libmp3lame at the TTS format"""
+    paths = []
+    for index, seconds in enumerate(LINE_SECONDS, 1):
+        path = root / f"D1_S{index}.mp3"
+        subprocess.run(
+            [
+                imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-loglevel", "error",
+                "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate={SAMPLE_RATE}:duration={seconds}",
+                "-ac", "1", "-c:a", "libmp3lame", "-b:a", "64k",
+                "-metadata", f"title=line {index}", str(path),
+            ],
+            check=True,
+        )
+        paths.append(path)
+    return paths
+
+
+def decode(path: Path) -> np.ndarray:
+    """All the samples a decoder outputs for a file, mono 16-bit"""
+    result = subprocess.run(
+        [
+            imageio_ffmpeg.get_ffmpeg_exe(), "-loglevel", "error", "-i", str(path),
+            "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return np.frombuffer(result.stdout, dtype=np.int16)
+
+
+def sound_starts(samples: np.ndarray) -> list[float]:
+    """Where each run of tone starts, in seconds (runs split by silence)"""
+    loud = np.flatnonzero(np.abs(samples) > 300)
+    breaks = np.flatnonzero(np.diff(loud) > SAMPLE_RATE * GAP / 2)
+    return [loud[0] / SAMPLE_RATE] + [loud[i + 1] / SAMPLE_RATE for i in breaks]
+
+
+def check_merge(root: Path) -> None:
+    lines = make_lines(root)
+    for line, seconds in zip(lines, LINE_SECONDS):
+        frames = parse_mp3_frames(line.read_bytes())
+        assert frames.encoder_delay > 0 and frames.encoder_padding > 0, "no LAME tag read"
+        assert abs(frames.audio_duration - seconds) <= TOLERANCE
+
+    merged = merge_audio(lines, root / "merged.mp3", gap=GAP)
+    assert merged.stream_copied
+
+    samples = decode(merged.path)
+    decoded_seconds = len(samples) / SAMPLE_RATE
+    print(f"  reported {merged.duration:.4f}s, decoded {decoded_seconds:.4f}s")
+    assert abs(merged.duration - decoded_seconds) <= TOLERANCE
+
+    # Offsets and durations are the lines' own audio, not their padding
+    starts = sound_starts(samples)
+    print(f"  offsets {[round(o, 4) for o in merged.offsets]}, sound at {[round(s, 4) for s in starts]}")
+    assert len(starts) == len(LINE_SECONDS)
+    for offset, start in zip(merged.offsets, starts):
+        # The tone starts at zero amplitude, so it crosses the threshold a little late
+        assert 0 <= start - offset <= 0.002
+    for duration, seconds in zip(merged.durations, LINE_SECONDS):
+        assert abs(duration - seconds) <= TOLERANCE
+
+
+def test_stream_copied_merge_matches_decoder(tmp_path):
+    check_merge(tmp_path)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        check_merge(Path(tmp))
+    print("✓ Merged MP3 offsets and length match the decoder")
@@ -0,0 +1,125 @@
+"""
+Output-equivalence test: the ffmpeg renderer against the moviepy reference.
+
+Renders the same segment with both renderers over a generated background
+and compares the decoded frames. The speaker's box must match closely in
+every line's window, and outside the dialogue both must show the bare
+background. Run with pytest, or directly: python test_ffmpeg_renderer.py
+"""
+
+import subprocess
+import tempfile
+from pathlib import Path
+
+import imageio_ffmpeg
+import numpy as np
+from moviepy import VideoFileClip
+
+import background_service
+from background_service import BackgroundSource
+from image_service import render_segment
+from pdf_parser.fake_tts_server import silent_mp3
+from render_profiles import RenderProfile
+from sprite_service import sprite_cache
+
+SCRIPT_DIR = Path(__file__).parent
+RICK_IMAGE = SCRIPT_DIR / "images" / "rick.png"
+MORTY_IMAGE = SCRIPT_DIR / "images" / "rick-and-morty-rick-morty-projectacademy-medium-17.png"
+
+# Small format so the test runs in seconds
+WIDTH, HEIGHT, FPS = 180, 320, 15
+PROFILE = RenderProfile("test", preset="medium", crf=23, width=WIDTH, height=HEIGHT, fps=FPS)
+
+SEGMENT = {
+    "person": ["rick", "morty", "rick"],
+    "timestamps": [1.0, 2.4, 3.2],
+    "filename": ["D1_S1_rick.mp3", "D1_S2_morty.mp3", "D1_S3_rick.mp3"],
+    "background_offset": 1.0,
+}
+
+# Minimum PSNR (dB) between the two renders. Both are lossy x264 encodes of
+# the same picture and land around 36-44 dB on the busy test pattern; a
+# frame off in time or a wrong/missing speaker drops below 20 dB
+MIN_PSNR = 30.0
+
+
+def psnr(a: np.ndarray, b: np.ndarray) -> float:
+    mse = np.mean((a.astype(np.float64) - b.astype(np.float64)) ** 2)
+    return float("inf") if mse == 0 else 10 * np.log10(255.0**2 / mse)
+
+
+def make_fixtures(root: Path) -> Path:
+    """A moving test-pattern background and one silent MP3 per line"""
+    background = root / "background.mp4"
+    subprocess.run(
+        [
+            imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-loglevel", "error",
+            "-f", "lavfi", "-i", f"testsrc2=size=360x640:rate={FPS}:duration=20",
+            "-c:v", "libx264", "-pix_fmt", "yuv420p", str(background),
+        ],
+        check=True,
+    )
+    for filename, end, start in zip(
+        SEGMENT["filename"], SEGMENT["timestamps"], [0.0] + SEGMENT["timestamps"]
+    ):
+        (root / filename).write_bytes(silent_mp3(end - start))
+
+    # Prepare the background under the test's directory, not data/cache
+    source = BackgroundSource(background, cache_dir=root / "cache", width=WIDTH, height=HEIGHT, fps=FPS)
+    background_service._sources[(str(background.resolve()), *PROFILE.video_format)] = source
+    return background
+
+
+def render_both(root: Path) -> dict[str, str]:
+    background = make_fixtures(root)
+    return {
+        renderer: render_segment(
+            f"segment {renderer}",
+            SEGMENT,
+            video_path=str(background),
+            rick_image_path=str(RICK_IMAGE),
+            morty_image_path=str(MORTY_IMAGE),
+            output_dir=str(root / "out"),
+            audio_dir=str(root),
+            renderer=renderer,
+            profile=PROFILE,
+        )
+        for renderer in ("moviepy", "ffmpeg")
+    }
+
+
+def check_equivalent(outputs: dict[str, str]) -> None:
+    reference = VideoFileClip(outputs["moviepy"])
+    candidate = VideoFileClip(outputs["ffmpeg"])
+    try:
+        assert reference.size == candidate.size == [WIDTH, HEIGHT]
+        assert abs(reference.duration - candidate.duration) <= 1.5 / FPS
+        assert reference.audio is not None and candidate.audio is not None
+
+        sprite = sprite_cache.get(str(RICK_IMAGE), int(WIDTH * 0.3), (WIDTH, HEIGHT))
+        box = (slice(sprite.top, sprite.bottom), slice(sprite.left, sprite.right))
+
+        # Middle of every line, then after the dialogue (background only)
+        ends = SEGMENT["timestamps"]
+        times = [(start + end) / 2 for start, end in zip([0.0] + ends, ends)]
+        times.append(ends[-1] + 2.0)
+
+        for t in times:
+            expected, actual = reference.get_frame(t), candidate.get_frame(t)
+            whole, speaker_box = psnr(expected, actual), psnr(expected[box], actual[box])
+            print(f"  t={t:.2f}s  frame {whole:.1f} dB  speaker box {speaker_box:.1f} dB")
+            assert whole >= MIN_PSNR, f"frames differ at t={t:.2f}s ({whole:.1f} dB)"
+            assert speaker_box >= MIN_PSNR, f"speaker differs at t={t:.2f}s ({speaker_box:.1f} dB)"
+    finally:
+        reference.close()
+        candidate.close()
+
+
+def test_ffmpeg_renderer_matches_moviepy(tmp_path):
+    check_equivalent(render_both(tmp_path))
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        check_equivalent(render_both(Path(tmp)))
+    print("✓ ffmpeg and moviepy renders match")
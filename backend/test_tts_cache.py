@@ -0,0 +1,89 @@
+"""
+TTS cache tests: the pipeline's TTS calls against the fake Fish Audio
+server, and ContentCache's size bound and eviction.
+
+Voicing the same dialogue twice must only reach the network the first time;
+the second run is served entirely from the cache. Run with pytest, or
+directly: python test_tts_cache.py
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+from pdf_parser import dialogue_to_voice
+from pdf_parser.content_cache import ContentCache
+from pdf_parser.fake_tts_server import start_fake_tts_server
+from pdf_parser.io_loop import io_loop
+
+DIALOGUE = (
+    "[rick] Morty, listen, the mitochondria is the powerhouse of the cell. "
+    "[morty] Oh geez Rick, what does that even mean? "
+    "[rick] It makes the energy, Morty. ATP. "
+    "[morty] Okay, okay, I think I get it."
+)
+LINES = len(dialogue_to_voice.split_dialogue_by_speaker(DIALOGUE))
+
+
+def voice_twice(root: Path) -> None:
+    server = start_fake_tts_server()
+    saved = (dialogue_to_voice.TTS_API_URL, dialogue_to_voice.tts_cache, os.environ.get("FISH_API_TOKEN"))
+    dialogue_to_voice.TTS_API_URL = server.url
+    dialogue_to_voice.tts_cache = ContentCache(root / "cache", max_bytes=1024 * 1024, suffix=".mp3")
+    os.environ["FISH_API_TOKEN"] = "test"
+    try:
+        first = io_loop.run(dialogue_to_voice.synthesize_dialogue(DIALOGUE, 1, root / "first"))
+        assert all(line["success"] for line in first)
+        assert server.request_count == LINES
+        assert dialogue_to_voice.tts_cache.stats()["misses"] == LINES
+
+        # A fresh output directory, so nothing is reused from the first run's files
+        second = io_loop.run(dialogue_to_voice.synthesize_dialogue(DIALOGUE, 1, root / "second"))
+        assert server.request_count == LINES, "second run reached the TTS server"
+        stats = dialogue_to_voice.tts_cache.stats()
+        assert stats["hits"] == LINES and stats["misses"] == LINES
+        assert [line["audio_data"] for line in second] == [line["audio_data"] for line in first]
+        print(f"  {LINES} lines: {server.request_count} requests, cache {stats}")
+    finally:
+        dialogue_to_voice.TTS_API_URL, dialogue_to_voice.tts_cache, token = saved
+        if token is None:
+            os.environ.pop("FISH_API_TOKEN", None)
+        else:
+            os.environ["FISH_API_TOKEN"] = token
+        server.shutdown()
+        server.server_close()
+
+
+def check_eviction(root: Path) -> None:
+    cache = ContentCache(root / "lru", max_bytes=350)
+    for index, key in enumerate(("aa01", "bb02", "cc03")):
+        path = cache.put(key, bytes(100))
+        # Distinct, increasing recency whatever the filesystem's mtime resolution
+        os.utime(path, (1000 + index, 1000 + index))
+    assert cache.stats()["bytes"] == 300
+
+    # Using the oldest entry makes the second one the least recently used
+    assert cache.get("aa01") == bytes(100)
+    cache.put("dd04", bytes(100))
+
+    stats = cache.stats()
+    assert stats["bytes"] == 300
+    assert stats["hits"] == 1
+    assert cache.get("bb02") is None
+    assert cache.get("aa01") is not None and cache.get("cc03") is not None
+    assert cache.get("dd04") is not None
+
+
+def test_second_run_is_served_from_the_cache(tmp_path):
+    voice_twice(tmp_path)
+
+
+def test_eviction_keeps_the_cache_within_its_size(tmp_path):
+    check_eviction(tmp_path)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        voice_twice(Path(tmp))
+        check_eviction(Path(tmp))
+    print("✓ TTS cache serves repeated lines and stays within its size")
@@ -0,0 +1,71 @@
+import hashlib
+import os
+from pathlib import Path
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+# Uploads are copied to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Largest PDF accepted (MAX_UPLOAD_MB, default 100 MB)
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", 100)) * 1024 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured maximum size"""
+
+
+class SavedUpload:
+    """An upload written to disk"""
+
+    path: Path
+    size: int
+    sha256: str
+
+    def __init__(self, path: Path, size: int, sha256: str):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+
+def _write_chunk(file_handle, digest, chunk: bytes) -> None:
+    digest.update(chunk)
+    file_handle.write(chunk)
+
+
+async def save_upload(
+    upload: UploadFile, destination: Path, max_bytes: int = MAX_UPLOAD_BYTES
+) -> SavedUpload:
+    """
+    Stream an upload to `destination` chunk by chunk, hashing it on the way.
+
+    Only one chunk is held in memory at a time, and the hashing and writing
+    run in the threadpool so large uploads don't stall the event loop. The
+    partial file is removed if the upload is too large or the copy fails.
+
+    Raises:
+        UploadTooLargeError: as soon as more than `max_bytes` have been read
+    """
+    digest = hashlib.sha256()
+    size = 0
+
+    file_handle = await run_in_threadpool(open, destination, "wb")
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLargeError(
+                    f"Upload exceeds the {max_bytes // (1024 * 1024)} MB limit"
+                )
+            await run_in_threadpool(_write_chunk, file_handle, digest, chunk)
+    except BaseException:
+        await run_in_threadpool(file_handle.close)
+        destination.unlink(missing_ok=True)
+        raise
+    await run_in_threadpool(file_handle.close)
+
+    return SavedUpload(destination, size, digest.hexdigest())
@@ -3,10 +3,14 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Iterator, Dict, Optional
 
+from job_store import JobStore, job_store
+
 
 class VideoMetadata:
     """Video metadata model"""
 
+    __slots__ = ("video_id", "video_path")
+
     video_id: str
     video_path: Path
 
@@ -16,38 +20,31 @@ class VideoMetadata:
 
 
 class VideoMetadataService:
-    """Service to manage video metadata in memory"""
+    """Service to manage video metadata, kept in the persistent job store"""
 
-    def __init__(self):
-        self._videos: Dict[str, VideoMetadata] = {}
-        self._videos["1"] = VideoMetadata(
-            1, Path("storage/outputs/minecraft_parkour_video.mp4")
-        )
+    def __init__(self, store: JobStore = job_store):
+        self._store = store
 
     def add_video_metadata(self, video_id: str, video_path: str) -> VideoMetadata:
         """Add a new video to the store"""
-        video = VideoMetadata(video_id=video_id, video_path=video_path)
-        self._videos[video_id] = video
+        video = VideoMetadata(video_id=video_id, video_path=Path(video_path))
+        self._store.add_video(video_id, str(video_path))
         return video
 
     def get_video_metadata(self, video_id: str) -> Optional[VideoMetadata]:
         """Get video metadata by ID"""
-        return self._videos.get(video_id)
+        video_path = self._store.get_video_path(video_id)
+        if video_path is None:
+            return None
+        return VideoMetadata(video_id=video_id, video_path=Path(video_path))
 
     def remove_video_metadata(self, video_id: str) -> bool:
         """Remove video metadata from store. Returns True if removed, False if not found"""
-        if video_id in self._videos:
-            del self._videos[video_id]
-            return True
-        return False
-
-    # def get_all_videos(self) -> Dict[str, VideoMetadata]:
-    #     """Get all videos"""
-    #     return self._videos.copy()
+        return self._store.remove_video(video_id)
 
     def video_metadata_exists(self, video_id: str) -> bool:
         """Check if a video exists"""
-        return video_id in self._videos
+        return self._store.get_video_path(video_id) is not None
 
 
 # Global instance
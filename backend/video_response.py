@@ -0,0 +1,191 @@
+"""
+Video file responses: byte ranges, conditional requests and zero-copy sends.
+
+Published videos never change once their ID is handed out (a new render
+gets a new ID), so responses carry a strong validator and immutable cache
+headers, and clients revalidate with If-None-Match / If-Range instead of
+downloading a video again.
+
+The body is sent with the ASGI zero-copy extension (the server calls
+os.sendfile) or, for whole files, the pathsend extension when the server
+offers them. Otherwise the file is read with os.pread in large chunks on a
+worker thread, so the event loop never touches the disk.
+"""
+
+import os
+import stat
+from email.utils import formatdate
+from pathlib import Path
+from typing import Optional
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+CHUNK_SIZE = 1024 * 1024
+
+# Safe for anything whose URL is never reused for different bytes
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def parse_range(range_header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a Range header into an inclusive (start, end) byte range.
+
+    Returns:
+        The range, or None if the header should be ignored (not a single
+        bytes range), in which case the whole file is sent
+
+    Raises:
+        RangeNotSatisfiable: if the range starts past the end of the file
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = (part.strip() for part in spec.partition("-"))
+    if not dash or not (first or last):
+        return None
+    if (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable(range_header)
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    if start >= size:
+        raise RangeNotSatisfiable(range_header)
+    end = int(last) if last else size - 1
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _etag_listed(header: str, etag: str) -> bool:
+    """Whether an If-None-Match list names `etag` (weak comparison)"""
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in (tag.removeprefix("W/") for tag in tags)
+
+
+class VideoFileResponse(Response):
+    """
+    A video file, honouring Range, If-Range and If-None-Match.
+
+    Args:
+        path: Video file (must exist)
+        cache_control: Cache-Control for the response and its 304s
+        media_type: Content-Type (e.g. for HLS playlists and segments)
+    """
+
+    media_type = "video/mp4"
+
+    def __init__(
+        self,
+        path: Path,
+        cache_control: str = IMMUTABLE_CACHE_CONTROL,
+        media_type: Optional[str] = None,
+    ):
+        self.path = Path(path)
+        if media_type is not None:
+            self.media_type = media_type
+        self.status_code = 200
+        self.background = None
+        self.stat_result = os.stat(self.path)
+        if not stat.S_ISREG(self.stat_result.st_mode):
+            raise FileNotFoundError(f"Not a file: {self.path}")
+
+        self.size = self.stat_result.st_size
+        # Size and mtime identify the bytes; videos are written once
+        self.etag = f'"{self.size:x}-{self.stat_result.st_mtime_ns:x}"'
+        self.last_modified = formatdate(self.stat_result.st_mtime, usegmt=True)
+        self.init_headers(
+            {
+                "accept-ranges": "bytes",
+                "cache-control": cache_control,
+                "etag": self.etag,
+                "last-modified": self.last_modified,
+                "content-length": str(self.size),
+            }
+        )
+
+    def _range_applies(self, if_range: Optional[str]) -> bool:
+        # If-Range needs a strong match, otherwise the whole file is sent
+        return if_range is None or if_range.strip() in (self.etag, self.last_modified)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request_headers = Headers(scope=scope)
+        send_header_only = scope["method"].upper() == "HEAD"
+
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None and _etag_listed(if_none_match, self.etag):
+            not_modified = [
+                (name, value) for name, value in self.raw_headers
+                if name in (b"cache-control", b"etag", b"last-modified")
+            ]
+            await send({"type": "http.response.start", "status": 304, "headers": not_modified})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        start, end = 0, self.size - 1
+        status_code = 200
+        range_header = request_headers.get("range")
+        if range_header is not None and self._range_applies(request_headers.get("if-range")):
+            try:
+                byte_range = parse_range(range_header, self.size)
+            except RangeNotSatisfiable:
+                await Response(
+                    status_code=416, headers={"content-range": f"bytes */{self.size}"}
+                )(scope, receive, send)
+                return
+            if byte_range is not None:
+                start, end = byte_range
+                status_code = 206
+                self.headers["content-range"] = f"bytes {start}-{end}/{self.size}"
+                self.headers["content-length"] = str(end - start + 1)
+
+        await send({"type": "http.response.start", "status": status_code, "headers": self.raw_headers})
+        if send_header_only or self.size == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        await self._send_body(scope, send, start, end - start + 1, whole=status_code == 200)
+
+    async def _send_body(self, scope: Scope, send: Send, offset: int, count: int, whole: bool) -> None:
+        extensions = scope.get("extensions") or {}
+        if "http.response.zerocopy" in extensions:
+            with open(self.path, "rb") as file:
+                await send(
+                    {
+                        "type": "http.response.zerocopy",
+                        "file": file,
+                        "offset": offset,
+                        "count": count,
+                        "more_body": False,
+                    }
+                )
+            return
+        if whole and "http.response.pathsend" in extensions:
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+            return
+
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            while count > 0:
+                chunk = await anyio.to_thread.run_sync(os.pread, fd, min(CHUNK_SIZE, count), offset)
+                if not chunk:
+                    # Truncated under us; the client sees a short body
+                    break
+                offset += len(chunk)
+                count -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": count > 0})
+            if count > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            os.close(fd)
@@ -15,4 +15,6 @@ export const API_ENDPOINTS = {
   GET_STATUS: `${API_BASE_URL}/status`,
   GET_FEED: `${API_BASE_URL}/videos`,
   GET_VIDEO: `${API_BASE_URL}/videos`,
+  RETRY_JOB: `${API_BASE_URL}/jobs`,
+  GET_EVENTS: `${API_BASE_URL}/events`,
 };
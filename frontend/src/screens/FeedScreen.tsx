@@ -3,7 +3,7 @@ import { View, StyleSheet, ActivityIndicator, Text, Platform, TouchableOpacity,
 import { RouteProp, useNavigation } from '@react-navigation/native';
 import { NativeStackNavigationProp } from '@react-navigation/native-stack';
 import * as DocumentPicker from 'expo-document-picker';
-import { fetchFeed, uploadPDF, checkJobStatus, JobNotFoundError } from '../services/api';
+import { fetchFeed, uploadPDF, watchJob, JobNotFoundError } from '../services/api';
 import { Video } from '../types';
 import VideoPlayer from '../components/VideoPlayer';
 import { RootStackParamList } from '../navigation/types';
@@ -30,11 +30,6 @@ type FeedScreenProps = {
 
 type FeedScreenNavigationProp = NativeStackNavigationProp<RootStackParamList, 'Feed'>;
 
-interface ProcessingJob {
-  jobId: string;
-  intervalId: NodeJS.Timeout;
-}
-
 /**
  * FeedScreen - TikTok-style vertical video feed with background upload
  *
@@ -58,7 +53,8 @@ export default function FeedScreen({ route }: FeedScreenProps) {
   const [nextCursor, setNextCursor] = useState<string | undefined>(undefined);
   const [error, setError] = useState<string | null>(null);
   const [isJobNotFound, setIsJobNotFound] = useState(false);
-  const [processingJobs, setProcessingJobs] = useState<ProcessingJob[]>([]);
+  // Jobs still rendering, and how to stop watching each of them
+  const processingJobs = useRef(new Map<string, () => void>());
   const [jobIds, setJobIds] = useState<string[]>([jobId]);
 
   const pagerRef = useRef<typeof PagerView>(null);
@@ -68,12 +64,13 @@ export default function FeedScreen({ route }: FeedScreenProps) {
     loadVideos();
   }, []);
 
-  // Cleanup polling intervals on unmount
+  // Stop watching jobs on unmount
   useEffect(() => {
     return () => {
-      processingJobs.forEach(job => clearInterval(job.intervalId));
+      processingJobs.current.forEach(stop => stop());
+      processingJobs.current.clear();
     };
-  }, [processingJobs]);
+  }, []);
 
   // Pagination: fetch more when user is near the end
   useEffect(() => {
@@ -96,6 +93,11 @@ export default function FeedScreen({ route }: FeedScreenProps) {
 
       setVideos(response.videos);
       setNextCursor(response.next_cursor);
+
+      // Job still rendering: keep picking up its videos as they become ready
+      if (response.status && response.status !== 'done' && response.status !== 'failed') {
+        watchJobInBackground(jobId);
+      }
     } catch (err) {
       if (err instanceof JobNotFoundError) {
         setError('Job not found. Please upload a new PDF.');
@@ -149,8 +151,8 @@ export default function FeedScreen({ route }: FeedScreenProps) {
       // Add to job list
       setJobIds([...jobIds, newJobId]);
 
-      // Start background polling for this job
-      startBackgroundPolling(newJobId);
+      // Follow this job in the background
+      watchJobInBackground(newJobId);
 
       // Optional: Show a subtle toast/notification
       console.log(`Background processing started for job: ${newJobId}`);
@@ -161,25 +163,38 @@ export default function FeedScreen({ route }: FeedScreenProps) {
   };
 
   /**
-   * Start polling for a job in the background
+   * Append videos that aren't in the feed yet (jobs publish videos one by one)
    */
-  const startBackgroundPolling = (newJobId: string) => {
-    const intervalId = setInterval(async () => {
-      try {
-        const statusResponse = await checkJobStatus(newJobId);
-
-        if (statusResponse.status === 'done') {
-          // Job complete! Fetch the new videos and append them
-          clearInterval(intervalId);
+  const appendNewVideos = (incoming: Video[]) => {
+    setVideos(prev => {
+      const known = new Set(prev.map(video => video.id));
+      const fresh = incoming.filter(video => !known.has(video.id));
+      return fresh.length > 0 ? [...prev, ...fresh] : prev;
+    });
+  };
 
-          // Remove from processing jobs
-          setProcessingJobs(prev => prev.filter(job => job.jobId !== newJobId));
+  /**
+   * Follow a job in the background (over its event stream, or by polling
+   * where that isn't available), appending its videos as they become ready
+   */
+  const watchJobInBackground = (newJobId: string) => {
+    if (processingJobs.current.has(newJobId)) {
+      return;
+    }
+    let videosSeen = 0;
 
-          // Fetch videos for this job
+    const stop = watchJob(newJobId, async (statusResponse) => {
+      try {
+        if (statusResponse.videos_ready > videosSeen || statusResponse.status === 'done') {
+          videosSeen = statusResponse.videos_ready;
+          // Append whichever of the job's videos are ready so far
           const feedResponse = await fetchFeed(newJobId);
+          appendNewVideos(feedResponse.videos);
+        }
 
-          // Append new videos to the end of the list
-          setVideos(prev => [...prev, ...feedResponse.videos]);
+        if (statusResponse.status === 'done') {
+          // Job complete!
+          processingJobs.current.delete(newJobId);
 
           // Save job_id to storage for session persistence
           await saveJobId(newJobId);
@@ -187,19 +202,15 @@ export default function FeedScreen({ route }: FeedScreenProps) {
           console.log(`New videos added from job: ${newJobId}`);
         } else if (statusResponse.status === 'failed') {
           // Job failed
-          clearInterval(intervalId);
-          setProcessingJobs(prev => prev.filter(job => job.jobId !== newJobId));
+          processingJobs.current.delete(newJobId);
           console.error(`Job failed: ${newJobId}`);
         }
       } catch (error) {
-        console.error('Error polling job status:', error);
-        // Don't clear interval on network errors - keep trying
+        console.error('Error updating the feed for job:', error);
       }
-      
-    }, 5000); // Poll every 5 seconds
+    });
 
-    // Add to processing jobs list
-    setProcessingJobs(prev => [...prev, { jobId: newJobId, intervalId }]);
+    processingJobs.current.set(newJobId, stop);
   };
 
   const handlePageSelected = useCallback((e: typeof PagerViewOnPageSelectedEvent) => {
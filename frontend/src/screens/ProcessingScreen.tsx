@@ -2,8 +2,8 @@ import React, { useEffect, useState, useRef } from 'react';
 import { View, Text, StyleSheet, ActivityIndicator, Alert } from 'react-native';
 import { NativeStackScreenProps } from '@react-navigation/native-stack';
 import { RootStackParamList } from '../navigation/types';
-import { checkJobStatus } from '../services/api';
-import { JobStatus } from '../types';
+import { retryJob, watchJob } from '../services/api';
+import { JobStatus, StatusResponse } from '../types';
 import { saveJobId } from '../services/storage';
 
 type Props = NativeStackScreenProps<RootStackParamList, 'Processing'>;
@@ -14,29 +14,20 @@ export default function ProcessingScreen({ route, navigation }: Props) {
   const [status, setStatus] = useState<JobStatus>('processing');
   const [message, setMessage] = useState('Analyzing PDF...');
   const [estimatedTime, setEstimatedTime] = useState<number | undefined>();
-  const pollingInterval = useRef<NodeJS.Timeout | null>(null);
+  const stopWatching = useRef<(() => void) | null>(null);
 
   useEffect(() => {
-    // Start polling immediately
-    pollStatus();
-
-    // Set up polling interval (every 5 seconds)
-    pollingInterval.current = setInterval(() => {
-      pollStatus();
-    }, 5000);
+    // Progress is pushed over the job's event stream (polled where unavailable)
+    stopWatching.current = watchJob(jobId, handleStatus);
 
     // Cleanup on unmount
     return () => {
-      if (pollingInterval.current) {
-        clearInterval(pollingInterval.current);
-      }
+      stopWatching.current?.();
     };
   }, [jobId]);
 
-  const pollStatus = async () => {
+  const handleStatus = async (statusResponse: StatusResponse) => {
     try {
-      const statusResponse = await checkJobStatus(jobId);
-
       setProgress(statusResponse.progress);
       setStatus(statusResponse.status);
       if (statusResponse.message) {
@@ -46,11 +37,10 @@ export default function ProcessingScreen({ route, navigation }: Props) {
         setEstimatedTime(statusResponse.estimated_time_remaining);
       }
 
-      // Handle completion
-      if (statusResponse.status === 'done') {
-        if (pollingInterval.current) {
-          clearInterval(pollingInterval.current);
-        }
+      // Handle completion - the feed can start playing as soon as the first
+      // segment is ready; it keeps picking up the rest while they render
+      if (statusResponse.status === 'done' || statusResponse.videos_ready > 0) {
+        stopWatching.current?.();
         // Save job_id for session persistence
         await saveJobId(jobId);
         // Navigate to feed with job_id
@@ -59,9 +49,7 @@ export default function ProcessingScreen({ route, navigation }: Props) {
 
       // Handle failure
       if (statusResponse.status === 'failed') {
-        if (pollingInterval.current) {
-          clearInterval(pollingInterval.current);
-        }
+        stopWatching.current?.();
         Alert.alert(
           'Processing Failed',
           statusResponse.message || 'Video generation failed. Please try again.',
@@ -70,12 +58,36 @@ export default function ProcessingScreen({ route, navigation }: Props) {
               text: 'Go Back',
               onPress: () => navigation.navigate('Upload'),
             },
+            {
+              text: 'Retry',
+              onPress: handleRetry,
+            },
           ]
         );
       }
     } catch (error) {
-      console.error('Error polling status:', error);
-      // Don't stop polling on network errors - keep trying
+      console.error('Error handling job status:', error);
+    }
+  };
+
+  /**
+   * Retry the failed job: it resumes where it stopped, so follow it again
+   */
+  const handleRetry = async () => {
+    try {
+      await retryJob(jobId);
+      setStatus('queued');
+      setProgress(0);
+      setMessage('Retrying...');
+      stopWatching.current = watchJob(jobId, handleStatus);
+    } catch (error) {
+      console.error('Error retrying job:', error);
+      Alert.alert('Retry Failed', 'Could not retry the job. Please upload the PDF again.', [
+        {
+          text: 'Go Back',
+          onPress: () => navigation.navigate('Upload'),
+        },
+      ]);
     }
   };
 
@@ -3,15 +3,60 @@ import { UploadResponse, FeedResponse, StatusResponse, JobStatus } from '../type
 
 type BackendFeedResponse = {
   job_id: string;
+  status?: JobStatus;
   videos: string[];
   count: number;
 };
 
+type BackendProgress = {
+  segments_planned: number;
+  lines_planned: number;
+  lines_synthesized: number;
+  segments_rendered: number;
+};
+
 type BackendStatusResponse = {
   job_id: string;
   status: JobStatus;
+  queue_position?: number | null;
+  progress?: BackendProgress | null;
+  videos_ready?: number;
+  error?: string | null;
 };
 
+/**
+ * Turn the backend's per-stage counters into a 0-100 progress value and message
+ * (10% planning, 50% voicing lines, 40% rendering segments)
+ */
+function describeProgress(data: BackendStatusResponse): { progress: number; message?: string } {
+  if (data.status === 'done') {
+    return { progress: 100 };
+  }
+  if (data.status === 'failed') {
+    return { progress: 0, message: data.error ?? undefined };
+  }
+  if (data.status === 'queued') {
+    const position = data.queue_position ? ` (#${data.queue_position} in line)` : '';
+    return { progress: 0, message: `Waiting in queue${position}...` };
+  }
+
+  const p = data.progress;
+  if (!p || p.segments_planned === 0) {
+    return { progress: 0, message: 'Analyzing PDF...' };
+  }
+
+  const linesDone = p.lines_planned > 0 ? p.lines_synthesized / p.lines_planned : 0;
+  const renderDone = p.segments_rendered / p.segments_planned;
+  const progress = 10 + 50 * linesDone + 40 * renderDone;
+
+  const message =
+    p.lines_synthesized < p.lines_planned
+      ? `Recording voices (${p.lines_synthesized}/${p.lines_planned})...`
+      : `Rendering videos (${p.segments_rendered}/${p.segments_planned})...`;
+
+  return { progress: Math.min(progress, 99), message };
+}
+
 /**
  * Upload a PDF file to the backend
  * Returns a job_id that can be used to fetch generated videos
@@ -70,12 +115,153 @@ export async function checkJobStatus(jobId: string): Promise<StatusResponse> {
 
   const data = (await response.json()) as BackendStatusResponse;
   const status = data.status ?? 'processing';
-  const progress = status === 'done' ? 100 : 0;
+  const { progress, message } = describeProgress({ ...data, status });
 
   return {
     status,
     progress,
+    message,
+    videos_ready: data.videos_ready ?? 0,
+  };
+}
+
+// How often to poll /status when the event stream isn't available
+const POLL_INTERVAL_MS = 5000;
+
+// Browsers (the web build) have EventSource; React Native doesn't
+type ServerSentEvent = { data?: string };
+type JobEventSource = {
+  readyState: number;
+  addEventListener(type: string, listener: (event: ServerSentEvent) => void): void;
+  close(): void;
+};
+const EventSourceImpl: (new (url: string) => JobEventSource) | undefined = (globalThis as any)
+  .EventSource;
+const EVENT_SOURCE_CLOSED = 2;
+
+/**
+ * Follow a job's progress until it is done or failed
+ * Uses the /events stream (pushed as the job makes progress) and falls back to
+ * polling /status where there is no EventSource or the stream can't be opened.
+ * Returns a function that stops watching.
+ */
+export function watchJob(jobId: string, onStatus: (status: StatusResponse) => void): () => void {
+  let stopped = false;
+  let pollTimer: ReturnType<typeof setInterval> | null = null;
+  let source: JobEventSource | null = null;
+
+  const stop = () => {
+    stopped = true;
+    if (pollTimer) {
+      clearInterval(pollTimer);
+    }
+    source?.close();
+  };
+
+  const report = (status: StatusResponse) => {
+    if (stopped) {
+      return;
+    }
+    onStatus(status);
+    if (status.status === 'done' || status.status === 'failed') {
+      stop();
+    }
+  };
+
+  const poll = async () => {
+    try {
+      report(await checkJobStatus(jobId));
+    } catch (error) {
+      // Network errors don't stop the watch - keep trying
+      console.error('[API] Status check failed:', error);
+    }
+  };
+
+  const startPolling = () => {
+    if (stopped || pollTimer) {
+      return;
+    }
+    pollTimer = setInterval(poll, POLL_INTERVAL_MS);
+  };
+
+  // Current state first (e.g. the queue position), then every change as it happens
+  poll();
+  if (!EventSourceImpl) {
+    startPolling();
+    return stop;
+  }
+
+  // The stream replays the job's events from the start, so counting them
+  // gives the same progress as /status
+  const progress: BackendProgress = {
+    segments_planned: 0,
+    lines_planned: 0,
+    lines_synthesized: 0,
+    segments_rendered: 0,
+  };
+  const fromEvents = (status: JobStatus, error?: string): StatusResponse => ({
+    status,
+    ...describeProgress({ job_id: jobId, status, progress, error }),
+    videos_ready: progress.segments_rendered,
+  });
+
+  const eventSource = new EventSourceImpl(`${API_ENDPOINTS.GET_EVENTS}/${jobId}`);
+  source = eventSource;
+  const on = (event: string, handle: (data: any) => StatusResponse) => {
+    eventSource.addEventListener(event, (e) => report(handle(JSON.parse(e.data ?? '{}'))));
   };
+
+  on('segments_planned', (data) => {
+    progress.segments_planned += data.count;
+    return fromEvents('processing');
+  });
+  on('lines_planned', (data) => {
+    progress.lines_planned += data.count;
+    return fromEvents('processing');
+  });
+  on('line_synthesized', (data) => {
+    if (data.success) {
+      progress.lines_synthesized += 1;
+    }
+    return fromEvents('processing');
+  });
+  on('video_ready', () => {
+    progress.segments_rendered += 1;
+    return fromEvents('processing');
+  });
+  on('done', (data) => {
+    progress.segments_rendered = (data.videos ?? []).length;
+    return fromEvents('done');
+  });
+
+  // "error" is both the job's failure event (with data) and the connection's
+  eventSource.addEventListener('error', (e) => {
+    if (e.data) {
+      report(fromEvents('failed', JSON.parse(e.data).message ?? undefined));
+    } else if (eventSource.readyState === EVENT_SOURCE_CLOSED) {
+      // Gave up reconnecting (e.g. an older server without /events)
+      source = null;
+      startPolling();
+    }
+  });
+
+  return stop;
+}
+
+/**
+ * Retry a failed job
+ * It resumes where it stopped, reusing the videos it already made
+ */
+export async function retryJob(jobId: string): Promise<UploadResponse> {
+  const url = `${API_ENDPOINTS.RETRY_JOB}/${jobId}/retry`;
+  const response = await fetch(url, { method: 'POST' });
+
+  if (!response.ok) {
+    const errorText = await response.text();
+    throw new Error(`Retry failed with status ${response.status}: ${errorText}`);
+  }
+
+  return (await response.json()) as UploadResponse;
 }
 
 /**
@@ -112,5 +298,6 @@ export async function fetchFeed(jobId: string, cursor?: string): Promise<FeedRes
 
   return {
     videos,
+    status: data.status,
   };
 }
@@ -12,13 +12,15 @@ export interface Video {
 export interface FeedResponse {
   videos: Video[];
   next_cursor?: string;
+  status?: JobStatus;
 }
 
-export type JobStatus = 'processing' | 'done' | 'failed';
+export type JobStatus = 'queued' | 'processing' | 'done' | 'failed';
 
 export interface StatusResponse {
   status: JobStatus;
   progress: number; // 0-100
   message?: string;
   estimated_time_remaining?: number; // seconds
+  videos_ready: number; // videos already playable while the job is processing
 }